@@ -0,0 +1,85 @@
+"""
+Time to load the events of a dictionary with core.analytics and compute its
+statistics, on synthetic dictionaries with growing numbers of events, versus
+catching the rollups up with the whole history once and reading them.
+
+    python -m benchmarks.analytics --events 1000000 10000000
+
+Generated dictionaries are kept in --directory, if given. Results are keyed
+"analytics.<events>.<step>".
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import measure, report, summarize
+from benchmarks.repository import generate
+from core import analytics
+from core.repository.repositories import Storage, delete_database
+
+
+def run(records: int, events: int, repeat: int, directory: str) -> dict:
+    path = str(Path(directory) / f"synthetic-{records}-{events}.db")
+    if not Path(path).is_file():
+        generate(path=path, records=records, events=events)
+
+    storage = Storage(path=path)
+    loaded = analytics.load_events(storage)
+    keys = analytics.load_keys(storage)
+
+    prefix = f"analytics.{events}"
+    results = {
+        f"{prefix}.load_events": summarize(
+            measure(lambda: analytics.load_events(storage), repeat=repeat, warmup=0)
+        ),
+        f"{prefix}.compute": summarize(
+            measure(
+                lambda: analytics.compute(loaded, keys=keys), repeat=repeat, warmup=0
+            )
+        ),
+    }
+
+    # The catch-up runs once per dictionary, so on a copy and only once.
+    copy_path = str(Path(directory) / "rollups.db")
+    storage.dump(path=copy_path)
+    copy = Storage(path=copy_path)
+    results[f"{prefix}.refresh_statistics"] = summarize(
+        measure(copy.refresh_statistics, repeat=1, warmup=0)
+    )
+    results[f"{prefix}.load_statistics"] = summarize(
+        measure(lambda: analytics.load_statistics(copy), repeat=repeat, warmup=0)
+    )
+
+    copy.close()
+    delete_database(path=copy_path)
+    storage.close()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--events", type=int, nargs="+", default=[1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--directory", help="keep generated dictionaries here")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = arguments.directory or temporary_directory
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        results = {}
+        for events in arguments.events:
+            results.update(
+                run(
+                    records=arguments.records,
+                    events=events,
+                    repeat=arguments.repeat,
+                    directory=directory,
+                )
+            )
+
+    report(results, output=arguments.output)
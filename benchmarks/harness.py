@@ -0,0 +1,55 @@
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+def measure(
+    function: Callable[[], object], repeat: int = 1000, warmup: int = 10
+) -> List[float]:
+    for _ in range(warmup):
+        function()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+
+    return samples
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "calls": len(samples),
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "p50_us": percentile(samples, 0.50) * 1e6,
+        "p95_us": percentile(samples, 0.95) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+    }
+
+
+def report(results: Dict[str, Dict[str, float]], output: Optional[str] = None) -> None:
+    width = max([len(name) for name in results] + [len("benchmark")])
+    print(
+        f"{'benchmark':<{width}} {'calls':>8} {'mean, us':>12} {'p50, us':>12} "
+        f"{'p95, us':>12} {'p99, us':>12}"
+    )
+    for name, summary in results.items():
+        print(
+            f"{name:<{width}} {summary['calls']:>8} {summary['mean_us']:>12.1f} "
+            f"{summary['p50_us']:>12.1f} {summary['p95_us']:>12.1f} "
+            f"{summary['p99_us']:>12.1f}"
+        )
+
+    if output:
+        Path(output).write_text(json.dumps(results, indent=4, sort_keys=True))
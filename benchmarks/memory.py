@@ -0,0 +1,109 @@
+"""
+Resident memory of a whole dictionary held in memory: the list built by
+Repository.items(), the dict of (value, is_checked, id) tuples the cache
+used to keep, and the columnar RecordTable of Repository.snapshot().
+
+    python -m benchmarks.memory --records 100000 1000000
+
+Every variant is loaded in a fresh interpreter, so that memory freed by an
+earlier one is not reused. Results are keyed "memory.<records>.<variant>",
+time the load and carry the added RSS and bytes per record.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import report, summarize
+from benchmarks.repository import generate
+from benchmarks.startup import ROOT
+
+VARIANTS = {
+    "items": "repository.items()",
+    "tuples": (
+        "{key: (value, is_checked, id) for key, value, is_checked, id "
+        "in repository.storage.engine.connect().execute(_SELECT_RECORDS)}"
+    ),
+    "record_table": "repository.snapshot()",
+}
+
+# Runs in a fresh interpreter; RSS is read from /proc, so this is Linux only.
+_PROBE = """
+import gc, json, time
+from core.repository.repositories import _SELECT_RECORDS, Repository
+
+def rss():
+    for line in open("/proc/self/status"):
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+
+repository = Repository(path={path!r})
+repository.storage.record(key="warm up")
+gc.collect()
+
+before = rss()
+started = time.perf_counter()
+loaded = {statement}
+elapsed = time.perf_counter() - started
+gc.collect()
+
+print(json.dumps({{"seconds": elapsed, "rss": rss() - before}}))
+"""
+
+
+def probe(path: str, statement: str) -> dict:
+    process = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(path=path, statement=statement)],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return json.loads(process.stdout)
+
+
+def run(records: int, repeat: int, directory: str) -> dict:
+    path = str(Path(directory) / f"synthetic-{records}-0.db")
+    if not Path(path).is_file():
+        generate(path=path, records=records, events=0)
+
+    results = {}
+    for name, statement in VARIANTS.items():
+        probes = [probe(path=path, statement=statement) for _ in range(repeat)]
+        rss = min(sample["rss"] for sample in probes)
+        results[f"memory.{records}.{name}"] = {
+            **summarize([sample["seconds"] for sample in probes]),
+            "rss": rss,
+            "bytes_per_record": rss / records,
+        }
+        print(
+            f"memory.{records}.{name}: +{rss / 2**20:.1f} MiB RSS, "
+            f"{rss / records:.0f} bytes per record"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--directory", help="keep generated dictionaries here")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = arguments.directory or temporary_directory
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        results = {}
+        for records in arguments.records:
+            results.update(
+                run(records=records, repeat=arguments.repeat, directory=directory)
+            )
+
+    report(results, output=arguments.output)
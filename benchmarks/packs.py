@@ -0,0 +1,104 @@
+"""
+Dictionary packs against the SQLite dictionaries they are exported from:
+opening, key lookups and listing the keys and items.
+
+    python -m benchmarks.packs --records 100000 1000000
+
+Results are keyed "packs.<records>.<format>.<operation>", with the formats
+"sqlite", "sqlite_read_only" and one per pack compression; the file sizes
+are printed.
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import measure, report, summarize
+from benchmarks.repository import generate
+from core.repository.packs import COMPRESSIONS, PackStorage, export_pack
+from core.repository.repositories import Storage
+
+
+def _open_sqlite(path: str, read_only: bool) -> Storage:
+    storage = Storage(path=path, core_reads=True, read_only=read_only)
+    # SQLAlchemy connects lazily, so opening includes the first connection.
+    storage["warm up"]
+
+    return storage
+
+
+def run(records: int, repeat: int, directory: str) -> dict:
+    path = str(Path(directory) / f"synthetic-{records}-0.db")
+    if not Path(path).is_file():
+        generate(path=path, records=records, events=0)
+
+    opens = {
+        "sqlite": lambda: _open_sqlite(path=path, read_only=False),
+        "sqlite_read_only": lambda: _open_sqlite(path=path, read_only=True),
+    }
+    sizes = {"sqlite": Path(path).stat().st_size}
+
+    storage = Storage(path=path)
+    for compression in COMPRESSIONS:
+        name = f"pack_{compression or 'plain'}"
+        pack_path = str(Path(directory) / f"synthetic-{records}.{name}")
+        try:
+            export_pack(storage, path=pack_path, compression=compression)
+        except ImportError as error:
+            print(f"packs.{records}.{name}: skipped, {error}")
+            continue
+
+        opens[name] = lambda pack_path=pack_path: PackStorage(path=pack_path)
+        sizes[name] = Path(pack_path).stat().st_size
+    storage.close()
+
+    keys = [f"key-{index}" for index in range(records)]
+    bulk_repeat = max(1, repeat // 100)
+
+    results = {}
+    for name, open_storage in opens.items():
+        prefix = f"packs.{records}.{name}"
+
+        def reopen():
+            open_storage().close()
+
+        results[f"{prefix}.open"] = summarize(measure(reopen, repeat=bulk_repeat))
+
+        opened = open_storage()
+        results[f"{prefix}.getitem"] = summarize(
+            measure(lambda: opened[random.choice(keys)], repeat=repeat)
+        )
+        results[f"{prefix}.keys"] = summarize(
+            measure(opened.keys, repeat=bulk_repeat, warmup=1)
+        )
+        results[f"{prefix}.items"] = summarize(
+            measure(opened.items, repeat=bulk_repeat, warmup=1)
+        )
+        opened.close()
+
+    for name, size in sizes.items():
+        print(f"packs.{records}.{name}: {size / 2**20:.1f} MiB")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--directory", help="keep generated dictionaries here")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = arguments.directory or temporary_directory
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        results = {}
+        for records in arguments.records:
+            results.update(
+                run(records=records, repeat=arguments.repeat, directory=directory)
+            )
+
+    report(results, output=arguments.output)
@@ -0,0 +1,90 @@
+"""
+Load test of core.quiz: simulated answers per second against a repository.
+
+    python -m benchmarks.quiz --records 1000 --answers 5000 --cached
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import report, summarize
+from benchmarks.storage_reads import populate
+from core.quiz.sessions import Mode, Order, QuizSession
+from core.repository.caches import CachedRepository
+from core.repository.repositories import Repository, Storage
+
+
+def run(
+    records: int, answers: int, cached: bool, error_rate: float, events: bool = True
+) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "quiz.db")
+        populate(storage=Storage(path=path), records=records)
+
+        repository = Repository(path=path, core_reads=True)
+        if cached:
+            repository = CachedRepository(repository)
+
+        options = {} if events else {"dispatch": lambda function, **kwargs: None}
+        session = QuizSession(
+            repository=repository,
+            order=Order.RANDOM,
+            mode=Mode.MIXED,
+            seed=0,
+            **options,
+        )
+
+        samples = {"next_card": [], "submit": [], "hint": []}
+        started = time.perf_counter()
+        for _ in range(answers):
+            before = time.perf_counter()
+            card = session.next_card()
+            samples["next_card"].append(time.perf_counter() - before)
+
+            before = time.perf_counter()
+            if random.random() < error_rate / 2:
+                session.hint()
+                samples["hint"].append(time.perf_counter() - before)
+                continue
+
+            meaning = card.value if random.random() > error_rate else "wrong"
+            session.submit(expression=card.key, meaning=meaning)
+            samples["submit"].append(time.perf_counter() - before)
+
+        elapsed = time.perf_counter() - started
+
+    results = {
+        f"quiz.{name}": summarize(values) for name, values in samples.items() if values
+    }
+    print(f"{answers / elapsed:.0f} answers per second")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--answers", type=int, default=5000)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--cached", action="store_true", help="use CachedRepository")
+    parser.add_argument(
+        "--no-events",
+        action="store_true",
+        help="do not write events, measures the engine alone",
+    )
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    report(
+        run(
+            records=arguments.records,
+            answers=arguments.answers,
+            cached=arguments.cached,
+            error_rate=arguments.error_rate,
+            events=not arguments.no_events,
+        ),
+        output=arguments.output,
+    )
@@ -0,0 +1,211 @@
+"""
+Latencies of core.repository.repositories.Repository operations on synthetic
+dictionaries of growing size.
+
+    python -m benchmarks.repository --records 1000 100000 1000000 \
+        --events 10000000 --output repository.json
+
+Generated dictionaries are kept in --directory, if given, and reused by
+later runs with the same sizes; otherwise they live in a temporary
+directory. Results are keyed "repository.<records>.<operation>" so that
+runs over different sizes can be tracked side by side.
+"""
+
+import argparse
+import itertools
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.harness import measure, report, summarize
+from core.repository.events import EventType
+from core.repository.models import Record
+from core.repository.repositories import Repository, Storage, delete_database
+
+_CHUNK_SIZE = 50000
+
+_INSERT_EVENT = (
+    "INSERT INTO events (event_type, record_id, created_on, updated_on) "
+    "VALUES (?, ?, ?, ?)"
+)
+
+
+def generate(path: str, records: int, events: int) -> None:
+    """
+    Fills a new dictionary with `records` records and `events` events spread
+    over them at random, in large transactions rather than through the ORM.
+    """
+    storage = Storage(path=path)
+    now = datetime.now()
+
+    with storage.engine.begin() as connection:
+        for offset in range(0, records, _CHUNK_SIZE):
+            connection.execute(
+                Record.__table__.insert(),
+                [
+                    {
+                        "key": f"key-{index}",
+                        "value": f"value of key-{index} " * 4,
+                        "is_checked": index % 2 == 0,
+                        "created_on": now,
+                        "updated_on": now,
+                    }
+                    for index in range(offset, min(records, offset + _CHUNK_SIZE))
+                ],
+            )
+
+        event_types = [event_type.name for event_type in EventType]
+        stamp = str(now)
+        for offset in range(0, events, _CHUNK_SIZE):
+            connection.exec_driver_sql(
+                _INSERT_EVENT,
+                [
+                    (
+                        random.choice(event_types),
+                        random.randint(1, records),
+                        stamp,
+                        stamp,
+                    )
+                    for _ in range(min(_CHUNK_SIZE, events - offset))
+                ],
+            )
+
+    storage.close()
+
+
+def run(
+    records: int, events: int, repeat: int, directory: str, core_reads: bool = False
+) -> dict:
+    path = str(Path(directory) / f"synthetic-{records}-{events}.db")
+    if not Path(path).is_file():
+        started = time.perf_counter()
+        generate(path=path, records=records, events=events)
+        print(
+            f"generated {records} records and {events} events "
+            f"in {time.perf_counter() - started:.1f} s"
+        )
+
+    working_path = str(Path(directory) / "working.db")
+    Storage(path=path).dump(path=working_path)
+
+    prefix = f"repository.{records}"
+    keys = [f"key-{index}" for index in range(records)]
+    # Whole-table and whole-file operations get fewer rounds.
+    bulk_repeat = max(3, repeat // 100)
+    counter = itertools.count()
+    results = {}
+
+    results[f"{prefix}.open"] = summarize(
+        measure(
+            lambda: Repository(path=working_path).storage.close(), repeat=bulk_repeat
+        )
+    )
+
+    repository = Repository(path=working_path, core_reads=core_reads)
+    # The first write backs the whole file up; that is measured on its own.
+    repository.backup()
+    backup_paths = [repository.backup_path]
+
+    results[f"{prefix}.get"] = summarize(
+        measure(lambda: repository[random.choice(keys)], repeat=repeat)
+    )
+    results[f"{prefix}.set"] = summarize(
+        measure(
+            lambda: repository.__setitem__(f"new-{next(counter)}", "value"),
+            repeat=repeat,
+        )
+    )
+    results[f"{prefix}.update"] = summarize(
+        measure(
+            lambda: repository.__setitem__(random.choice(keys), "value"), repeat=repeat
+        )
+    )
+
+    renamed = iter(range(next(counter)))
+    results[f"{prefix}.rename"] = summarize(
+        measure(
+            lambda: _rename(repository=repository, index=next(renamed)), repeat=repeat
+        )
+    )
+
+    deleted = iter(range(next(counter)))
+    results[f"{prefix}.delete"] = summarize(
+        measure(
+            lambda: repository.__delitem__(f"renamed-{next(deleted)}"), repeat=repeat
+        )
+    )
+    results[f"{prefix}.keys"] = summarize(measure(repository.keys, repeat=bulk_repeat))
+    results[f"{prefix}.items"] = summarize(
+        measure(repository.items, repeat=bulk_repeat)
+    )
+    results[f"{prefix}.commit_success_event"] = summarize(
+        measure(
+            lambda: repository.commit_success_event(key=random.choice(keys)),
+            repeat=repeat,
+        )
+    )
+
+    def backup():
+        repository.backup()
+        backup_paths.append(repository.backup_path)
+
+    results[f"{prefix}.backup"] = summarize(measure(backup, repeat=bulk_repeat))
+    results[f"{prefix}.restore"] = summarize(
+        measure(repository.restore, repeat=1, warmup=0)
+    )
+    for backup_path in backup_paths:
+        Path(backup_path).unlink(missing_ok=True)
+
+    saved_path = str(Path(directory) / "saved.db")
+    results[f"{prefix}.save"] = summarize(
+        measure(lambda: _save(repository, saved_path), repeat=bulk_repeat)
+    )
+
+    repository.storage.close()
+    for database in [working_path, saved_path]:
+        delete_database(path=database)
+
+    return results
+
+
+def _rename(repository: Repository, index: int) -> None:
+    repository[(f"new-{index}", f"renamed-{index}")] = "value"
+
+
+def _save(repository: Repository, path: str) -> None:
+    # save() with a path copies the file and then points the repository at the
+    # copy, which would make every later round a no-op.
+    source_path = repository.path
+    repository.save(path=path)
+    repository.storage.path = source_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--core-reads", action="store_true", help="read with Core")
+    parser.add_argument("--directory", help="keep generated dictionaries here")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = arguments.directory or temporary_directory
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        results = {}
+        for records in arguments.records:
+            results.update(
+                run(
+                    records=records,
+                    events=arguments.events,
+                    repeat=arguments.repeat,
+                    directory=directory,
+                    core_reads=arguments.core_reads,
+                )
+            )
+
+    report(results, output=arguments.output)
@@ -0,0 +1,84 @@
+"""
+Startup time and resident memory of registering the icons from the binary
+bundle (gui.resources.Bundle) versus the generated Resources.py module.
+
+    python -m benchmarks.resources --repeat 20
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.harness import report, summarize
+from benchmarks.startup import ROOT
+
+VARIANTS = {
+    "resources.bundle": "from gui.resources import Bundle",
+    # The module itself; "from gui.resources import Resources" is the bundle.
+    "resources.module": "import gui.resources.Resources",
+}
+
+# Runs in a fresh interpreter; RSS is read from /proc, so this is Linux only.
+_PROBE = """
+import json, pathlib, struct, time
+from PyQt5.QtCore import QDirIterator, QFile
+
+def rss():
+    for line in open("/proc/self/status"):
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+
+before = rss()
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+registered = rss()
+
+iterator = QDirIterator(":/all/icons")
+while iterator.hasNext():
+    file = QFile(iterator.next())
+    file.open(QFile.ReadOnly)
+    file.readAll()
+    file.close()
+
+print(json.dumps({{"seconds": elapsed, "registered": registered - before,
+                   "read": rss() - before}}))
+"""
+
+
+def probe(statement: str) -> dict:
+    process = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return json.loads(process.stdout)
+
+
+def run(repeat: int) -> dict:
+    results = {}
+    for name, statement in VARIANTS.items():
+        probes = [probe(statement=statement) for _ in range(repeat)]
+        results[name] = summarize([sample["seconds"] for sample in probes])
+
+        registered = min(sample["registered"] for sample in probes) / 1024
+        read = min(sample["read"] for sample in probes) / 1024
+        print(
+            f"{name}: +{registered:.0f} KiB RSS after registering, "
+            f"+{read:.0f} KiB after reading every icon"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    report(run(repeat=arguments.repeat), output=arguments.output)
@@ -0,0 +1,105 @@
+"""
+Load test of the quiz server: concurrent users answering over keep-alive
+HTTP connections on localhost.
+
+    python -m benchmarks.server --records 1000 --users 16 --answers 200
+"""
+
+import argparse
+import http.client
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.harness import report, summarize
+from benchmarks.storage_reads import populate
+from core.repository.repositories import Storage
+from server.servers import QuizServer
+
+
+def _request(connection, method, path, body=None):
+    payload = json.dumps(body) if body is not None else None
+    connection.request(method, path, body=payload)
+    response = connection.getresponse()
+
+    return json.loads(response.read())
+
+
+def _client(address, user: str, answers: int, error_rate: float, samples: list):
+    connection = http.client.HTTPConnection(*address)
+    body = _request(connection, "POST", "/sessions", {"user": user, "order": 2})
+    session = body["session"]
+
+    for _ in range(answers):
+        answer = "wrong" if random.random() < error_rate else body["card"]["shown"]
+
+        before = time.perf_counter()
+        body = _request(
+            connection, "POST", f"/sessions/{session}/answer", {"answer": answer}
+        )
+        samples.append(time.perf_counter() - before)
+
+    _request(connection, "DELETE", f"/sessions/{session}")
+    connection.close()
+
+
+def run(records: int, users: int, answers: int, pool_size: int, error_rate: float):
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "dictionary.db")
+        populate(storage=Storage(path=path), records=records)
+
+        server = QuizServer(
+            address=("127.0.0.1", 0),
+            dictionary_path=path,
+            progress_directory=str(Path(directory) / "progress"),
+            pool_size=pool_size,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        samples = []
+        clients = [
+            threading.Thread(
+                target=_client,
+                args=(server.server_address, f"user{i}", answers, error_rate, samples),
+            )
+            for i in range(users)
+        ]
+
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+
+        server.shutdown()
+        server.server_close()
+
+    print(f"{len(samples) / elapsed:.0f} answers per second")
+
+    return {"server.answer": summarize(samples)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--answers", type=int, default=200, help="per user")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    report(
+        run(
+            records=arguments.records,
+            users=arguments.users,
+            answers=arguments.answers,
+            pool_size=arguments.pool_size,
+            error_rate=arguments.error_rate,
+        ),
+        output=arguments.output,
+    )
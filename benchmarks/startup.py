@@ -0,0 +1,82 @@
+"""
+Startup cost of the GUI, measured with `python -X importtime` in fresh
+interpreters.
+
+    python -m benchmarks.startup --repeat 10 --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.harness import report, summarize
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# What `boost` imports before the window shows, and what a quiz pulls in.
+STATEMENTS = {
+    "startup.main_window": "import gui.dialog_boost.MainDialogBoost",
+    "startup.quiz_dialog": "import gui.quiz_dialog.DialogQuiz",
+    "startup.repository": "import core.repository.caches",
+}
+
+
+def importtime(statement: str) -> Dict[str, Dict[str, float]]:
+    """
+    Runs the statement in a new interpreter and returns, for every module it
+    imported, its own and cumulative import time in seconds.
+    """
+    environment = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=str(ROOT),
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        own, cumulative, module = line[len("import time:") :].split("|")
+        modules[module.strip()] = {
+            "own": int(own) / 1e6,
+            "cumulative": int(cumulative) / 1e6,
+        }
+
+    return modules
+
+
+def run(repeat: int, top: int) -> dict:
+    results = {}
+    for name, statement in STATEMENTS.items():
+        module = statement.split()[-1]
+
+        samples = []
+        for _ in range(repeat):
+            modules = importtime(statement=statement)
+            samples.append(modules[module]["cumulative"])
+        results[name] = summarize(samples)
+
+        slowest = sorted(modules.items(), key=lambda item: -item[1]["own"])[:top]
+        print(f"{statement}: {len(modules)} modules, slowest by own time:")
+        for slow_module, times in slowest:
+            print(f"    {times['own'] * 1e3:8.1f} ms  {slow_module}")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    report(run(repeat=arguments.repeat, top=arguments.top), output=arguments.output)
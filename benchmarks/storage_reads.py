@@ -0,0 +1,73 @@
+"""
+ORM vs Core read path latencies of core.repository.repositories.Storage.
+
+    python -m benchmarks.storage_reads --records 1000 --repeat 1000
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import measure, report, summarize
+from core.repository.models import Record
+from core.repository.repositories import Storage
+
+
+def populate(storage: Storage, records: int) -> None:
+    session = storage.session_factory()
+    session.bulk_save_objects(
+        [
+            Record(
+                key=f"key-{index}", value=f"value-{index}", is_checked=index % 2 == 0
+            )
+            for index in range(records)
+        ]
+    )
+    session.commit()
+    session.close()
+
+
+def run(records: int, repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "storage_reads.db")
+        populate(storage=Storage(path=path), records=records)
+
+        keys = [f"key-{index}" for index in range(records)]
+        bulk_repeat = max(1, repeat // 100)
+
+        for mode, core_reads in [("orm", False), ("core", True)]:
+            storage = Storage(path=path, core_reads=core_reads)
+
+            results[f"{mode}.getitem"] = summarize(
+                measure(lambda: storage[random.choice(keys)], repeat=repeat)
+            )
+            results[f"{mode}.is_checked"] = summarize(
+                measure(
+                    lambda: storage.is_checked(key=random.choice(keys)), repeat=repeat
+                )
+            )
+            results[f"{mode}.len"] = summarize(
+                measure(lambda: len(storage), repeat=repeat)
+            )
+            results[f"{mode}.keys"] = summarize(
+                measure(storage.keys, repeat=bulk_repeat)
+            )
+            results[f"{mode}.items"] = summarize(
+                measure(storage.items, repeat=bulk_repeat)
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    report(
+        run(records=arguments.records, repeat=arguments.repeat), output=arguments.output
+    )
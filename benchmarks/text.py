@@ -0,0 +1,238 @@
+"""
+Per-call latencies of the text helpers a quiz runs on every answer:
+core.text.mask_text and compare, diff_match_patch.diff_main and
+diff_prettyHtml, over realistic corpora, with alternative implementations
+measured side by side.
+
+    python -m benchmarks.text --repeat 2000
+    python -m benchmarks.text --operation compare --corpus cyrillic
+
+Results are keyed "text.<operation>.<variant>.<corpus>". To try an
+implementation, add it to VARIANTS; "current" is what the application runs.
+"""
+
+import argparse
+import difflib
+import random
+import re
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.harness import measure, report, summarize
+from core.diff import diff_match_patch
+from core.events import event
+from core.text import compare, mask_text
+
+CORPORA: Dict[str, List[str]] = {
+    "words": [
+        "apple",
+        "borrow",
+        "consider",
+        "deceive",
+        "eager",
+        "fragile",
+        "gather",
+        "hesitate",
+        "improve",
+        "journey",
+        "knowledge",
+        "literally",
+    ],
+    "phrasal_verbs": [
+        "look forward to",
+        "put up with",
+        "come across",
+        "get rid of",
+        "run out of",
+        "carry on",
+        "give in",
+        "break down",
+        "catch up with",
+        "turn down",
+    ],
+    "definitions": [
+        "A feeling of worry, nervousness, or unease about something with an "
+        "uncertain outcome. She felt a surge of anxiety before the exam.",
+        "To make something less severe, serious, or painful; used of medicine "
+        "and of measures taken by governments. Nothing could alleviate the pain.",
+        "The quality of being honest and having strong moral principles. He was "
+        "known as a man of integrity, and everybody trusted him.",
+        "We looked at a lot of computers before buying this one, in order to "
+        "compare prices. In the end we chose the cheapest.",
+    ],
+    "cyrillic": [
+        "смотреть вперёд",
+        "мириться с чем-либо",
+        "случайно натолкнуться",
+        "избавиться от",
+        "Чувство беспокойства или тревоги по поводу того, исход чего неясен.",
+        "Сделать что-либо менее тяжёлым или болезненным; облегчить.",
+    ],
+    "mixed": [
+        "get rid of — избавиться от",
+        "look forward to (с нетерпением ждать)",
+        "put up with — терпеть, мириться",
+        "to alleviate — облегчать, смягчать (боль, страдания)",
+        "integrity: честность, порядочность; целостность",
+    ],
+}
+
+
+def _answer(text: str, randomizer: random.Random) -> str:
+    # What users actually type: mostly right, with a typo, a dropped word or
+    # different case and punctuation.
+    words = text.split()
+    choice = randomizer.random()
+    if choice < 0.3:
+        return text
+    if choice < 0.6:
+        position = randomizer.randrange(len(text))
+        return text[:position] + text[position + 1 :]
+    if choice < 0.8 and len(words) > 1:
+        del words[randomizer.randrange(len(words))]
+        return " ".join(words)
+
+    return text.upper().replace(",", "").replace(".", "")
+
+
+def _mask_text_join(text, degree):
+    return "".join(char if event(probability=degree) else "_" for char in text)
+
+
+def _mask_text_choices(text, degree):
+    # One call to random() per character without the range check of event().
+    rand = random.random
+    return "".join(char if rand() < degree else "_" for char in text)
+
+
+_PUNCTUATION = re.compile(r"[.?!:;,-]")
+
+
+def _normalize(string):
+    return _PUNCTUATION.sub("", " ".join(string.lower().split()))
+
+
+def _compare_difflib(left, right):
+    # What fuzzywuzzy falls back to without python-Levenshtein.
+    matcher = difflib.SequenceMatcher(None, _normalize(left), _normalize(right))
+    return round(100 * matcher.ratio())
+
+
+def _compare_levenshtein(left, right):
+    from Levenshtein import ratio
+
+    return round(100 * ratio(_normalize(left), _normalize(right)))
+
+
+def _compare_rapidfuzz(left, right):
+    from rapidfuzz.fuzz import ratio
+
+    return round(ratio(_normalize(left), _normalize(right)))
+
+
+_DMP = diff_match_patch()
+
+
+def _diff_main(left, right):
+    return _DMP.diff_main(left, right)
+
+
+def _diff_main_without_lines(left, right):
+    return _DMP.diff_main(left, right, checklines=False)
+
+
+def _diff_main_cleaned(left, right):
+    diffs = _DMP.diff_main(left, right)
+    _DMP.diff_cleanupSemantic(diffs)
+    return diffs
+
+
+def _pretty_html(left, right):
+    return _DMP.diff_prettyHtml(_DMP.diff_main(left, right))
+
+
+VARIANTS: Dict[str, Dict[str, Callable]] = {
+    "mask_text": {
+        "current": lambda text, _: mask_text(text, 0.7),
+        "join": lambda text, _: _mask_text_join(text, 0.7),
+        "choices": lambda text, _: _mask_text_choices(text, 0.7),
+    },
+    "compare": {
+        "current": compare,
+        "difflib": _compare_difflib,
+        "levenshtein": _compare_levenshtein,
+        "rapidfuzz": _compare_rapidfuzz,
+    },
+    "diff_main": {
+        "current": _diff_main,
+        "checklines_off": _diff_main_without_lines,
+        "cleanup_semantic": _diff_main_cleaned,
+    },
+    "diff_prettyHtml": {
+        "current": _pretty_html,
+    },
+}
+
+
+def _pairs(corpus: str, seed: int) -> List[Tuple[str, str]]:
+    randomizer = random.Random(seed)
+    return [(text, _answer(text, randomizer)) for text in CORPORA[corpus]]
+
+
+def _check(operation: str, variant: str, corpus: str, pairs) -> None:
+    # Masks are random, everything else must agree with the current code to
+    # be a drop-in replacement.
+    if "current" == variant or "mask_text" == operation:
+        return
+
+    current = VARIANTS[operation]["current"]
+    function = VARIANTS[operation][variant]
+    differing = sum(1 for pair in pairs if function(*pair) != current(*pair))
+    if differing:
+        print(
+            f"{operation}.{variant}.{corpus}: differs from current "
+            f"on {differing} of {len(pairs)} answers"
+        )
+
+
+def run(operations: List[str], corpora: List[str], repeat: int) -> dict:
+    results = {}
+    for operation in operations:
+        for variant, function in VARIANTS[operation].items():
+            try:
+                function("warm up", "warm up")
+            except ImportError as error:
+                print(f"{operation}.{variant}: skipped, {error}")
+                continue
+
+            for corpus in corpora:
+                pairs = _pairs(corpus=corpus, seed=0)
+                _check(operation=operation, variant=variant, corpus=corpus, pairs=pairs)
+                calls = iter(pairs * (repeat // len(pairs) + 2))
+
+                results[f"text.{operation}.{variant}.{corpus}"] = summarize(
+                    measure(lambda: function(*next(calls)), repeat=repeat, warmup=0)
+                )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--operation", choices=list(VARIANTS), nargs="+", default=list(VARIANTS)
+    )
+    parser.add_argument(
+        "--corpus", choices=list(CORPORA), nargs="+", default=list(CORPORA)
+    )
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    arguments = parser.parse_args()
+
+    report(
+        run(
+            operations=arguments.operation,
+            corpora=arguments.corpus,
+            repeat=arguments.repeat,
+        ),
+        output=arguments.output,
+    )
@@ -0,0 +1,354 @@
+"""
+Statistics over the events table, computed over NumPy columns:
+
+    statistics = compute(load_events(storage), keys=load_keys(storage))
+
+or read from the rollup tables of core.repository.rollups:
+
+    storage.refresh_statistics()
+    statistics = load_statistics(storage)
+"""
+
+from typing import Dict, NamedTuple, Optional
+
+import numpy
+import pandas
+
+from core.repository import rollups
+from core.repository.events import EventType
+
+EVENT_TYPES = [EventType.SUCCESS, EventType.FAILURE, EventType.HINT]
+
+SUCCESS, FAILURE, HINT = range(len(EVENT_TYPES))
+
+RETENTION_INTERVALS = dict(
+    zip(
+        ["< 1 ч", "< 1 дня", "< 7 дней", "< 30 дней", ">= 30 дней"],
+        rollups.RETENTION_BOUNDS + [numpy.inf],
+    )
+)
+
+ATTEMPTS = rollups.ATTEMPTS
+
+_CHUNK_SIZE = 500000
+
+# A column of a range of ids comes back as one string, parsed by NumPy.
+_SELECT_RANGE = "SELECT min(id), max(id) FROM events"
+_SELECT_EVENTS = (
+    "SELECT group_concat(record_id), group_concat(unicode(event_type)), "
+    "group_concat(created_on, '') FROM events "
+    "WHERE id >= ? AND id < ? AND record_id IS NOT NULL "
+    "AND event_type IS NOT NULL AND created_on IS NOT NULL"
+)
+_SELECT_TIMESTAMPS = (
+    "SELECT created_on FROM events "
+    "WHERE id >= ? AND id < ? AND record_id IS NOT NULL "
+    "AND event_type IS NOT NULL AND created_on IS NOT NULL ORDER BY id"
+)
+_TIMESTAMP_WIDTH = len("2021-11-29 10:00:00.000000")
+
+_CODES = numpy.zeros(128, dtype=numpy.int8)
+for _code, _type in enumerate(EVENT_TYPES):
+    _CODES[ord(_type.name[0])] = _code
+
+_SELECT_KEYS = "SELECT id, key FROM records"
+
+
+class Statistics(NamedTuple):
+    accuracy: pandas.DataFrame
+    learning_curve: pandas.DataFrame
+    retention: pandas.DataFrame
+    daily_activity: pandas.DataFrame
+
+
+def _parse_timestamps(cursor, start: int, stop: int, timestamps: str, count: int):
+    # Local time read as UTC, which keeps day boundaries local.
+    if len(timestamps) == count * _TIMESTAMP_WIDTH:
+        parsed = numpy.frombuffer(
+            timestamps.encode("ascii"), dtype=f"S{_TIMESTAMP_WIDTH}"
+        ).astype("datetime64[us]")
+    else:
+        # Not written by SQLAlchemy, read again a row at a time.
+        cursor.execute(_SELECT_TIMESTAMPS, (start, stop))
+        parsed = numpy.array(
+            [timestamp for timestamp, in cursor.fetchall()], dtype="datetime64[us]"
+        )
+
+    return parsed.astype("datetime64[s]").astype(numpy.int64)
+
+
+def load_events(storage, chunk_size: int = _CHUNK_SIZE) -> pandas.DataFrame:
+    """
+    Returns the events of `storage` in commit order as the columns
+    record_id, event_type (a code of EVENT_TYPES) and created_on (seconds).
+    """
+    record_ids, event_types, created_on = [], [], []
+
+    connection = storage.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        first, last = cursor.execute(_SELECT_RANGE).fetchone()
+        for start in range(first or 0, (last or -1) + 1, chunk_size):
+            ids, types, timestamps = cursor.execute(
+                _SELECT_EVENTS, (start, start + chunk_size)
+            ).fetchone()
+            if ids is None:
+                continue
+
+            record_ids.append(numpy.fromstring(ids, dtype=numpy.int32, sep=","))
+            event_types.append(
+                _CODES[numpy.fromstring(types, dtype=numpy.int64, sep=",")]
+            )
+            created_on.append(
+                _parse_timestamps(
+                    cursor=cursor,
+                    start=start,
+                    stop=start + chunk_size,
+                    timestamps=timestamps,
+                    count=len(record_ids[-1]),
+                )
+            )
+        cursor.close()
+    finally:
+        connection.close()
+
+    def column(chunks, dtype):
+        return numpy.concatenate(chunks) if chunks else numpy.empty(0, dtype=dtype)
+
+    return pandas.DataFrame(
+        {
+            "record_id": column(record_ids, numpy.int32),
+            "event_type": column(event_types, numpy.int8),
+            "created_on": column(created_on, numpy.int64),
+        }
+    )
+
+
+def load_keys(storage) -> Dict[int, str]:
+    connection = storage.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(_SELECT_KEYS)
+        keys = dict(cursor.fetchall())
+        cursor.close()
+    finally:
+        connection.close()
+
+    return keys
+
+
+def accuracy(
+    events: pandas.DataFrame, keys: Optional[Dict[int, str]] = None
+) -> pandas.DataFrame:
+    """
+    Successes, failures and hints per record, with the share of successful
+    answers, worst known records first.
+    """
+    record_ids = events["record_id"].to_numpy()
+    event_types = events["event_type"].to_numpy()
+    size = int(record_ids.max()) + 1 if len(record_ids) else 0
+
+    counts = {
+        name: numpy.bincount(record_ids[event_types == code], minlength=size)
+        for name, code in [
+            ("successes", SUCCESS),
+            ("failures", FAILURE),
+            ("hints", HINT),
+        ]
+    }
+    frame = pandas.DataFrame(counts)
+    frame.index.name = "record_id"
+
+    return _accuracy(frame=frame[frame.sum(axis=1) > 0], keys=keys)
+
+
+def _accuracy(
+    frame: pandas.DataFrame, keys: Optional[Dict[int, str]]
+) -> pandas.DataFrame:
+    answers = frame["successes"] + frame["failures"]
+    frame = frame.assign(
+        accuracy=(frame["successes"] / answers.where(answers > 0)).fillna(0.0)
+    )
+    if keys is not None:
+        frame.insert(0, "key", frame.index.map(keys))
+
+    return frame.sort_values(["accuracy", "failures"], ascending=[True, False])
+
+
+class _Answers(NamedTuple):
+    # Grouped by record, in commit order within a record.
+    is_success: numpy.ndarray
+    created_on: numpy.ndarray
+    is_first: numpy.ndarray
+
+
+def _answers_by_record(events: pandas.DataFrame) -> _Answers:
+    answers = events[events["event_type"].to_numpy() != HINT]
+    record_ids = answers["record_id"].to_numpy()
+
+    # Unique with the position in the low bits, so an unstable sort will do.
+    order = numpy.argsort(
+        (record_ids.astype(numpy.int64) << 32) | numpy.arange(len(record_ids))
+    )
+
+    record_ids = record_ids[order]
+    is_first = numpy.ones(len(record_ids), dtype=bool)
+    is_first[1:] = record_ids[1:] != record_ids[:-1]
+
+    return _Answers(
+        is_success=answers["event_type"].to_numpy()[order] == SUCCESS,
+        created_on=answers["created_on"].to_numpy()[order],
+        is_first=is_first,
+    )
+
+
+def learning_curve(
+    events: pandas.DataFrame, attempts: int = ATTEMPTS
+) -> pandas.DataFrame:
+    """
+    Share of successful answers by the number of the attempt at a record,
+    for the first `attempts` attempts.
+    """
+    return _learning_curve(answers=_answers_by_record(events=events), attempts=attempts)
+
+
+def _learning_curve(answers: _Answers, attempts: int) -> pandas.DataFrame:
+    positions = numpy.arange(len(answers.is_success))
+    starts = numpy.maximum.accumulate(numpy.where(answers.is_first, positions, 0))
+    attempt = positions - starts
+
+    kept = attempt < attempts
+    counts = numpy.bincount(attempt[kept], minlength=attempts)[:attempts]
+    successes = numpy.bincount(
+        attempt[kept], weights=answers.is_success[kept], minlength=attempts
+    )[:attempts]
+
+    return _curve(counts=counts, successes=successes)
+
+
+def _curve(counts: numpy.ndarray, successes: numpy.ndarray) -> pandas.DataFrame:
+    attempts = len(counts)
+    frame = pandas.DataFrame(
+        {
+            "answers": counts,
+            "accuracy": numpy.divide(
+                successes, counts, out=numpy.zeros(attempts), where=counts > 0
+            ),
+        },
+        index=pandas.RangeIndex(1, attempts + 1, name="attempt"),
+    )
+
+    return frame[frame["answers"] > 0]
+
+
+def retention(events: pandas.DataFrame) -> pandas.DataFrame:
+    """
+    Share of successful answers by the time passed since the previous
+    answer to the same record; first answers have nothing to recall.
+    """
+    return _retention(answers=_answers_by_record(events=events))
+
+
+def _retention(answers: _Answers) -> pandas.DataFrame:
+    repeated = ~answers.is_first
+    intervals = numpy.diff(answers.created_on, prepend=0)[repeated]
+    is_success = answers.is_success[repeated]
+
+    bounds = list(RETENTION_INTERVALS.values())
+    buckets = numpy.searchsorted(bounds, intervals, side="right")
+    counts = numpy.bincount(buckets, minlength=len(bounds))
+    successes = numpy.bincount(buckets, weights=is_success, minlength=len(bounds))
+
+    return _recall(counts=counts, successes=successes)
+
+
+def _recall(counts: numpy.ndarray, successes: numpy.ndarray) -> pandas.DataFrame:
+    return pandas.DataFrame(
+        {
+            "answers": counts,
+            "recall": numpy.divide(
+                successes, counts, out=numpy.zeros(len(counts)), where=counts > 0
+            ),
+        },
+        index=pandas.Index(list(RETENTION_INTERVALS), name="interval"),
+    )
+
+
+def daily_activity(events: pandas.DataFrame) -> pandas.DataFrame:
+    """
+    Successes, failures and hints per day, days without practice included.
+    """
+    if events.empty:
+        return _activity(first=0, counts=numpy.zeros((0, len(EVENT_TYPES)), int))
+
+    days = events["created_on"].to_numpy() // 86400
+    first = int(days.min())
+    size = int(days.max()) - first + 1
+
+    counts = numpy.bincount(
+        (days - first) * len(EVENT_TYPES) + events["event_type"].to_numpy(),
+        minlength=size * len(EVENT_TYPES),
+    ).reshape(size, len(EVENT_TYPES))
+
+    return _activity(first=first, counts=counts)
+
+
+def _activity(first: int, counts: numpy.ndarray) -> pandas.DataFrame:
+    days = pandas.to_datetime(numpy.arange(first, first + len(counts)), unit="D")
+
+    return pandas.DataFrame(
+        counts, columns=["successes", "failures", "hints"], index=days.rename("day")
+    )
+
+
+def compute(
+    events: pandas.DataFrame, keys: Optional[Dict[int, str]] = None
+) -> Statistics:
+    answers = _answers_by_record(events=events)
+
+    return Statistics(
+        accuracy=accuracy(events=events, keys=keys),
+        learning_curve=_learning_curve(answers=answers, attempts=ATTEMPTS),
+        retention=_retention(answers=answers),
+        daily_activity=daily_activity(events=events),
+    )
+
+
+def load_statistics(storage) -> Statistics:
+    """Reads the statistics from the rollup tables, as of their last update."""
+    with storage.engine.connect() as connection:
+        records = connection.execute(rollups.SELECT_RECORD_STATISTICS).fetchall()
+        days = connection.execute(rollups.SELECT_DAILY_STATISTICS).fetchall()
+        attempts = connection.execute(rollups.SELECT_ATTEMPT_STATISTICS).fetchall()
+        intervals = connection.execute(rollups.SELECT_RETENTION_STATISTICS).fetchall()
+
+    frame = pandas.DataFrame(
+        [row[2:] for row in records],
+        columns=["successes", "failures", "hints"],
+        index=pandas.Index([row[0] for row in records], name="record_id"),
+        dtype=numpy.int64,
+    )
+    keys = {row[0]: row[1] for row in records}
+
+    curve = numpy.zeros((2, ATTEMPTS))
+    for attempt, answers, successes in attempts:
+        curve[:, attempt - 1] = answers, successes
+
+    recall = numpy.zeros((2, len(RETENTION_INTERVALS)))
+    for interval, answers, successes in intervals:
+        recall[:, interval] = answers, successes
+
+    # Days without practice have no row in the rollup.
+    numbers = numpy.array([row[0] for row in days], dtype="datetime64[D]")
+    numbers = numbers.astype(numpy.int64)
+    first = int(numbers[0]) if days else 0
+    size = int(numbers[-1]) - first + 1 if days else 0
+    activity = numpy.zeros((size, len(EVENT_TYPES)), dtype=numpy.int64)
+    activity[numbers - first] = [row[1:] for row in days] or 0
+
+    return Statistics(
+        accuracy=_accuracy(frame=frame, keys=keys),
+        learning_curve=_curve(counts=curve[0].astype(numpy.int64), successes=curve[1]),
+        retention=_recall(counts=recall[0].astype(numpy.int64), successes=recall[1]),
+        daily_activity=_activity(first=first, counts=activity),
+    )
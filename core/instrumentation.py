@@ -0,0 +1,191 @@
+"""
+Opt-in timing of hot paths.
+
+Histograms of operation times and SQL statements, off unless
+RBOOST_INSTRUMENTATION is set or enable() is called.
+
+    with timer("quiz.check"):
+        ...
+
+    @timed("storage.getitem")
+    def __getitem__(self, key): ...
+
+    dump("instrumentation.json")
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 1-2-5 steps from 10 us to 10 s, then a last, unbounded bucket.
+BUCKETS = [
+    factor * 10.0**exponent for exponent in range(-5, 1) for factor in (1, 2, 5)
+] + [10.0]
+
+_enabled = os.environ.get("RBOOST_INSTRUMENTATION", "") not in ["", "0"]
+_histograms: Dict[str, "Histogram"] = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.queries = 0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Upper bound of the bucket holding the given fraction of calls, so an
+        estimate that is never below the real value.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return BUCKETS[index] if index < len(BUCKETS) else self.maximum
+
+        return self.maximum
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.count,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.percentile(0.50) * 1e6,
+            "p95_us": self.percentile(0.95) * 1e6,
+            "p99_us": self.percentile(0.99) * 1e6,
+            "max_us": self.maximum * 1e6,
+            "total_us": self.total * 1e6,
+            "queries": self.queries,
+            "buckets_us": {
+                (f"<={bound * 1e6:g}" if index < len(BUCKETS) else "inf"): count
+                for index, (bound, count) in enumerate(
+                    zip(BUCKETS + [None], self.counts)
+                )
+                if count
+            },
+        }
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+
+
+def _histogram(name: str) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms.setdefault(name, Histogram())
+
+    return histogram
+
+
+def _active() -> List[str]:
+    # Names of the operations running on this thread, innermost last.
+    if not hasattr(_local, "active"):
+        _local.active = []
+
+    return _local.active
+
+
+@contextmanager
+def timer(name: str):
+    if not _enabled:
+        yield
+        return
+
+    active = _active()
+    active.append(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        active.pop()
+        with _lock:
+            _histogram(name).add(elapsed)
+
+
+def timed(name: str):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+
+            with timer(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(connection, *_) -> None:
+    if _enabled:
+        connection.info.setdefault("instrumentation", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(connection, *_) -> None:
+    started = connection.info.get("instrumentation")
+    if not started:
+        return
+
+    elapsed = time.perf_counter() - started.pop()
+    with _lock:
+        _histogram("sql").add(elapsed)
+        # Nested operations each count the statements issued inside them.
+        for name in set(_active()):
+            _histogram(name).queries += 1
+
+
+def instrument_engine(engine) -> None:
+    # Imported here so that timing GUI code does not pull SQLAlchemy in.
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def snapshot() -> Dict[str, Dict]:
+    with _lock:
+        return {name: histogram.as_dict() for name, histogram in _histograms.items()}
+
+
+def dump(path: Optional[str] = None) -> str:
+    content = json.dumps(
+        {"created_on": time.time(), "operations": snapshot()}, indent=4, sort_keys=True
+    )
+    if path:
+        Path(path).write_text(content, encoding="utf-8")
+
+    return content
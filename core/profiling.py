@@ -0,0 +1,203 @@
+"""
+Whole-session profiling of all threads of the application:
+
+    ./boost --profile cprofile
+    RBOOST_PROFILE=sampling ./boost
+
+"cprofile" writes a pstats file, "sampling" a file for
+https://www.speedscope.app.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MODES = ["cprofile", "sampling"]
+
+EXTENSIONS = {"cprofile": ".pstats", "sampling": ".speedscope.json"}
+
+
+def mode_from_environment() -> Optional[str]:
+    """Mode requested by RBOOST_PROFILE; any other non-empty value is cprofile."""
+    value = os.environ.get("RBOOST_PROFILE", "")
+    if value in ["", "0"]:
+        return None
+
+    return value if value in MODES else "cprofile"
+
+
+def default_path(mode: str) -> str:
+    return time.strftime(f"boost-%Y%m%d-%H%M%S{EXTENSIONS[mode]}")
+
+
+class _Snapshot:
+    """
+    Stats of a profile still running in another thread, for pstats.Stats;
+    Profile.create_stats() would disable it.
+    """
+
+    def __init__(self, profile: cProfile.Profile) -> None:
+        self.profile = profile
+        self.stats = {}
+
+    def create_stats(self) -> None:
+        self.profile.snapshot_stats()
+        self.stats = self.profile.stats
+
+
+class ThreadsProfiler:
+    """
+    Runs cProfile in the thread that starts it and in every thread started
+    afterwards, and merges the profiles into one pstats file.
+    """
+
+    def __init__(self) -> None:
+        self.profiles: List[cProfile.Profile] = []
+
+    def start(self) -> None:
+        threading.setprofile(self.__profile_thread)
+        self.__profile_thread()
+
+    def stop(self) -> None:
+        threading.setprofile(None)
+        self.profiles[0].disable()
+
+    def __profile_thread(self, *args) -> None:
+        # Replaced by the enabled profile after the first call in a thread.
+        profile = cProfile.Profile()
+        self.profiles.append(profile)
+        profile.enable()
+
+    def dump(self, path: str) -> None:
+        snapshots = [_Snapshot(profile) for profile in self.profiles]
+        for snapshot in snapshots:
+            snapshot.create_stats()
+
+        pstats.Stats(
+            *[snapshot for snapshot in snapshots if snapshot.stats]
+        ).dump_stats(path)
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads, or of `thread_ids`, from a
+    background thread, one speedscope profile per thread.
+    """
+
+    def __init__(
+        self, interval: float = 0.001, thread_ids: Optional[Iterable[int]] = None
+    ):
+        self.interval = interval
+        self.thread_ids = None if thread_ids is None else set(thread_ids)
+
+        self.frames: List[Dict] = []
+        self.frame_indexes: Dict[Tuple[str, str, int], int] = {}
+        self.samples: Dict[int, List[List[int]]] = {}
+        self.weights: Dict[int, List[float]] = {}
+        self.thread_names: Dict[int, str] = {}
+
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(
+            target=self.__run, name="SamplingProfiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self.__started = time.perf_counter()
+        self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+        self.__duration = time.perf_counter() - self.__started
+
+    def __frame_index(self, frame) -> int:
+        code = frame.f_code
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self.frame_indexes.get(key)
+        if index is None:
+            index = self.frame_indexes[key] = len(self.frames)
+            self.frames.append({"name": key[0], "file": key[1], "line": key[2]})
+
+        return index
+
+    def __thread_name(self, thread_id: int) -> str:
+        name = self.thread_names.get(thread_id)
+        if name is None:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            name = self.thread_names[thread_id] = names.get(thread_id, str(thread_id))
+
+        return name
+
+    def __run(self) -> None:
+        own_id = threading.get_ident()
+
+        previous = time.perf_counter()
+        while not self.__stopped.wait(self.interval):
+            frames = sys._current_frames()
+            now = time.perf_counter()
+
+            for thread_id, frame in frames.items():
+                if thread_id == own_id or (
+                    self.thread_ids is not None and thread_id not in self.thread_ids
+                ):
+                    continue
+
+                stack = []
+                while frame is not None:
+                    stack.append(self.__frame_index(frame))
+                    frame = frame.f_back
+                stack.reverse()
+
+                # Weighted by the time since the previous sample.
+                self.__thread_name(thread_id)
+                self.samples.setdefault(thread_id, []).append(stack)
+                self.weights.setdefault(thread_id, []).append(now - previous)
+
+            previous = now
+
+    def dump(self, path: str, name: str = "boost") -> None:
+        # The main thread first, speedscope opens the first profile.
+        main_id = threading.main_thread().ident
+        thread_ids = sorted(self.samples, key=lambda thread_id: thread_id != main_id)
+
+        content = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "rboost",
+            "name": name,
+            "shared": {"frames": self.frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.thread_names[thread_id],
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.__duration,
+                    "samples": self.samples[thread_id],
+                    "weights": self.weights[thread_id],
+                }
+                for thread_id in thread_ids
+            ],
+        }
+        Path(path).write_text(json.dumps(content), encoding="utf-8")
+
+
+@contextmanager
+def profiled(mode: str, path: str):
+    """Profiles the threads while the block runs, then writes to `path`."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {MODES}")
+
+    profiler = ThreadsProfiler() if "cprofile" == mode else SamplingProfiler()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.dump(path=path)
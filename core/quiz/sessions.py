@@ -0,0 +1,143 @@
+import random
+from datetime import datetime
+from enum import Enum
+from itertools import cycle
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+from core.text import compare, mask_text
+
+
+class Order(Enum):
+    DIRECT = 0
+    REVERSE = 1
+    RANDOM = 2
+
+
+class Mode(Enum):
+    EXPRESSION = 0  # the meaning is shown, the expression is asked
+    MEANING = 1  # the expression is shown, the meaning is asked
+    MIXED = 2
+
+
+class Card(NamedTuple):
+    key: str
+    value: str
+    mode: Mode
+    hint: str
+
+
+class Result(NamedTuple):
+    is_correct: bool
+    correct_answer: str
+    user_answer: str
+
+
+class Deck:
+    """Values of the checked records of a deck, read up front."""
+
+    def __init__(self, repository, tags: Optional[str] = None) -> None:
+        self.tags = tags
+        self.values = dict(repository.checked_items(tags=tags))
+
+    def __getitem__(self, key: str) -> Optional[str]:
+        return self.values.get(key)
+
+    def checked_keys(self, tags: Optional[str] = None) -> List[str]:
+        return list(self.values)
+
+
+def _dispatch(function: Callable, **kwargs) -> None:
+    function(**kwargs)
+
+
+class QuizSession:
+    """
+    One pass over a deck of checked records. Cards are read from
+    `repository`, events go to `events` through `dispatch`.
+    """
+
+    EXPRESSION_THRESHOLD = 95
+    MEANING_THRESHOLD = 99
+
+    def __init__(
+        self,
+        repository,
+        order: Order = Order.DIRECT,
+        mode: Mode = Mode.EXPRESSION,
+        hints: float = 0,
+        deck: Optional[str] = None,
+        seed: Optional[int] = None,
+        dispatch: Callable = _dispatch,
+        events=None,
+    ) -> None:
+        self.repository = repository
+        self.events = events if events is not None else repository
+        self.order = Order(order)
+        self.mode = Mode(mode)
+        self.hints = hints
+        self.deck = deck
+        self.dispatch = dispatch
+        self.card: Optional[Card] = None
+
+        if seed is None:
+            seed = int(datetime.utcnow().timestamp())
+        self.random = random.Random(seed)
+
+        self.keys = self.repository.checked_keys(tags=deck)
+        if not self.keys:
+            raise RuntimeError(f"deck '{deck or ''}' has no checked records")
+
+        self.series = self._make_series(keys=self.keys)
+
+    def _make_series(self, keys: List[str]) -> Iterator[str]:
+        if Order.DIRECT == self.order:
+            return cycle(keys)
+
+        if Order.REVERSE == self.order:
+            return cycle(keys[::-1])
+
+        return iter(lambda: self.random.choice(keys), None)
+
+    def next_card(self) -> Card:
+        key = next(self.series)
+        value = self.repository[key]
+
+        mode = self.mode
+        if Mode.MIXED == mode:
+            mode = Mode.EXPRESSION if self.random.random() < 0.5 else Mode.MEANING
+
+        hidden = key if Mode.EXPRESSION == mode else value
+        self.card = Card(
+            key=key, value=value, mode=mode, hint=mask_text(hidden, self.hints)
+        )
+
+        return self.card
+
+    def submit(self, expression: str, meaning: str) -> Result:
+        key, value = self.card.key, self.card.value
+
+        if (
+            compare(key, expression) >= self.EXPRESSION_THRESHOLD
+            and compare(value, meaning) >= self.MEANING_THRESHOLD
+        ):
+            self.dispatch(self.events.commit_success_event, key=key)
+            return Result(is_correct=True, correct_answer="", user_answer="")
+
+        self.dispatch(self.events.commit_failure_event, key=key)
+
+        correct_answer = ""
+        user_answer = ""
+        if key != expression:
+            correct_answer = key
+            user_answer = expression
+
+        if value != meaning:
+            correct_answer = value
+            user_answer = meaning
+
+        return Result(
+            is_correct=False, correct_answer=correct_answer, user_answer=user_answer
+        )
+
+    def hint(self) -> None:
+        self.dispatch(self.events.commit_hint_event, key=self.card.key)
@@ -0,0 +1,136 @@
+from pytest import fixture, raises
+
+from core.quiz.sessions import Deck, Mode, Order, QuizSession
+from core.repository.models import Event
+from core.repository.repositories import Repository
+
+
+@fixture
+def repository():
+    repository = Repository(path=":memory:")
+
+    for key, value in [("foo", "spam"), ("bar", "eggs"), ("baz", "ham")]:
+        repository.storage[key] = value
+
+    return repository
+
+
+def _events(repository):
+    session = repository.storage.session_factory()
+    events = [
+        (event.record.key, event.event_type.name)
+        for event in session.query(Event).order_by(Event.id)
+    ]
+    session.close()
+
+    return events
+
+
+def test_if_can_cycle_in_order(repository):
+    session = QuizSession(repository=repository, order=Order.DIRECT)
+    assert [session.next_card().key for _ in range(4)] == ["foo", "bar", "baz", "foo"]
+
+    session = QuizSession(repository=repository, order=Order.REVERSE)
+    assert [session.next_card().key for _ in range(4)] == ["baz", "bar", "foo", "baz"]
+
+
+def test_if_can_draw_randomly_from_checked_records(repository):
+    repository.set_unchecked(key="bar")
+
+    session = QuizSession(repository=repository, order=Order.RANDOM, seed=42)
+    keys = {session.next_card().key for _ in range(50)}
+
+    assert keys == {"foo", "baz"}
+
+
+def test_if_can_mask_hidden_side(repository):
+    session = QuizSession(repository=repository, mode=Mode.EXPRESSION, hints=0)
+    card = session.next_card()
+    assert (card.key, card.value, card.mode, card.hint) == (
+        "foo",
+        "spam",
+        Mode.EXPRESSION,
+        "___",
+    )
+
+    session = QuizSession(repository=repository, mode=Mode.MEANING, hints=1)
+    card = session.next_card()
+    assert (card.mode, card.hint) == (Mode.MEANING, "spam")
+
+    session = QuizSession(repository=repository, mode=Mode.MIXED, seed=1)
+    modes = {session.next_card().mode for _ in range(20)}
+    assert modes == {Mode.EXPRESSION, Mode.MEANING}
+
+
+def test_if_can_grade_answers_and_log_events(repository):
+    session = QuizSession(repository=repository)
+
+    session.next_card()
+    result = session.submit(expression="Foo.", meaning="spam")
+    assert result.is_correct is True
+
+    session.next_card()
+    result = session.submit(expression="bar", meaning="egs")
+    assert (result.is_correct, result.correct_answer, result.user_answer) == (
+        False,
+        "eggs",
+        "egs",
+    )
+
+    session.next_card()
+    session.hint()
+
+    assert _events(repository) == [
+        ("foo", "SUCCESS"),
+        ("bar", "FAILURE"),
+        ("baz", "HINT"),
+    ]
+
+
+def test_if_can_dispatch_events_elsewhere(repository):
+    dispatched = []
+    session = QuizSession(
+        repository=repository,
+        dispatch=lambda function, **kwargs: dispatched.append(
+            (function.__name__, kwargs)
+        ),
+    )
+
+    session.next_card()
+    session.submit(expression="foo", meaning="spam")
+
+    assert dispatched == [("commit_success_event", {"key": "foo"})]
+    assert _events(repository) == []
+
+
+def test_if_can_scope_to_deck(repository):
+    repository.set_tags(key="baz", names=["food"])
+
+    session = QuizSession(repository=repository, deck="food")
+    assert {session.next_card().key for _ in range(3)} == {"baz"}
+
+    with raises(RuntimeError):
+        QuizSession(repository=repository, deck="missing")
+
+
+def test_if_can_draw_from_deck_read_up_front(repository):
+    repository.set_tags(key="baz", names=["food"])
+    deck = Deck(repository=repository, tags="food")
+    repository["baz"] = "spam"
+
+    session = QuizSession(repository=deck, deck="food", events=repository)
+    card = session.next_card()
+    assert (card.key, card.value) == ("baz", "ham")
+
+    session.submit(expression="baz", meaning="ham")
+    assert _events(repository) == [("baz", "SUCCESS")]
+
+    with raises(RuntimeError):
+        QuizSession(repository=Deck(repository=repository, tags="missing"))
+
+
+def test_if_keeps_events_even_when_empty(repository):
+    events = Repository(path=":memory:")
+
+    session = QuizSession(repository=repository, events=events)
+    assert session.events is events
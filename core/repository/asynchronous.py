@@ -0,0 +1,122 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple, Union
+
+from core.repository.repositories import Repository
+
+
+class AsyncRepository:
+    """
+    asyncio facade over Repository for headless services.
+
+    Calls are offloaded to threads: reads run concurrently on a pool of
+    `pool_size` threads, each with its own pooled SQLite connection, while
+    writes go through a single thread because SQLite allows one writer at a
+    time and Repository takes its backup on the first write.
+    """
+
+    def __init__(self, path: str, pool_size: int = 5) -> None:
+        self.repository = Repository(path=path, core_reads=True, pool_size=pool_size)
+
+        self._readers = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="AsyncRepositoryReader"
+        )
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AsyncRepositoryWriter"
+        )
+
+    async def __aenter__(self) -> "AsyncRepository":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.aclose()
+
+    @property
+    def path(self) -> str:
+        return self.repository.path
+
+    @property
+    def backup_path(self) -> Optional[str]:
+        return self.repository.backup_path
+
+    async def _read(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self._readers, functools.partial(function, *args, **kwargs)
+        )
+
+    async def _write(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self._writer, functools.partial(function, *args, **kwargs)
+        )
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await self._read(self.repository.__getitem__, key)
+
+    async def aset(self, key: Union[str, Tuple[str, str]], value: str) -> None:
+        await self._write(self.repository.__setitem__, key, value)
+
+    async def adel(self, key: str) -> None:
+        await self._write(self.repository.__delitem__, key)
+
+    async def alen(self) -> int:
+        return await self._read(self.repository.__len__)
+
+    async def akeys(self) -> List[str]:
+        return await self._read(self.repository.keys)
+
+    async def aitems(self) -> List[Tuple[str, Tuple[str, bool]]]:
+        return await self._read(self.repository.items)
+
+    async def ais_checked(self, key: str) -> bool:
+        return await self._read(self.repository.is_checked, key=key)
+
+    async def achecked_count(self) -> int:
+        return await self._read(self.repository.checked_count)
+
+    async def achecked_keys(self, tags: Optional[str] = None) -> List[str]:
+        return await self._read(self.repository.checked_keys, tags=tags)
+
+    async def achecked_items(self, tags: Optional[str] = None) -> List[Tuple[str, str]]:
+        return await self._read(self.repository.checked_items, tags=tags)
+
+    async def aset_checked(self, key: str) -> None:
+        await self._write(self.repository.set_checked, key=key)
+
+    async def aset_unchecked(self, key: str) -> None:
+        await self._write(self.repository.set_unchecked, key=key)
+
+    async def aset_checked_many(self, keys: Iterable[str], state: bool) -> None:
+        await self._write(
+            self.repository.set_checked_many, keys=list(keys), state=state
+        )
+
+    async def commit_success_event(self, key: str) -> None:
+        await self._write(self.repository.commit_success_event, key=key)
+
+    async def commit_failure_event(self, key: str) -> None:
+        await self._write(self.repository.commit_failure_event, key=key)
+
+    async def commit_hint_event(self, key: str) -> None:
+        await self._write(self.repository.commit_hint_event, key=key)
+
+    async def abackup(self) -> None:
+        await self._write(self.repository.backup)
+
+    async def arestore(self) -> None:
+        await self._write(self.repository.restore)
+
+    async def asave(self, path: Optional[str] = None) -> None:
+        await self._write(self.repository.save, path=path)
+
+    async def aclose(self) -> None:
+        # Let queued writes finish before the connections go away.
+        await self._write(lambda: None)
+
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        self.repository.storage.close()
@@ -0,0 +1,330 @@
+import functools
+import string
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple, Union
+
+from core.repository.repositories import Repository, Storage
+from core.repository.tables import RecordTable
+
+
+# Case folding of SQLite's LIKE, which only knows ASCII letters.
+_FOLD_ASCII = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class CachedRepository:
+    """
+    Write-through cache in front of a Repository, dropped whenever another
+    connection commits. Calls that touch the cache hold `lock`.
+    """
+
+    def __init__(self, repository: Repository) -> None:
+        self.repository = repository
+        self.lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._records = RecordTable()
+        self._is_complete = False
+        self._checked_count: Optional[int] = None
+        self._storage: Optional[Storage] = None
+        self._data_version = None
+
+        self.invalidate()
+
+    @_locked
+    def __getitem__(self, key: str) -> Optional[str]:
+        record = self._get(key=key)
+
+        return record[0] if record else None
+
+    @_locked
+    def __setitem__(self, key: Union[str, Tuple[str, str]], value: str) -> None:
+        self._validate()
+
+        self.repository[key] = value
+
+        if isinstance(key, tuple):
+            old_key, new_key = key
+            # Renamed in place, keys() keeps the id order.
+            self._records.rename(old_key=old_key, new_key=new_key)
+            key = new_key
+
+        self._refresh(key=key)
+        self._checked_count = None
+
+    @_locked
+    def __delitem__(self, key: str) -> None:
+        self._validate()
+
+        del self.repository[key]
+
+        self._records.pop(key)
+        self._checked_count = None
+
+    @_locked
+    def __len__(self) -> int:
+        self._validate()
+
+        if self._is_complete:
+            self.hits += 1
+            return len(self._records)
+
+        self.misses += 1
+        return len(self.repository)
+
+    @property
+    def path(self) -> str:
+        return self.repository.path
+
+    @property
+    def progress_path(self) -> Optional[str]:
+        return self.repository.progress_path
+
+    @property
+    def read_only(self) -> bool:
+        return self.repository.read_only
+
+    @property
+    def storage(self) -> Storage:
+        return self.repository.storage
+
+    @property
+    def backup_path(self) -> Optional[str]:
+        return self.repository.backup_path
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+
+        return self.hits / lookups if lookups else 0.0
+
+    @_locked
+    def is_checked(self, key: str) -> bool:
+        record = self._get(key=key)
+        if not record:
+            return self.repository.is_checked(key=key)
+
+        return record[1]
+
+    @_locked
+    def checked_count(self) -> int:
+        self._validate()
+
+        if self._checked_count is not None:
+            self.hits += 1
+        elif self._is_complete:
+            self.hits += 1
+            self._checked_count = self._records.checked_count()
+        else:
+            self.misses += 1
+            self._checked_count = self.repository.checked_count()
+
+        return self._checked_count
+
+    @_locked
+    def checked_keys(self, tags: Optional[str] = None) -> List[str]:
+        self._validate()
+
+        return self.repository.checked_keys(tags=tags)
+
+    @_locked
+    def checked_items(self, tags: Optional[str] = None) -> List[Tuple[str, str]]:
+        self._validate()
+
+        return self.repository.checked_items(tags=tags)
+
+    def tagged_keys(self, tags: str) -> List[str]:
+        return self.repository.tagged_keys(tags=tags)
+
+    def tags(self) -> List[str]:
+        return self.repository.tags()
+
+    def tags_of(self, key: str) -> List[str]:
+        return self.repository.tags_of(key=key)
+
+    @_locked
+    def set_tags(self, key: str, names: Iterable[str]) -> None:
+        self._validate()
+
+        self.repository.set_tags(key=key, names=names)
+
+    @_locked
+    def set_checked(self, key: str) -> None:
+        self._validate()
+
+        self.repository.set_checked(key=key)
+
+        self._set_state(key=key, is_checked=True)
+
+    @_locked
+    def set_unchecked(self, key: str) -> None:
+        self._validate()
+
+        self.repository.set_unchecked(key=key)
+
+        self._set_state(key=key, is_checked=False)
+
+    @_locked
+    def set_checked_many(self, keys: Iterable[str], state: bool) -> None:
+        self._validate()
+
+        keys = list(keys)
+        self.repository.set_checked_many(keys=keys, state=state)
+
+        for key in keys:
+            self._set_state(key=key, is_checked=state)
+
+    @_locked
+    def set_checked_all(self, state: bool) -> None:
+        self._validate()
+
+        self.repository.set_checked_all(state=state)
+
+        self._records.set_checked_all(is_checked=state)
+        self._checked_count = None
+
+    @_locked
+    def invert_checked(self) -> None:
+        self._validate()
+
+        self.repository.invert_checked()
+
+        self._records.invert_checked()
+        self._checked_count = None
+
+    @_locked
+    def set_checked_containing(self, text: str) -> None:
+        self._validate()
+
+        self.repository.set_checked_containing(text=text)
+
+        folded = text.translate(_FOLD_ASCII)
+        self._records.set_checked_where(
+            lambda key: folded in key.translate(_FOLD_ASCII)
+        )
+        self._checked_count = None
+
+    def backup(self) -> None:
+        self.repository.backup()
+
+    @_locked
+    def restore(self) -> None:
+        self.repository.restore()
+        self.invalidate()
+
+    @_locked
+    def load(
+        self, path: str, progress_path: Optional[str] = None, read_only: bool = False
+    ) -> None:
+        self.repository.load(
+            path=path, progress_path=progress_path, read_only=read_only
+        )
+        self.invalidate()
+
+    @_locked
+    def save(self, path: Optional[str] = None) -> None:
+        self.repository.save(path=path)
+        self.invalidate()
+
+    def compact(self, before: datetime, archive_path: Optional[str] = None) -> int:
+        return self.repository.compact(before=before, archive_path=archive_path)
+
+    @_locked
+    def keys(self) -> List[str]:
+        self._complete()
+
+        return self._records.keys()
+
+    @_locked
+    def items(self) -> List[Tuple[str, Tuple[str, bool]]]:
+        self._complete()
+
+        return [
+            (key, (value, is_checked))
+            for key, value, is_checked, _ in self._records.rows()
+        ]
+
+    def commit_success_event(self, key: str) -> None:
+        self.repository.commit_success_event(key=key)
+
+    def commit_failure_event(self, key: str) -> None:
+        self.repository.commit_failure_event(key=key)
+
+    def commit_hint_event(self, key: str) -> None:
+        self.repository.commit_hint_event(key=key)
+
+    @_locked
+    def invalidate(self) -> None:
+        self._records = RecordTable()
+        self._is_complete = False
+        self._checked_count = None
+        self._storage = self.repository.storage
+        self._data_version = self._storage.data_version()
+        self.invalidations += 1
+
+    @_locked
+    def is_stale(self) -> bool:
+        """Tells whether another connection has committed since the last read."""
+        storage = self.repository.storage
+
+        return (
+            storage is not self._storage or storage.data_version() != self._data_version
+        )
+
+    def _validate(self) -> None:
+        if self.is_stale():
+            self.invalidate()
+
+    def _get(self, key: str) -> Optional[Tuple[str, bool, int]]:
+        self._validate()
+
+        if key in self._records:
+            self.hits += 1
+            return self._records.get(key)
+
+        self.misses += 1
+        if self._is_complete:
+            return None
+
+        record = self.repository.storage.record(key=key)
+        if record:
+            self._records.set(key, *record)
+
+        return record
+
+    def _complete(self) -> None:
+        self._validate()
+
+        if self._is_complete:
+            self.hits += 1
+            return
+
+        self.misses += 1
+        self._records = self.repository.storage.snapshot()
+        self._is_complete = True
+
+    def _refresh(self, key: str) -> None:
+        record = self.repository.storage.record(key=key)
+        if record:
+            self._records.set(key, *record)
+
+    def _set_state(self, key: str, is_checked: bool) -> None:
+        was_checked = self._records.set_checked(key=key, is_checked=is_checked)
+        if was_checked is None:
+            self._checked_count = None
+            return
+
+        if self._checked_count is not None and was_checked != is_checked:
+            self._checked_count += 1 if is_checked else -1
@@ -6,8 +6,10 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
+    Table,
     Text,
 )
 from sqlalchemy.ext.declarative import declarative_base
@@ -17,6 +19,9 @@ from core.repository.events import EventType
 
 DeclarativeBase = declarative_base()
 
+# Below SQLITE_MAX_VARIABLE_NUMBER of older SQLite builds (999).
+CHUNK_SIZE = 900
+
 
 class BaseModel(DeclarativeBase):
     __abstract__ = True
@@ -25,6 +30,22 @@ class BaseModel(DeclarativeBase):
     updated_on = Column(DateTime(), default=datetime.now, onupdate=datetime.now)
 
 
+record_tags = Table(
+    "record_tags",
+    DeclarativeBase.metadata,
+    Column(
+        "record_id",
+        Integer(),
+        ForeignKey("records.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "tag_id", Integer(), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    ),
+    Index("ix_record_tags_tag_id_record_id", "tag_id", "record_id"),
+)
+
+
 class Event(BaseModel):
     __tablename__ = "events"
 
@@ -45,7 +66,90 @@ class Record(BaseModel):
 
     key = Column(String(length=256), unique=True, nullable=False)
     value = Column(Text(length=1024), nullable=False)
-    is_checked = Column(Boolean, default=True)
+    is_checked = Column(Boolean, default=True, index=True)
 
     def __repr__(self):
         return f"Record(id={self.id}, key={self.key}, value={self.value}, is_checked={self.is_checked})"
+
+
+class Tag(BaseModel):
+    __tablename__ = "tags"
+
+    id = Column(Integer(), primary_key=True)
+
+    name = Column(String(length=64), unique=True, nullable=False)
+    records = relationship(
+        "Record", secondary=record_tags, backref=backref("tags", order_by=name)
+    )
+
+    def __repr__(self):
+        return f"Tag(id={self.id}, name={self.name})"
+
+
+class Check(DeclarativeBase):
+    """
+    Check state of a record kept in a progress database rather than in the
+    dictionary, see core.repository.repositories.Storage; overrides
+    Record.is_checked.
+    """
+
+    __tablename__ = "checks"
+
+    record_id = Column(Integer(), ForeignKey("records.id"), primary_key=True)
+    is_checked = Column(Boolean, nullable=False)
+
+
+# Kept up to date by core.repository.rollups.
+
+
+class RecordStatistics(DeclarativeBase):
+    __tablename__ = "record_statistics"
+
+    record_id = Column(
+        Integer(), ForeignKey("records.id", ondelete="CASCADE"), primary_key=True
+    )
+    record = relationship(
+        "Record",
+        backref=backref("statistics", uselist=False, cascade="all, delete-orphan"),
+    )
+
+    successes = Column(Integer(), nullable=False, default=0)
+    failures = Column(Integer(), nullable=False, default=0)
+    hints = Column(Integer(), nullable=False, default=0)
+    last_answered_on = Column(DateTime())
+
+
+class DailyStatistics(DeclarativeBase):
+    __tablename__ = "daily_statistics"
+
+    day = Column(String(length=10), primary_key=True)
+
+    successes = Column(Integer(), nullable=False, default=0)
+    failures = Column(Integer(), nullable=False, default=0)
+    hints = Column(Integer(), nullable=False, default=0)
+
+
+class AttemptStatistics(DeclarativeBase):
+    __tablename__ = "attempt_statistics"
+
+    attempt = Column(Integer(), primary_key=True)
+
+    answers = Column(Integer(), nullable=False, default=0)
+    successes = Column(Integer(), nullable=False, default=0)
+
+
+class RetentionStatistics(DeclarativeBase):
+    __tablename__ = "retention_statistics"
+
+    interval = Column(Integer(), primary_key=True)
+
+    answers = Column(Integer(), nullable=False, default=0)
+    successes = Column(Integer(), nullable=False, default=0)
+
+
+class RollupState(DeclarativeBase):
+    __tablename__ = "rollup_state"
+
+    name = Column(String(length=32), primary_key=True)
+
+    last_event_id = Column(Integer(), nullable=False, default=0)
@@ -0,0 +1,535 @@
+"""
+Dictionary packs: a compact, read-only file format for distributing large
+dictionaries, opened with mmap instead of through SQLite.
+
+A pack is a sorted string table; all integers are little-endian:
+
+    header       magic, version, compression, number of records, records
+                 per block and number of tags, then the offset and length
+                 of each section below
+    keys         keys in sorted order, UTF-8, each followed by a NUL byte
+    offsets      u64 offset of every key in keys, then the length of keys
+    positions    u32 position of every key, in sorted order, in the order
+                 the dictionary was exported in
+    blocks       values in sorted order, UTF-8, each followed by a NUL byte,
+                 BLOCK_RECORDS to a block and every block compressed apart
+    index        u64 offset of every block in blocks, then its length
+    checked      a bit per record in export order, set for checked ones
+    tag_names    tag names in sorted order, UTF-8, each followed by a NUL
+    tag_bitmaps  a bitmap like checked for every tag name, in that order
+
+A record's position in export order plus one serves as its id.
+"""
+
+import functools
+import mmap
+import os
+import shutil
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import asc, select
+
+from core.instrumentation import timed
+from core.repository.models import CHUNK_SIZE, Record, Tag, record_tags
+from core.repository.tables import RecordTable
+from core.repository.tags import evaluate_tag_expression
+
+MAGIC = b"BOOSTPK\x00"
+VERSION = 1
+
+COMPRESSIONS = [None, "zlib", "zstd"]
+
+BLOCK_RECORDS = 64
+
+_SECTIONS = [
+    "keys",
+    "offsets",
+    "positions",
+    "blocks",
+    "index",
+    "checked",
+    "tag_names",
+    "tag_bitmaps",
+]
+_HEADER = struct.Struct("<8sHHIII" + "QQ" * len(_SECTIONS))
+_OFFSET = struct.Struct("<Q")
+_POSITION = struct.Struct("<I")
+
+_CACHED_BLOCKS = 32
+
+# Check states of the eight records of a bitmap byte.
+_BITS = [tuple(bool(byte >> bit & 1) for bit in range(8)) for byte in range(256)]
+
+
+_SELECT_TAGGED_KEYS = (
+    select(Tag.__table__.c.name, Record.__table__.c.key)
+    .select_from(
+        record_tags.join(Tag.__table__).join(
+            Record.__table__, Record.__table__.c.id == record_tags.c.record_id
+        )
+    )
+    .order_by(asc(Record.__table__.c.id))
+)
+_SELECT_IDS = select(Record.__table__.c.key, Record.__table__.c.id)
+
+
+def _codec(compression: Optional[str]) -> Tuple[Callable, Callable]:
+    if compression is None:
+        return bytes, bytes
+
+    if compression == "zlib":
+        return zlib.compress, zlib.decompress
+
+    if compression == "zstd":
+        # Optional, only packs made with it need it.
+        import zstandard
+
+        return (
+            zstandard.ZstdCompressor().compress,
+            lambda data: zstandard.ZstdDecompressor().decompress(data),
+        )
+
+    raise ValueError(f"unknown compression: '{compression}'")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def _native(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values
+
+
+def _terminated(strings: Iterable[str], what: str) -> List[bytes]:
+    encoded = []
+    for string in strings:
+        if "\0" in string:
+            raise ValueError(f"{what} must not contain NUL: '{string}'")
+        encoded.append(string.encode("utf-8") + b"\0")
+
+    return encoded
+
+
+def _bitmap(positions: Iterable[int], count: int) -> bytes:
+    bitmap = bytearray((count + 7) // 8)
+    for position in positions:
+        bitmap[position >> 3] |= 1 << (position & 7)
+
+    return bytes(bitmap)
+
+
+def _positions(mask: int) -> List[int]:
+    # Least significant bit first, i.e. in export order.
+    return [position for position, bit in enumerate(bin(mask)[:1:-1]) if bit == "1"]
+
+
+def is_pack(path: str) -> bool:
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_pack(
+    path: str,
+    records: List[Tuple[str, str, bool]],
+    tags: Optional[Dict[str, Iterable[str]]] = None,
+    compression: Optional[str] = "zlib",
+    block_records: int = BLOCK_RECORDS,
+) -> None:
+    """
+    Writes `records`, (key, value, is_checked) in the order to keep, and
+    `tags`, the keys by tag name, as a pack at `path`.
+    """
+    compress, _ = _codec(compression)
+    count = len(records)
+
+    keys = [key for key, _, _ in records]
+    order = sorted(range(count), key=keys.__getitem__)
+    encoded_keys = _terminated((keys[index] for index in order), what="keys")
+    values = _terminated((records[index][1] for index in order), what="values")
+
+    offsets = array("Q", [0])
+    for key in encoded_keys:
+        offsets.append(offsets[-1] + len(key))
+
+    blocks, index = [], array("Q", [0])
+    for start in range(0, count, block_records):
+        blocks.append(compress(b"".join(values[start : start + block_records])))
+        index.append(index[-1] + len(blocks[-1]))
+
+    tags = {name: set(tagged) for name, tagged in (tags or {}).items()}
+    names = sorted(tags)
+    positions_of = {key: position for position, key in enumerate(keys)}
+
+    sections = {
+        "keys": b"".join(encoded_keys),
+        "offsets": _little_endian(offsets),
+        "positions": _little_endian(array("I", order)),
+        "blocks": b"".join(blocks),
+        "index": _little_endian(index),
+        "checked": _bitmap(
+            (
+                position
+                for position, (_, _, is_checked) in enumerate(records)
+                if is_checked
+            ),
+            count=count,
+        ),
+        "tag_names": b"".join(_terminated(names, what="tag names")),
+        "tag_bitmaps": b"".join(
+            _bitmap((positions_of[key] for key in tags[name]), count=count)
+            for name in names
+        ),
+    }
+
+    locations = []
+    offset = _HEADER.size
+    for name in _SECTIONS:
+        locations += [offset, len(sections[name])]
+        offset += len(sections[name])
+
+    # Written aside and moved in place, so an open pack never changes.
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                COMPRESSIONS.index(compression),
+                count,
+                block_records,
+                len(names),
+                *locations,
+            )
+        )
+        for name in _SECTIONS:
+            file.write(sections[name])
+    os.replace(temporary_path, path)
+
+
+@timed("packs.export")
+def export_pack(
+    storage,
+    path: str,
+    compression: Optional[str] = "zlib",
+    block_records: int = BLOCK_RECORDS,
+) -> None:
+    """
+    Writes the records, check states and tags of a Storage as a pack.
+    """
+    records = [(key, value, is_checked) for key, (value, is_checked) in storage.items()]
+
+    tags: Dict[str, List[str]] = {}
+    with storage.engine.connect() as connection:
+        for name, key in connection.execute(_SELECT_TAGGED_KEYS):
+            tags.setdefault(name, []).append(key)
+
+    write_pack(
+        path=path,
+        records=records,
+        tags=tags,
+        compression=compression,
+        block_records=block_records,
+    )
+
+
+@timed("packs.import")
+def import_pack(path: str, storage) -> None:
+    """
+    Fills an empty Storage with the records, check states and tags of the
+    pack at `path`, in a single transaction.
+    """
+    if len(storage):
+        raise ValueError(f"dictionary '{storage.path}' is not empty")
+
+    pack = PackStorage(path=path)
+    try:
+        items = pack.items()
+        tags = {name: pack.tagged_keys(tags=name) for name in pack.tags()}
+    finally:
+        pack.close()
+
+    with storage.engine.begin() as connection:
+        for start in range(0, len(items), CHUNK_SIZE):
+            connection.execute(
+                Record.__table__.insert(),
+                [
+                    {"key": key, "value": value, "is_checked": is_checked}
+                    for key, (value, is_checked) in items[start : start + CHUNK_SIZE]
+                ],
+            )
+
+        ids = dict(connection.execute(_SELECT_IDS).fetchall())
+        for name, keys in tags.items():
+            tag_id = connection.execute(
+                Tag.__table__.insert(), {"name": name}
+            ).inserted_primary_key[0]
+            if keys:
+                connection.execute(
+                    record_tags.insert(),
+                    [{"record_id": ids[key], "tag_id": tag_id} for key in keys],
+                )
+
+
+class PackStorage:
+    """
+    The reading half of Storage over a mapped pack; any write raises
+    RuntimeError.
+    """
+
+    read_only = True
+    progress_path = None
+    core_reads = True
+    pool_size = None
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._map = None
+        self._block = None
+
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            header = _HEADER.unpack_from(self._map)
+        except (ValueError, struct.error):
+            header = None
+
+        if header is None or header[:2] != (MAGIC, VERSION):
+            self.close()
+            raise ValueError(f"not a dictionary pack: '{path}'")
+
+        _, _, compression, self._count, self._block_records, _ = header[:6]
+        locations = header[6:]
+        self._sections = {
+            name: (locations[2 * index], locations[2 * index + 1])
+            for index, name in enumerate(_SECTIONS)
+        }
+        _, self._decompress = _codec(COMPRESSIONS[compression])
+
+        self._names = self._strings("tag_names")
+        self._tag_rows = {name: row for row, name in enumerate(self._names)}
+        self._block = functools.lru_cache(maxsize=_CACHED_BLOCKS)(self._read_block)
+
+    def __getitem__(self, key: str) -> Optional[str]:
+        index = self._find(key=key)
+
+        return None if index is None else self._value(index=index)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _read_only(self, *_, **__) -> None:
+        raise RuntimeError(f"dictionary pack '{self.path}' is read-only")
+
+    __setitem__ = __delitem__ = set_tags = _read_only
+    set_checked = set_unchecked = set_checked_many = set_checked_all = _read_only
+    invert_checked = set_checked_containing = restore = _read_only
+    commit_success_event = commit_failure_event = commit_hint_event = _read_only
+    refresh_statistics = compact = _read_only
+
+    def _section(self, name: str) -> bytes:
+        offset, length = self._sections[name]
+
+        return self._map[offset : offset + length]
+
+    def _strings(self, name: str) -> List[str]:
+        return self._section(name).decode("utf-8").split("\0")[:-1]
+
+    def _key(self, index: int) -> bytes:
+        offsets, _ = self._sections["offsets"]
+        (start,) = _OFFSET.unpack_from(self._map, offsets + 8 * index)
+        (end,) = _OFFSET.unpack_from(self._map, offsets + 8 * index + 8)
+        keys, _ = self._sections["keys"]
+
+        return self._map[keys + start : keys + end - 1]
+
+    def _find(self, key: str) -> Optional[int]:
+        # Index of the key in sorted order.
+        encoded = key.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self._count and self._key(low) == encoded:
+            return low
+
+        return None
+
+    def _position(self, index: int) -> int:
+        positions, _ = self._sections["positions"]
+
+        return _POSITION.unpack_from(self._map, positions + 4 * index)[0]
+
+    def _read_block(self, block: int) -> List[str]:
+        index, _ = self._sections["index"]
+        (start,) = _OFFSET.unpack_from(self._map, index + 8 * block)
+        (end,) = _OFFSET.unpack_from(self._map, index + 8 * block + 8)
+        blocks, _ = self._sections["blocks"]
+
+        data = self._decompress(self._map[blocks + start : blocks + end])
+
+        return data.decode("utf-8").split("\0")[:-1]
+
+    def _value(self, index: int) -> str:
+        return self._block(index // self._block_records)[index % self._block_records]
+
+    def _is_checked(self, position: int) -> bool:
+        checked, _ = self._sections["checked"]
+
+        return bool(self._map[checked + (position >> 3)] >> (position & 7) & 1)
+
+    def _mask(self, name: str) -> int:
+        return int.from_bytes(self._section(name), "little")
+
+    def _tag_mask(self, name: str) -> int:
+        row = self._tag_rows.get(name)
+        if row is None:
+            return 0
+
+        size = (self._count + 7) // 8
+        bitmaps, _ = self._sections["tag_bitmaps"]
+        start = bitmaps + row * size
+
+        return int.from_bytes(self._map[start : start + size], "little")
+
+    def _sorted_records(self) -> Tuple[List[str], array]:
+        return self._strings("keys"), _native("I", self._section("positions"))
+
+    def _in_order(self, sorted_values: List, positions: array) -> List:
+        values = [None] * self._count
+        for value, position in zip(sorted_values, positions):
+            values[position] = value
+
+        return values
+
+    def _checked_states(self) -> List[bool]:
+        states = [bit for byte in self._section("checked") for bit in _BITS[byte]]
+
+        return states[: self._count]
+
+    @timed("packs.record")
+    def record(self, key: str) -> Optional[Tuple[str, bool, int]]:
+        index = self._find(key=key)
+        if index is None:
+            return None
+
+        position = self._position(index=index)
+
+        return self._value(index=index), self._is_checked(position), position + 1
+
+    def is_checked(self, key: str) -> bool:
+        record = self.record(key=key)
+        if record is None:
+            raise RuntimeError(f"Record with key='{key}' not found")
+
+        return record[1]
+
+    @timed("packs.keys")
+    def keys(self) -> List[str]:
+        keys, positions = self._sorted_records()
+
+        return self._in_order(keys, positions)
+
+    @timed("packs.items")
+    def items(self) -> List[Tuple[str, Tuple[str, bool]]]:
+        keys, positions = self._sorted_records()
+        blocks = (len(keys) + self._block_records - 1) // self._block_records
+        values = [value for block in range(blocks) for value in self._read_block(block)]
+
+        return list(
+            zip(
+                self._in_order(keys, positions),
+                zip(self._in_order(values, positions), self._checked_states()),
+            )
+        )
+
+    @timed("packs.snapshot")
+    def snapshot(self) -> RecordTable:
+        return RecordTable(
+            rows=(
+                (key, value, is_checked, position + 1)
+                for position, (key, (value, is_checked)) in enumerate(self.items())
+            )
+        )
+
+    def data_version(self) -> int:
+        # A pack never changes while it is open.
+        return 0
+
+    def checked_count(self) -> int:
+        return bin(self._mask("checked")).count("1")
+
+    def checked_keys(self, tags: Optional[str] = None) -> List[str]:
+        mask = self._mask("checked")
+        if tags:
+            mask &= self._evaluate(tags=tags)
+
+        return self._keys_of(mask=mask)
+
+    def checked_items(self, tags: Optional[str] = None) -> List[Tuple[str, str]]:
+        return [(key, self[key]) for key in self.checked_keys(tags=tags)]
+
+    def tagged_keys(self, tags: str) -> List[str]:
+        return self._keys_of(mask=self._evaluate(tags=tags))
+
+    def _evaluate(self, tags: str) -> int:
+        return evaluate_tag_expression(
+            expression=tags, masks=self._tag_mask, everything=(1 << self._count) - 1
+        )
+
+    def _keys_of(self, mask: int) -> List[str]:
+        if not mask:
+            return []
+
+        keys = self.keys()
+
+        return [keys[position] for position in _positions(mask=mask)]
+
+    def tags(self) -> List[str]:
+        return list(self._names)
+
+    def tags_of(self, key: str) -> List[str]:
+        index = self._find(key=key)
+        if index is None:
+            raise RuntimeError(f"Record with key='{key}' not found")
+
+        position = self._position(index=index)
+        size = (self._count + 7) // 8
+        bitmaps, _ = self._sections["tag_bitmaps"]
+
+        return [
+            name
+            for row, name in enumerate(self._names)
+            if self._map[bitmaps + row * size + (position >> 3)] >> (position & 7) & 1
+        ]
+
+    def dump(self, path: str) -> None:
+        if Path(self.path).resolve() != Path(path).resolve():
+            shutil.copyfile(self.path, path)
+
+    def close(self) -> None:
+        if self._block is not None:
+            self._block.cache_clear()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
@@ -1,25 +1,344 @@
-import shutil
+import csv
+import functools
+import gzip
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import List, Optional, Tuple, Union
-
-from sqlalchemy import asc, create_engine, func
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import (
+    Boolean,
+    asc,
+    bindparam,
+    create_engine,
+    delete,
+    event,
+    func,
+    not_,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 
+from core.instrumentation import instrument_engine, timed
+from core.repository import rollups
 from core.repository.events import EventType
-from core.repository.models import DeclarativeBase, Event, Record
+from core.repository.models import (
+    CHUNK_SIZE,
+    AttemptStatistics,
+    Check,
+    DailyStatistics,
+    DeclarativeBase,
+    Event,
+    Record,
+    RecordStatistics,
+    RetentionStatistics,
+    RollupState,
+    Tag,
+)
+from core.repository.packs import PackStorage, is_pack
+from core.repository.tables import RecordTable
+from core.repository.tags import compile_tag_expression
+
+# Built once, so that calls hit the engine's compiled-statement cache.
+_records = Record.__table__
+
+_SELECT_VALUE = select(_records.c.value).where(_records.c.key == bindparam("key"))
+_SELECT_RECORD = select(_records.c.value, _records.c.is_checked, _records.c.id).where(
+    _records.c.key == bindparam("key")
+)
+_SELECT_IS_CHECKED = select(_records.c.is_checked).where(
+    _records.c.key == bindparam("key")
+)
+_SELECT_COUNT = select(func.count(_records.c.id))
+# "is_checked = 1" rather than "IS true": only the former uses the index.
+_SELECT_CHECKED_COUNT = select(func.count(_records.c.id)).where(
+    _records.c.is_checked == true()
+)
+_SELECT_CHECKED_KEYS = (
+    select(_records.c.key)
+    .where(_records.c.is_checked == true())
+    .order_by(asc(_records.c.id))
+)
+_SELECT_CHECKED_ITEMS = (
+    select(_records.c.key, _records.c.value)
+    .where(_records.c.is_checked == true())
+    .order_by(asc(_records.c.id))
+)
+_SELECT_KEYS = select(_records.c.key).order_by(asc(_records.c.id))
+_SELECT_ITEMS = select(
+    _records.c.key, _records.c.value, _records.c.is_checked
+).order_by(asc(_records.c.id))
+_UPDATE_CHECKED = update(_records).values(is_checked=bindparam("state"))
+_UPDATE_CHECKED_MANY = _UPDATE_CHECKED.where(
+    _records.c.key.in_(bindparam("keys", expanding=True))
+)
+_INVERT_CHECKED = update(_records).values(is_checked=not_(_records.c.is_checked))
+# LIKE folds the case of ASCII letters only.
+_key_contains = _records.c.key.like(bindparam("pattern"), escape="\\")
+_UPDATE_CHECKED_CONTAINING = update(_records).values(is_checked=_key_contains)
+
+_events = Event.__table__
+
+_SELECT_NEWEST_EVENT_ID = select(func.max(_events.c.id))
+
+# The record is looked up within the INSERT rather than before it.
+_INSERT_EVENT = insert(_events).from_select(
+    ["event_type", "record_id", "created_on", "updated_on"],
+    select(
+        bindparam("event_type", type_=_events.c.event_type.type),
+        _records.c.id,
+        bindparam("now", type_=_events.c.created_on.type),
+        bindparam("now", type_=_events.c.updated_on.type),
+    ).where(_records.c.key == bindparam("key")),
+)
+
+# Old enough and already folded into the rollups.
+_COMPACTED_EVENTS = (_events.c.id <= bindparam("until")) & (
+    _events.c.created_on < bindparam("before")
+)
+_SELECT_COMPACTED_EVENTS = (
+    select(_events.c.id, _records.c.key, _events.c.event_type, _events.c.created_on)
+    .select_from(_events.outerjoin(_records))
+    .where(_COMPACTED_EVENTS)
+    .order_by(asc(_events.c.id))
+)
+_DELETE_COMPACTED_EVENTS = delete(_events).where(_COMPACTED_EVENTS)
+
+_ARCHIVE_HEADER = ["id", "key", "event_type", "created_on"]
+
+_SELECT_RECORDS = select(
+    _records.c.key, _records.c.value, _records.c.is_checked, _records.c.id
+).order_by(asc(_records.c.id))
+
+
+class _CheckStatements(NamedTuple):
+    select_record: object
+    select_is_checked: object
+    select_checked_count: object
+    select_checked_keys: object
+    select_checked_items: object
+    select_items: object
+    select_records: object
+    update_checked: object
+    update_checked_many: object
+    invert_checked: object
+    update_checked_containing: object
+
+
+_RECORD_CHECKS = _CheckStatements(
+    select_record=_SELECT_RECORD,
+    select_is_checked=_SELECT_IS_CHECKED,
+    select_checked_count=_SELECT_CHECKED_COUNT,
+    select_checked_keys=_SELECT_CHECKED_KEYS,
+    select_checked_items=_SELECT_CHECKED_ITEMS,
+    select_items=_SELECT_ITEMS,
+    select_records=_SELECT_RECORDS,
+    update_checked=_UPDATE_CHECKED,
+    update_checked_many=_UPDATE_CHECKED_MANY,
+    invert_checked=_INVERT_CHECKED,
+    update_checked_containing=_UPDATE_CHECKED_CONTAINING,
+)
+
+# With a progress database, check states go to its checks table.
+_checks = Check.__table__
+_with_checks = _records.outerjoin(_checks)
+_is_checked = func.coalesce(_checks.c.is_checked, _records.c.is_checked)
+_state = bindparam("state", type_=Boolean())
+
+
+def _upsert_checks(rows):
+    # "WHERE true" keeps SQLite from reading ON CONFLICT as a join clause.
+    statement = insert(_checks).from_select(
+        ["record_id", "is_checked"], rows.where(true())
+    )
+
+    return statement.on_conflict_do_update(
+        index_elements=[_checks.c.record_id],
+        set_={"is_checked": statement.excluded.is_checked},
+    )
+
+
+_PROGRESS_CHECKS = _CheckStatements(
+    select_record=select(_records.c.value, _is_checked, _records.c.id)
+    .select_from(_with_checks)
+    .where(_records.c.key == bindparam("key")),
+    select_is_checked=select(_is_checked)
+    .select_from(_with_checks)
+    .where(_records.c.key == bindparam("key")),
+    select_checked_count=select(func.count(_records.c.id))
+    .select_from(_with_checks)
+    .where(_is_checked == true()),
+    select_checked_keys=select(_records.c.key)
+    .select_from(_with_checks)
+    .where(_is_checked == true())
+    .order_by(asc(_records.c.id)),
+    select_checked_items=select(_records.c.key, _records.c.value)
+    .select_from(_with_checks)
+    .where(_is_checked == true())
+    .order_by(asc(_records.c.id)),
+    select_items=select(_records.c.key, _records.c.value, _is_checked)
+    .select_from(_with_checks)
+    .order_by(asc(_records.c.id)),
+    select_records=select(_records.c.key, _records.c.value, _is_checked, _records.c.id)
+    .select_from(_with_checks)
+    .order_by(asc(_records.c.id)),
+    update_checked=_upsert_checks(select(_records.c.id, _state)),
+    update_checked_many=_upsert_checks(
+        select(_records.c.id, _state).where(
+            _records.c.key.in_(bindparam("keys", expanding=True))
+        )
+    ),
+    invert_checked=_upsert_checks(
+        select(_records.c.id, not_(_is_checked)).select_from(_with_checks)
+    ),
+    update_checked_containing=_upsert_checks(select(_records.c.id, _key_contains)),
+)
+_DELETE_CHECK = delete(_checks).where(_checks.c.record_id == bindparam("record_id"))
+
+# Tables kept in a progress database; the others stay in the dictionary.
+_PROGRESS_TABLES = [
+    _events,
+    _checks,
+    RecordStatistics.__table__,
+    DailyStatistics.__table__,
+    AttemptStatistics.__table__,
+    RetentionStatistics.__table__,
+    RollupState.__table__,
+]
+_DICTIONARY_TABLES = [
+    table for table in DeclarativeBase.metadata.sorted_tables if table is not _checks
+]
+
+_INLINE_ROLLUP_EVENTS = 1000
+_ROLLUP_BATCH_EVENTS = 50000
+
+_POOL_SIZE = 2
+
+_BUSY_TIMEOUT = 5.0
+# A write that started as a read fails at once if another process committed.
+_BUSY_RETRIES = 5
+_BUSY_BACKOFF = 0.05
+
+
+def _retry_when_busy(method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        for attempt in range(_BUSY_RETRIES):
+            try:
+                return method(*args, **kwargs)
+            except OperationalError as error:
+                if "locked" not in str(error.orig) or attempt == _BUSY_RETRIES - 1:
+                    raise
+
+                time.sleep(_BUSY_BACKOFF * 2**attempt)
+
+    return wrapper
+
+
+def _writing(method):
+    # Writes share the watcher connection, see Storage.data_version().
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.watcher_lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _on_connect(connection, _) -> None:
+    # Not persistent, so it is set on every new connection.
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _attach_dictionary(path: str):
+    def attach(connection, _) -> None:
+        cursor = connection.cursor()
+        cursor.execute("ATTACH DATABASE ? AS content", (path,))
+        cursor.close()
+
+    return attach
+
+
+def _read_only_uri(path: str) -> str:
+    # The file must be checkpointed and must not change while it is open.
+    return f"{Path(path).resolve().as_uri()}?mode=ro&immutable=1"
+
+
+def _like_containing(text: str) -> str:
+    # Wildcards in the text stand for themselves.
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    return f"%{escaped}%"
+
+
+def delete_database(path: str) -> None:
+    # A stale -wal file would be replayed into a new database of the same name.
+    for suffix in ["", "-wal", "-shm"]:
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def _write_archive(path: str, rows, header: bool) -> None:
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        if header:
+            writer.writerow(_ARCHIVE_HEADER)
+        for id, key, event_type, created_on in rows:
+            writer.writerow(
+                [id, key, event_type.name if event_type else "", created_on]
+            )
 
 
 class Storage:
-    def __init__(self, path: Optional[str] = None) -> None:
+    """
+    A dictionary in an SQLite file at `path`.
+
+    With `progress_path`, events, statistics and check states go to a
+    database of their own, with the dictionary attached as "content". With
+    `read_only`, the dictionary is opened immutable and every write fails.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        core_reads: bool = False,
+        pool_size: Optional[int] = None,
+        progress_path: Optional[str] = None,
+        read_only: bool = False,
+    ) -> None:
         self.path = path or ":memory:"
+        self.core_reads = core_reads
+        self.pool_size = pool_size
+        self.progress_path = progress_path
+        self.read_only = read_only
+        self.checks = _RECORD_CHECKS
         self.url = None
         self.engine = None
         self.session_factory = None
+        self.writer = None
+        self.write_session_factory = None
+        self.watcher = None
+        self.watcher_lock = threading.RLock()
+        self.connect_hooks = []
 
         self.load(path=self.path)
 
+    @timed("storage.get")
     def __getitem__(self, key: str) -> Optional[str]:
+        if self.core_reads:
+            with self.engine.connect() as connection:
+                return connection.execute(_SELECT_VALUE, {"key": key}).scalar()
+
         session = self.session_factory()
         record = session.query(Record).filter(Record.key == key).one_or_none()
         value = record.value if record else None
@@ -27,8 +346,11 @@ class Storage:
 
         return value
 
+    @timed("storage.set")
+    @_retry_when_busy
+    @_writing
     def __setitem__(self, key: Union[str, Tuple[str, str]], value: str) -> None:
-        session = self.session_factory()
+        session = self.write_session_factory()
 
         if isinstance(key, str):
             record = session.query(Record).filter(Record.key == key).one_or_none()
@@ -55,16 +377,27 @@ class Storage:
         session.commit()
         session.close()
 
+    @timed("storage.delete")
+    @_retry_when_busy
+    @_writing
     def __delitem__(self, key: str) -> None:
-        session = self.session_factory()
+        session = self.write_session_factory()
 
         record = session.query(Record).filter(Record.key == key).one()
+        if self.progress_path:
+            # A record added later may get the same id.
+            session.execute(_DELETE_CHECK, {"record_id": record.id})
 
         session.delete(record)
         session.commit()
         session.close()
 
+    @timed("storage.len")
     def __len__(self) -> int:
+        if self.core_reads:
+            with self.engine.connect() as connection:
+                return connection.execute(_SELECT_COUNT).scalar()
+
         session = self.session_factory()
 
         count = session.query(func.count(Record.id)).scalar()
@@ -73,15 +406,94 @@ class Storage:
 
         return count
 
+    @timed("storage.commit_event")
+    @_retry_when_busy
+    @_writing
     def _commit_event(self, key: str, event_type: EventType) -> None:
-        session = self.session_factory()
-
-        record = session.query(Record).filter(Record.key == key).one()
-        event = Event(event_type=event_type, record=record)
+        with self.writer.begin() as connection:
+            result = connection.execute(
+                _INSERT_EVENT,
+                {"event_type": event_type, "key": key, "now": datetime.now()},
+            )
+            if not result.rowcount:
+                raise RuntimeError(f"Record with key='{key}' not found")
+
+            # In the same transaction, so statistics never miss the event.
+            rollups.catch_up(
+                connection,
+                until=result.lastrowid,
+                at_most=_INLINE_ROLLUP_EVENTS,
+                answered=EventType.HINT != event_type,
+            )
 
-        session.add(event)
-        session.commit()
-        session.close()
+    @timed("storage.refresh_statistics")
+    def refresh_statistics(self) -> int:
+        """Brings the rollups up to date, returns the number of events folded in."""
+        refreshed = 0
+        while True:
+            caught_up = self._refresh_statistics_batch()
+            if not caught_up:
+                return refreshed
+
+            refreshed += caught_up
+
+    @_retry_when_busy
+    @_writing
+    def _refresh_statistics_batch(self) -> int:
+        # A transaction per batch, not to hold the write lock for long.
+        with self.writer.begin() as connection:
+            return rollups.catch_up(connection, batch=_ROLLUP_BATCH_EVENTS)
+
+    @timed("storage.compact")
+    def compact(self, before: datetime, archive_path: Optional[str] = None) -> int:
+        """
+        Removes the events committed before `before` but the newest one, which
+        stay counted in the rollups, optionally appending them to the gzipped
+        CSV file at `archive_path`; returns the number of removed events.
+        """
+        self.refresh_statistics()
+
+        removed = self._remove_events(before=before, archive_path=archive_path)
+        if removed:
+            self.vacuum()
+
+        return removed
+
+    @_retry_when_busy
+    @_writing
+    def _remove_events(self, before: datetime, archive_path: Optional[str]) -> int:
+        # Appended only once the events are gone, so a retry archives nothing twice.
+        temporary_path = f"{archive_path}.tmp" if archive_path else None
+
+        with self.writer.begin() as connection:
+            # Kept, so that its id is not handed out again.
+            newest = connection.execute(_SELECT_NEWEST_EVENT_ID).scalar() or 0
+            parameters = {
+                "until": min(rollups.last_event_id(connection), newest - 1),
+                "before": before,
+            }
+            if temporary_path:
+                _write_archive(
+                    path=temporary_path,
+                    rows=connection.execute(_SELECT_COMPACTED_EVENTS, parameters),
+                    header=not Path(archive_path).is_file(),
+                )
+            removed = connection.execute(_DELETE_COMPACTED_EVENTS, parameters).rowcount
+
+        if temporary_path:
+            with open(archive_path, "ab") as archive:
+                archive.write(Path(temporary_path).read_bytes())
+            os.remove(temporary_path)
+
+        return removed
+
+    @timed("storage.vacuum")
+    @_writing
+    def vacuum(self) -> None:
+        with self.writer.connect() as connection:
+            connection.exec_driver_sql("VACUUM")
+            if self.path != ":memory:":
+                connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
 
     def commit_success_event(self, key: str) -> None:
         self._commit_event(key=key, event_type=EventType.SUCCESS)
@@ -92,7 +504,45 @@ class Storage:
     def commit_hint_event(self, key: str) -> None:
         self._commit_event(key=key, event_type=EventType.HINT)
 
+    @timed("storage.record")
+    def record(self, key: str) -> Optional[Tuple[str, bool, int]]:
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                self.checks.select_record, {"key": key}
+            ).one_or_none()
+
+        return tuple(row) if row else None
+
+    @timed("storage.snapshot")
+    def snapshot(self) -> RecordTable:
+        with self.engine.connect() as connection:
+            return RecordTable(rows=connection.execute(self.checks.select_records))
+
+    def data_version(self) -> int:
+        """
+        Changes whenever another connection has committed. It is asked on the
+        connection the storage writes through, so its own commits do not count.
+        """
+        with self.watcher_lock:
+            cursor = self._watcher_connection().cursor()
+            cursor.execute("PRAGMA data_version")
+            (version,) = cursor.fetchone()
+            if self.progress_path:
+                # Both only ever count up.
+                cursor.execute("PRAGMA content.data_version")
+                version += cursor.fetchone()[0]
+            cursor.close()
+
+        return version
+
+    @timed("storage.is_checked")
     def is_checked(self, key: str) -> bool:
+        if self.core_reads or self.progress_path:
+            with self.engine.connect() as connection:
+                return connection.execute(
+                    self.checks.select_is_checked, {"key": key}
+                ).scalar_one()
+
         session = self.session_factory()
 
         record = session.query(Record).filter(Record.key == key).one()
@@ -101,9 +551,81 @@ class Storage:
 
         return record.is_checked
 
-    def set_checked(self, key: str) -> None:
+    @timed("storage.checked_count")
+    def checked_count(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(self.checks.select_checked_count).scalar()
+
+    @timed("storage.checked_keys")
+    def checked_keys(self, tags: Optional[str] = None) -> List[str]:
+        statement = self.checks.select_checked_keys
+        if tags:
+            statement = statement.where(compile_tag_expression(expression=tags))
+
+        with self.engine.connect() as connection:
+            return connection.execute(statement).scalars().all()
+
+    @timed("storage.checked_items")
+    def checked_items(self, tags: Optional[str] = None) -> List[Tuple[str, str]]:
+        statement = self.checks.select_checked_items
+        if tags:
+            statement = statement.where(compile_tag_expression(expression=tags))
+
+        with self.engine.connect() as connection:
+            return [tuple(row) for row in connection.execute(statement)]
+
+    @timed("storage.tagged_keys")
+    def tagged_keys(self, tags: str) -> List[str]:
+        statement = _SELECT_KEYS.where(compile_tag_expression(expression=tags))
+
+        with self.engine.connect() as connection:
+            return connection.execute(statement).scalars().all()
+
+    @timed("storage.tags")
+    def tags(self) -> List[str]:
+        session = self.session_factory()
+
+        names = [name for name, in session.query(Tag.name).order_by(asc(Tag.name))]
+
+        session.close()
+
+        return names
+
+    @timed("storage.tags_of")
+    def tags_of(self, key: str) -> List[str]:
         session = self.session_factory()
 
+        record = session.query(Record).filter(Record.key == key).one()
+        names = [tag.name for tag in record.tags]
+
+        session.close()
+
+        return names
+
+    @timed("storage.set_tags")
+    @_retry_when_busy
+    @_writing
+    def set_tags(self, key: str, names: Iterable[str]) -> None:
+        session = self.write_session_factory()
+
+        names = sorted({name.strip() for name in names if name.strip()})
+        record = session.query(Record).filter(Record.key == key).one()
+        tags = {tag.name: tag for tag in session.query(Tag).filter(Tag.name.in_(names))}
+        record.tags = [tags.get(name) or Tag(name=name) for name in names]
+
+        session.add(record)
+        session.commit()
+        session.close()
+
+    @timed("storage.set_checked")
+    @_retry_when_busy
+    @_writing
+    def set_checked(self, key: str) -> None:
+        if self.progress_path:
+            return self.set_checked_many(keys=[key], state=True)
+
+        session = self.write_session_factory()
+
         record = session.query(Record).filter(Record.key == key).one()
         record.is_checked = True
 
@@ -111,8 +633,14 @@ class Storage:
         session.commit()
         session.close()
 
+    @timed("storage.set_unchecked")
+    @_retry_when_busy
+    @_writing
     def set_unchecked(self, key: str) -> None:
-        session = self.session_factory()
+        if self.progress_path:
+            return self.set_checked_many(keys=[key], state=False)
+
+        session = self.write_session_factory()
 
         record = session.query(Record).filter(Record.key == key).one()
         record.is_checked = False
@@ -121,22 +649,220 @@ class Storage:
         session.commit()
         session.close()
 
+    @timed("storage.set_checked_many")
+    @_retry_when_busy
+    @_writing
+    def set_checked_many(self, keys: Iterable[str], state: bool) -> None:
+        keys = list(keys)
+        with self.writer.begin() as connection:
+            for offset in range(0, len(keys), CHUNK_SIZE):
+                chunk = keys[offset : offset + CHUNK_SIZE]
+                connection.execute(
+                    self.checks.update_checked_many, {"keys": chunk, "state": state}
+                )
+
+    @timed("storage.set_checked_all")
+    @_retry_when_busy
+    @_writing
+    def set_checked_all(self, state: bool) -> None:
+        with self.writer.begin() as connection:
+            connection.execute(self.checks.update_checked, {"state": state})
+
+    @timed("storage.invert_checked")
+    @_retry_when_busy
+    @_writing
+    def invert_checked(self) -> None:
+        with self.writer.begin() as connection:
+            connection.execute(self.checks.invert_checked)
+
+    @timed("storage.set_checked_containing")
+    @_retry_when_busy
+    @_writing
+    def set_checked_containing(self, text: str) -> None:
+        """Checks the records whose keys contain `text`, unchecks the others."""
+        with self.writer.begin() as connection:
+            connection.execute(
+                self.checks.update_checked_containing,
+                {"pattern": _like_containing(text)},
+            )
+
+    def _watcher_connection(self):
+        # Outside the pool, hooked up like the pooled connections.
+        if not self.watcher:
+            arguments, options = self.engine.dialect.create_connect_args(
+                self.engine.url
+            )
+            options["check_same_thread"] = False
+            options["timeout"] = _BUSY_TIMEOUT
+            options["uri"] = self.read_only
+            self.watcher = self.engine.dialect.connect(*arguments, **options)
+
+            for hook in self.connect_hooks:
+                hook(self.watcher, None)
+
+        return self.watcher
+
+    def close(self) -> None:
+        with self.watcher_lock:
+            if self.writer and self.writer is not self.engine:
+                self.writer.dispose()
+            if self.watcher:
+                self.watcher.close()
+                self.watcher = None
+
+        if self.engine:
+            self.engine.dispose()
+
+    @timed("storage.load")
     def load(self, path: str) -> None:
+        self.close()
+
         self.path = path
-        self.url = f"sqlite:///{self.path if self.path == ':memory:' else Path(self.path).resolve()}"
-        self.engine = create_engine(url=self.url)
+        if self.read_only and self.path == ":memory:":
+            raise ValueError("a read-only dictionary requires a database file")
+
+        main_path = self.path
+        if self.progress_path:
+            if ":memory:" in [self.path, self.progress_path]:
+                raise ValueError("a progress database requires database files")
+
+            # Brought up to date on its own, then only attached.
+            if not self.read_only:
+                Storage(path=self.path).close()
+            main_path = self.progress_path
+
+        if self.read_only and not self.progress_path:
+            self.url = f"sqlite:///{_read_only_uri(path=self.path)}&uri=true"
+        else:
+            self.url = f"sqlite:///{main_path if main_path == ':memory:' else Path(main_path).resolve()}"
+        # Connections may be used from a worker thread, see gui.workers.
+        options = {}
+        if self.pool_size:
+            # Every pooled connection to ":memory:" would be a separate database.
+            if self.path == ":memory:":
+                raise ValueError("connection pooling requires a database file")
+
+            options = {
+                "poolclass": QueuePool,
+                "pool_size": self.pool_size,
+                "max_overflow": 0,
+            }
+        elif self.path != ":memory:":
+            # NullPool, the default for files, would connect for every read.
+            options = {
+                "poolclass": QueuePool,
+                "pool_size": _POOL_SIZE,
+                "max_overflow": -1,
+            }
+
+        self.engine = create_engine(
+            url=self.url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": _BUSY_TIMEOUT,
+                # Lets a read-only dictionary be attached by its URI.
+                "uri": self.read_only,
+            },
+            **options,
+        )
         self.session_factory = sessionmaker(bind=self.engine)
+        instrument_engine(self.engine)
+
+        # Every ":memory:" connection is a database of its own.
+        self.writer = self.engine
+        if main_path != ":memory:":
+            # Not the bound method: SQLAlchemy tests its __self__ for truth.
+            self.writer = create_engine(
+                url=self.url,
+                creator=lambda: self._watcher_connection(),
+                poolclass=StaticPool,
+            )
+            instrument_engine(self.writer)
+        self.write_session_factory = sessionmaker(bind=self.writer)
+
+        self.connect_hooks = []
+        self.checks = _RECORD_CHECKS
+        if self.progress_path:
+            self._listen(_attach_dictionary(path=self._dictionary_name()))
+            self.checks = _PROGRESS_CHECKS
+        elif self.read_only:
+            return
 
-        DeclarativeBase.metadata.create_all(bind=self.engine)
+        if main_path != ":memory:":
+            # Listened to first, the connection below stays in the pool.
+            self._listen(_on_connect)
+            # Readers and the writer do not block each other.
+            with self.engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+        if self.progress_path:
+            DeclarativeBase.metadata.create_all(
+                bind=self.engine, tables=_PROGRESS_TABLES
+            )
+            return
 
+        DeclarativeBase.metadata.create_all(bind=self.engine, tables=_DICTIONARY_TABLES)
+
+        # create_all() skips the indexes of tables that already exist.
+        for index in Record.__table__.indexes:
+            index.create(bind=self.engine, checkfirst=True)
+
+    def _listen(self, hook) -> None:
+        event.listen(self.engine, "connect", hook)
+        self.connect_hooks.append(hook)
+
+    def _dictionary_name(self) -> str:
+        # As it is attached to a progress database.
+        if self.read_only:
+            return _read_only_uri(path=self.path)
+
+        return str(Path(self.path).resolve())
+
+    @timed("storage.dump")
     def dump(self, path: str) -> None:
-        if Path(self.path) == Path(path):
+        if (
+            self.path != ":memory:"
+            and Path(self.path).resolve() == Path(path).resolve()
+        ):
             return
 
+        # Unlike a file copy, includes the pages still in the WAL file.
         Path(path).unlink(missing_ok=True)
-        shutil.copy(self.path, path)
-
+        destination = sqlite3.connect(path)
+        source = self.engine.raw_connection()
+        try:
+            # Only the dictionary, progress stays where it is.
+            source.connection.backup(
+                destination, name="content" if self.progress_path else "main"
+            )
+        finally:
+            source.close()
+            destination.close()
+
+    @timed("storage.restore")
+    @_retry_when_busy
+    def restore(self, path: str) -> None:
+        # One transaction, so others see either the old or the restored data.
+        source = sqlite3.connect(path)
+        if self.progress_path:
+            # The backup API only writes to a main database.
+            destination = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT)
+            target = destination
+        else:
+            destination = self.engine.raw_connection()
+            target = destination.connection
+        try:
+            source.backup(target)
+        finally:
+            destination.close()
+            source.close()
+
+    @timed("storage.keys")
     def keys(self) -> List[str]:
+        if self.core_reads:
+            with self.engine.connect() as connection:
+                return connection.execute(_SELECT_KEYS).scalars().all()
+
         session = self.session_factory()
 
         keys = []
@@ -147,7 +873,17 @@ class Storage:
 
         return keys
 
+    @timed("storage.items")
     def items(self) -> List[Tuple[str, Tuple[str, bool]]]:
+        if self.core_reads or self.progress_path:
+            with self.engine.connect() as connection:
+                return [
+                    (key, (value, is_checked))
+                    for key, value, is_checked in connection.execute(
+                        self.checks.select_items
+                    )
+                ]
+
         session = self.session_factory()
 
         items = [
@@ -164,9 +900,45 @@ class Storage:
             self.__delitem__(key=key)
 
 
+def _open_storage(
+    path: str,
+    core_reads: bool,
+    pool_size: Optional[int],
+    progress_path: Optional[str],
+    read_only: bool,
+) -> Union[Storage, PackStorage]:
+    # Packs are read with mmap, and neither have pools nor keep progress.
+    if is_pack(path):
+        if progress_path:
+            raise ValueError("a dictionary pack cannot keep progress")
+
+        return PackStorage(path=path)
+
+    return Storage(
+        path=path,
+        core_reads=core_reads,
+        pool_size=pool_size,
+        progress_path=progress_path,
+        read_only=read_only,
+    )
+
+
 class Repository:
-    def __init__(self, path: str):
-        self.storage: Storage = Storage(path=path)
+    def __init__(
+        self,
+        path: str,
+        core_reads: bool = False,
+        pool_size: Optional[int] = None,
+        progress_path: Optional[str] = None,
+        read_only: bool = False,
+    ):
+        self.storage: Union[Storage, PackStorage] = _open_storage(
+            path=path,
+            core_reads=core_reads,
+            pool_size=pool_size,
+            progress_path=progress_path,
+            read_only=read_only,
+        )
         self.backup_path = None
 
     def __getitem__(self, key: str) -> Optional[str]:
@@ -193,16 +965,61 @@ class Repository:
     def path(self) -> str:
         return self.storage.path
 
+    @property
+    def progress_path(self) -> Optional[str]:
+        return self.storage.progress_path
+
+    @property
+    def read_only(self) -> bool:
+        return self.storage.read_only
+
     def is_checked(self, key: str) -> bool:
         return self.storage.is_checked(key=key)
 
+    def checked_count(self) -> int:
+        return self.storage.checked_count()
+
+    def checked_keys(self, tags: Optional[str] = None) -> List[str]:
+        return self.storage.checked_keys(tags=tags)
+
+    def checked_items(self, tags: Optional[str] = None) -> List[Tuple[str, str]]:
+        return self.storage.checked_items(tags=tags)
+
+    def tagged_keys(self, tags: str) -> List[str]:
+        return self.storage.tagged_keys(tags=tags)
+
+    def tags(self) -> List[str]:
+        return self.storage.tags()
+
+    def tags_of(self, key: str) -> List[str]:
+        return self.storage.tags_of(key=key)
+
+    def set_tags(self, key: str, names: Iterable[str]) -> None:
+        self.storage.set_tags(key=key, names=names)
+
     def set_checked(self, key: str) -> None:
         self.storage.set_checked(key=key)
 
     def set_unchecked(self, key: str) -> None:
         self.storage.set_unchecked(key=key)
 
+    def set_checked_many(self, keys: Iterable[str], state: bool) -> None:
+        self.storage.set_checked_many(keys=keys, state=state)
+
+    def set_checked_all(self, state: bool) -> None:
+        self.storage.set_checked_all(state=state)
+
+    def invert_checked(self) -> None:
+        self.storage.invert_checked()
+
+    def set_checked_containing(self, text: str) -> None:
+        self.storage.set_checked_containing(text=text)
+
     def backup(self) -> None:
+        # Nothing to undo in a dictionary that cannot change.
+        if self.read_only:
+            return
+
         backup_file = NamedTemporaryFile("w+")
         backup_path = backup_file.name
         backup_file.close()
@@ -214,12 +1031,22 @@ class Repository:
         if not self.backup_path:
             return
 
-        shutil.copy(self.backup_path, self.storage.path)
+        self.storage.restore(path=self.backup_path)
         Path(self.backup_path).unlink(missing_ok=True)
         self.backup_path = None
 
-    def load(self, path: str) -> None:
-        self.storage = Storage(path=path)
+    def load(
+        self, path: str, progress_path: Optional[str] = None, read_only: bool = False
+    ) -> None:
+        storage = _open_storage(
+            path=path,
+            core_reads=self.storage.core_reads,
+            pool_size=self.storage.pool_size,
+            progress_path=progress_path,
+            read_only=read_only,
+        )
+        self.storage.close()
+        self.storage = storage
         self.backup_path = None
 
     def save(self, path: Optional[str] = None) -> None:
@@ -232,19 +1059,28 @@ class Repository:
         source = str(Path(self.storage.path).resolve())
         destination = str(Path(path).resolve())
         if source != destination:
-            shutil.copy(source, destination)
+            self.storage.dump(path=destination)
 
         self.storage.path = destination
         if self.backup_path:
             Path(self.backup_path).unlink(missing_ok=True)
             self.backup_path = None
 
+    def compact(self, before: datetime, archive_path: Optional[str] = None) -> int:
+        if not self.backup_path:
+            self.backup()
+
+        return self.storage.compact(before=before, archive_path=archive_path)
+
     def keys(self) -> List[str]:
         return self.storage.keys()
 
     def items(self) -> List[Tuple[str, Tuple[str, bool]]]:
         return self.storage.items()
 
+    def snapshot(self) -> RecordTable:
+        return self.storage.snapshot()
+
     def commit_success_event(self, key: str) -> None:
         self.storage.commit_success_event(key=key)
 
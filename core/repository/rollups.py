@@ -0,0 +1,182 @@
+"""
+Per-record, per-day, per-attempt and per-interval counters over the events
+table, brought up to date incrementally from the id of the last event they
+include.
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import text
+
+ATTEMPTS = 20
+
+# Upper bounds in seconds; longer intervals fall into a last bucket.
+RETENTION_BOUNDS: List[int] = [3600, 86400, 7 * 86400, 30 * 86400]
+
+_NAME = "statistics"
+
+_SELECT_LAST_EVENT_ID = text(
+    "SELECT last_event_id FROM rollup_state WHERE name = :name"
+).bindparams(name=_NAME)
+
+_SELECT_MAX_EVENT_ID = text("SELECT max(id) FROM events")
+
+_SET_LAST_EVENT_ID = text(
+    "INSERT INTO rollup_state (name, last_event_id) VALUES (:name, :until) "
+    "ON CONFLICT (name) DO UPDATE SET last_event_id = excluded.last_event_id"
+).bindparams(name=_NAME)
+
+# Runs before _ROLLUP_RECORDS, which moves the counts on.
+_ROLLUP_ATTEMPTS = text(
+    f"""
+    INSERT INTO attempt_statistics (attempt, answers, successes)
+    SELECT attempt, count(*), sum(is_success) FROM (
+        SELECT
+            coalesce(statistics.successes + statistics.failures, 0)
+                + row_number() OVER (
+                    PARTITION BY events.record_id ORDER BY events.id
+                ) AS attempt,
+            events.event_type = 'SUCCESS' AS is_success
+        FROM events
+        LEFT JOIN record_statistics AS statistics
+            ON statistics.record_id = events.record_id
+        WHERE events.id > :last AND events.id <= :until
+            AND events.record_id IS NOT NULL AND events.event_type != 'HINT'
+    )
+    WHERE attempt <= {ATTEMPTS}
+    GROUP BY attempt
+    ON CONFLICT (attempt) DO UPDATE SET
+        answers = answers + excluded.answers,
+        successes = successes + excluded.successes
+    """
+)
+
+_INTERVAL_BUCKET = (
+    "CASE "
+    + " ".join(
+        f"WHEN interval < {bound} THEN {index}"
+        for index, bound in enumerate(RETENTION_BOUNDS)
+    )
+    + f" ELSE {len(RETENTION_BOUNDS)} END"
+)
+
+# Also runs before _ROLLUP_RECORDS.
+_ROLLUP_RETENTION = text(
+    f"""
+    INSERT INTO retention_statistics (interval, answers, successes)
+    SELECT {_INTERVAL_BUCKET} AS bucket, count(*), sum(is_success) FROM (
+        SELECT
+            strftime('%s', events.created_on) - strftime('%s', coalesce(
+                lag(events.created_on) OVER (
+                    PARTITION BY events.record_id ORDER BY events.id
+                ),
+                statistics.last_answered_on
+            )) AS interval,
+            events.event_type = 'SUCCESS' AS is_success
+        FROM events
+        LEFT JOIN record_statistics AS statistics
+            ON statistics.record_id = events.record_id
+        WHERE events.id > :last AND events.id <= :until
+            AND events.record_id IS NOT NULL AND events.event_type != 'HINT'
+    )
+    WHERE interval IS NOT NULL
+    GROUP BY bucket
+    ON CONFLICT (interval) DO UPDATE SET
+        answers = answers + excluded.answers,
+        successes = successes + excluded.successes
+    """
+)
+
+_ROLLUP_RECORDS = text(
+    """
+    INSERT INTO record_statistics
+        (record_id, successes, failures, hints, last_answered_on)
+    SELECT
+        record_id,
+        sum(event_type = 'SUCCESS'),
+        sum(event_type = 'FAILURE'),
+        sum(event_type = 'HINT'),
+        max(CASE WHEN event_type != 'HINT' THEN created_on END)
+    FROM events
+    WHERE id > :last AND id <= :until AND record_id IS NOT NULL
+    GROUP BY record_id
+    ON CONFLICT (record_id) DO UPDATE SET
+        successes = successes + excluded.successes,
+        failures = failures + excluded.failures,
+        hints = hints + excluded.hints,
+        last_answered_on = coalesce(excluded.last_answered_on, last_answered_on)
+    """
+)
+
+_ROLLUP_DAYS = text(
+    """
+    INSERT INTO daily_statistics (day, successes, failures, hints)
+    SELECT
+        date(created_on) AS day,
+        sum(event_type = 'SUCCESS'),
+        sum(event_type = 'FAILURE'),
+        sum(event_type = 'HINT')
+    FROM events
+    WHERE id > :last AND id <= :until AND record_id IS NOT NULL
+    GROUP BY day
+    ON CONFLICT (day) DO UPDATE SET
+        successes = successes + excluded.successes,
+        failures = failures + excluded.failures,
+        hints = hints + excluded.hints
+    """
+)
+
+SELECT_RECORD_STATISTICS = text(
+    "SELECT statistics.record_id, records.key, statistics.successes, "
+    "statistics.failures, statistics.hints FROM record_statistics AS statistics "
+    "JOIN records ON records.id = statistics.record_id"
+)
+SELECT_DAILY_STATISTICS = text(
+    "SELECT day, successes, failures, hints FROM daily_statistics ORDER BY day"
+)
+SELECT_ATTEMPT_STATISTICS = text(
+    "SELECT attempt, answers, successes FROM attempt_statistics ORDER BY attempt"
+)
+SELECT_RETENTION_STATISTICS = text(
+    "SELECT interval, answers, successes FROM retention_statistics"
+)
+
+
+def last_event_id(connection) -> int:
+    return connection.execute(_SELECT_LAST_EVENT_ID).scalar() or 0
+
+
+def catch_up(
+    connection,
+    until: Optional[int] = None,
+    at_most: Optional[int] = None,
+    batch: Optional[int] = None,
+    answered: bool = True,
+) -> int:
+    """
+    Folds the events after the last one counted, up to `until`, into the
+    rollups within the caller's transaction; returns how many ids that
+    covered. A backlog longer than `at_most` is left alone, `batch` caps the
+    ids covered, and `answered` false skips the answer-only rollups when the
+    hint `until` is the only event to fold.
+    """
+    last = last_event_id(connection)
+    if until is None:
+        until = connection.execute(_SELECT_MAX_EVENT_ID).scalar() or 0
+    if batch is not None:
+        until = min(until, last + batch)
+
+    pending = until - last
+    if pending <= 0 or (at_most is not None and pending > at_most):
+        return 0
+
+    statements = [_ROLLUP_RECORDS, _ROLLUP_DAYS]
+    if answered or pending > 1:
+        statements = [_ROLLUP_ATTEMPTS, _ROLLUP_RETENTION] + statements
+
+    parameters = {"last": last, "until": until}
+    for statement in statements:
+        connection.execute(statement, parameters)
+    connection.execute(_SET_LAST_EVENT_ID, {"until": until})
+
+    return pending
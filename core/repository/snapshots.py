@@ -0,0 +1,79 @@
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+# Bumped whenever the layout of the file changes; older files are ignored.
+_FORMAT = 1
+
+
+class Snapshot(NamedTuple):
+    path: str
+    items: List[Tuple[str, bool]]
+
+    @property
+    def checked_count(self) -> int:
+        return sum(1 for _, is_checked in self.items if is_checked)
+
+
+def _stamp(path: str) -> List[Optional[List[int]]]:
+    # Recent commits may only have touched the -wal file.
+    stamp = []
+    for file in [Path(path), Path(f"{path}-wal")]:
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            stamp.append(None)
+        else:
+            stamp.append([stat.st_mtime_ns, stat.st_size])
+
+    return stamp
+
+
+def read_snapshot(cache_path: str, path: str) -> Optional[Snapshot]:
+    """
+    Returns the keys and check states written by write_snapshot(), or None
+    when the dictionary at `path` has changed since.
+    """
+    try:
+        content = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    path = str(Path(path).resolve())
+    if (
+        not isinstance(content, dict)
+        or content.get("format") != _FORMAT
+        or content.get("path") != path
+        or content.get("stamp") != _stamp(path=path)
+    ):
+        return None
+
+    return Snapshot(
+        path=path,
+        items=[(key, bool(is_checked)) for key, is_checked in content["items"]],
+    )
+
+
+def write_snapshot(
+    cache_path: str, path: str, items: Iterable[Tuple[str, bool]]
+) -> None:
+    """
+    Must be called once nothing writes to the dictionary any more, after its
+    connections are closed, otherwise the stamp is already out of date.
+    """
+    path = str(Path(path).resolve())
+    content = {
+        "format": _FORMAT,
+        "path": path,
+        "stamp": _stamp(path=path),
+        "items": [[key, bool(is_checked)] for key, is_checked in items],
+    }
+
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Written aside and renamed, so a crash never leaves half a snapshot.
+    temporary_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    temporary_path.write_text(json.dumps(content), encoding="utf-8")
+    os.replace(temporary_path, cache_path)
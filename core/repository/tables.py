@@ -0,0 +1,153 @@
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rows of a table: key, value, is_checked and id of a record.
+Row = Tuple[str, str, bool, int]
+
+# Translation table swapping 0 and 1, the only bytes of the checked column.
+_INVERT = bytes([1, 0]) + bytes(range(2, 256))
+
+
+class RecordTable:
+    """
+    Records held column by column, values packed into one UTF-8 buffer.
+    Removed rows leave holes, dropped once they make up half of the table.
+    """
+
+    def __init__(self, rows: Iterable[Row] = ()) -> None:
+        self._keys: List[Optional[str]] = []
+        self._index: Dict[str, int] = {}
+        self._starts = array("Q")
+        self._ends = array("Q")
+        self._values = bytearray()
+        self._checked = bytearray()
+        self._ids = array("q")
+
+        self._holes = 0
+        self._garbage = 0
+
+        for key, value, is_checked, id in rows:
+            self.set(key=key, value=value, is_checked=is_checked, id=id)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self._keys if key is not None)
+
+    def get(self, key: str) -> Optional[Tuple[str, bool, int]]:
+        row = self._index.get(key)
+        if row is None:
+            return None
+
+        return self._value(row), bool(self._checked[row]), self._ids[row]
+
+    def value(self, key: str) -> Optional[str]:
+        row = self._index.get(key)
+
+        return None if row is None else self._value(row)
+
+    def is_checked(self, key: str) -> Optional[bool]:
+        row = self._index.get(key)
+
+        return None if row is None else bool(self._checked[row])
+
+    def keys(self) -> List[str]:
+        return list(self)
+
+    def rows(self) -> Iterator[Row]:
+        for row, key in enumerate(self._keys):
+            if key is not None:
+                yield key, self._value(row), bool(self._checked[row]), self._ids[row]
+
+    def checked_count(self) -> int:
+        # Holes are unchecked, so counting set bytes is enough.
+        return self._checked.count(1)
+
+    def set(self, key: str, value: str, is_checked: bool, id: int) -> None:
+        encoded = value.encode("utf-8")
+
+        row = self._index.get(key)
+        if row is None:
+            # Indexed last, so that the key is never found before its row.
+            self._starts.append(len(self._values))
+            self._values += encoded
+            self._ends.append(len(self._values))
+            self._checked.append(bool(is_checked))
+            self._ids.append(id)
+            self._keys.append(key)
+            self._index[key] = len(self._keys) - 1
+            return
+
+        if encoded != self._values[self._starts[row] : self._ends[row]]:
+            self._garbage += self._ends[row] - self._starts[row]
+            self._starts[row] = len(self._values)
+            self._values += encoded
+            self._ends[row] = len(self._values)
+        self._checked[row] = bool(is_checked)
+        self._ids[row] = id
+
+        self._compact_if_wasteful()
+
+    def set_checked(self, key: str, is_checked: bool) -> Optional[bool]:
+        """Returns the previous state, or None for an unknown key."""
+        row = self._index.get(key)
+        if row is None:
+            return None
+
+        was_checked = bool(self._checked[row])
+        self._checked[row] = bool(is_checked)
+
+        return was_checked
+
+    def set_checked_all(self, is_checked: bool) -> None:
+        self._checked = bytearray([bool(is_checked)]) * len(self._keys)
+        self._clear_holes()
+
+    def set_checked_where(self, predicate: Callable[[str], bool]) -> None:
+        self._checked = bytearray(
+            key is not None and predicate(key) for key in self._keys
+        )
+
+    def invert_checked(self) -> None:
+        self._checked = self._checked.translate(_INVERT)
+        self._clear_holes()
+
+    def rename(self, old_key: str, new_key: str) -> None:
+        row = self._index.pop(old_key, None)
+        if row is None:
+            return
+
+        self._keys[row] = new_key
+        self._index[new_key] = row
+
+    def pop(self, key: str) -> None:
+        row = self._index.pop(key, None)
+        if row is None:
+            return
+
+        self._keys[row] = None
+        self._checked[row] = 0
+        self._garbage += self._ends[row] - self._starts[row]
+        self._starts[row] = self._ends[row] = 0
+        self._holes += 1
+
+        self._compact_if_wasteful()
+
+    def _value(self, row: int) -> str:
+        return self._values[self._starts[row] : self._ends[row]].decode("utf-8")
+
+    def _clear_holes(self) -> None:
+        if self._holes:
+            for row, key in enumerate(self._keys):
+                if key is None:
+                    self._checked[row] = 0
+
+    def _compact_if_wasteful(self) -> None:
+        if 2 * self._holes > len(self._keys) or 2 * self._garbage > len(self._values):
+            compacted = RecordTable(rows=list(self.rows()))
+            # Swapped in one assignment rather than attribute by attribute.
+            self.__dict__ = compacted.__dict__
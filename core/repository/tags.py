@@ -0,0 +1,170 @@
+import functools
+import operator
+import re
+from typing import Callable, List
+
+from sqlalchemy import and_, not_, or_, select
+from sqlalchemy.sql.elements import ClauseElement
+
+from core.repository.models import Record, Tag, record_tags
+
+_TOKEN_PATTERN = re.compile(r"\s*(?:([&|!()])|([^&|!()\s]+))")
+
+
+def _tokenize(expression: str) -> List[str]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if not match:
+            raise ValueError(f"incorrect tag expression: '{expression}'")
+
+        tokens.append(match.group(1) or match.group(2))
+        position = match.end()
+
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser for tag expressions:
+
+        expression := term ("|" term)*
+        term       := factor ("&" factor)*
+        factor     := "!" factor | "(" expression ")" | name
+    """
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def parse(self) -> ClauseElement:
+        clause = self._expression()
+        if self.position != len(self.tokens):
+            self._fail()
+
+        return clause
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self) -> str:
+        token = self._peek()
+        if token is None:
+            self._fail()
+
+        self.position += 1
+
+        return token
+
+    def _fail(self):
+        raise ValueError(f"incorrect tag expression: '{self.expression}'")
+
+    def _expression(self) -> ClauseElement:
+        clauses = [self._term()]
+        while self._peek() == "|":
+            self._take()
+            clauses.append(self._term())
+
+        return self._any(clauses) if len(clauses) > 1 else clauses[0]
+
+    def _term(self) -> ClauseElement:
+        clauses = [self._factor()]
+        while self._peek() == "&":
+            self._take()
+            clauses.append(self._factor())
+
+        return self._all(clauses) if len(clauses) > 1 else clauses[0]
+
+    def _factor(self) -> ClauseElement:
+        token = self._take()
+        if token == "!":
+            return self._not(self._factor())
+
+        if token == "(":
+            clause = self._expression()
+            if self._take() != ")":
+                self._fail()
+            return clause
+
+        if token in "&|)":
+            self._fail()
+
+        return self._tagged(name=token)
+
+    def _any(self, clauses: List[ClauseElement]) -> ClauseElement:
+        return or_(*clauses)
+
+    def _all(self, clauses: List[ClauseElement]) -> ClauseElement:
+        return and_(*clauses)
+
+    def _not(self, clause: ClauseElement) -> ClauseElement:
+        return not_(clause)
+
+    def _tagged(self, name: str) -> ClauseElement:
+        return _tagged_with(name=name)
+
+
+class _MaskParser(_Parser):
+    """
+    Evaluates an expression over bit masks of records instead of compiling
+    it to SQL, for stores without SQL such as core.repository.packs.
+    """
+
+    def __init__(
+        self, expression: str, masks: Callable[[str], int], everything: int
+    ) -> None:
+        super().__init__(expression=expression)
+        self.masks = masks
+        self.everything = everything
+
+    def _any(self, masks: List[int]) -> int:
+        return functools.reduce(operator.or_, masks)
+
+    def _all(self, masks: List[int]) -> int:
+        return functools.reduce(operator.and_, masks)
+
+    def _not(self, mask: int) -> int:
+        return self.everything & ~mask
+
+    def _tagged(self, name: str) -> int:
+        return self.masks(name)
+
+
+def _tagged_with(name: str) -> ClauseElement:
+    # Each name becomes an indexed semi-join, so the whole expression is still
+    # answered by a single statement.
+    members = (
+        select(record_tags.c.record_id)
+        .join(Tag.__table__, Tag.__table__.c.id == record_tags.c.tag_id)
+        .where(Tag.__table__.c.name == name)
+    )
+
+    return Record.__table__.c.id.in_(members)
+
+
+def compile_tag_expression(expression: str) -> ClauseElement:
+    """
+    Turns "verbs & !irregular | (nouns & food)" into a WHERE clause on records.
+    """
+    if not expression or not expression.strip():
+        raise ValueError(f"incorrect tag expression: '{expression}'")
+
+    return _Parser(expression=expression).parse()
+
+
+def evaluate_tag_expression(
+    expression: str, masks: Callable[[str], int], everything: int
+) -> int:
+    """
+    Returns the mask of the records matching `expression`, given the mask of
+    the records tagged with a name by `masks` and that of all records.
+    """
+    if not expression or not expression.strip():
+        raise ValueError(f"incorrect tag expression: '{expression}'")
+
+    return _MaskParser(
+        expression=expression, masks=masks, everything=everything
+    ).parse()
@@ -1,3 +1,5 @@
+import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
 
 from pytest import fixture
@@ -14,3 +16,46 @@ def db():
 
     repository["foo"] = "1"
     repository["bar"] = "2"
+
+
+@fixture
+def count_queries(monkeypatch):
+    """
+    Returns a context manager collecting the statements run by the SQLite
+    connections opened during the test, the watcher and backups included:
+
+        with count_queries() as statements:
+            ...
+        assert len(statements) <= 2
+    """
+    recording = []
+
+    def record(statement):
+        for statements in recording:
+            statements.append(statement)
+
+    class Connection(sqlite3.Connection):
+        def backup(self, target, *args, **kwargs):
+            record("-- backup")
+            return super().backup(target, *args, **kwargs)
+
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        connection = connect(*args, factory=Connection, **kwargs)
+        connection.set_trace_callback(record)
+        return connection
+
+    monkeypatch.setattr(sqlite3, "connect", traced_connect)
+    monkeypatch.setattr(sqlite3.dbapi2, "connect", traced_connect)
+
+    @contextmanager
+    def counter():
+        statements = []
+        recording.append(statements)
+        try:
+            yield statements
+        finally:
+            recording.remove(statements)
+
+    return counter
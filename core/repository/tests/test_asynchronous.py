@@ -0,0 +1,82 @@
+import asyncio
+from pathlib import Path
+
+from pytest import fixture
+
+from core.repository.asynchronous import AsyncRepository
+from core.repository.repositories import Storage
+
+
+@fixture
+def path():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/asynchronous.db"
+
+    yield str(path)
+
+    Path(path).unlink(missing_ok=True)
+
+
+def test_if_can_mirror_repository_interface(path):
+    async def scenario():
+        async with AsyncRepository(path=path, pool_size=2) as repository:
+            assert await repository.aitems() == []
+            assert await repository.aget(key="foo") is None
+
+            await repository.aset(key="foo", value="1")
+            await repository.aset(key="bar", value="2")
+            await repository.aset_unchecked(key="bar")
+            await repository.commit_success_event(key="foo")
+            await repository.commit_failure_event(key="foo")
+            await repository.commit_hint_event(key="bar")
+
+            assert await repository.aget(key="foo") == "1"
+            assert await repository.alen() == 2
+            assert await repository.akeys() == ["foo", "bar"]
+            assert await repository.aitems() == [
+                ("foo", ("1", True)),
+                ("bar", ("2", False)),
+            ]
+            assert await repository.achecked_keys() == ["foo"]
+            assert repository.backup_path is not None
+
+            await repository.adel(key="bar")
+            assert await repository.akeys() == ["foo"]
+
+    asyncio.run(scenario())
+
+    with Storage(path=path).engine.connect() as connection:
+        events = connection.exec_driver_sql("SELECT COUNT(*) FROM events").scalar()
+    assert events == 3
+
+
+def test_if_can_serve_concurrent_readers_and_writers(path):
+    keys = [f"key-{index}" for index in range(50)]
+
+    async def scenario():
+        async with AsyncRepository(path=path, pool_size=4) as repository:
+            await asyncio.gather(
+                *[repository.aset(key=key, value=key.upper()) for key in keys]
+            )
+
+            values = await asyncio.gather(*[repository.aget(key=key) for key in keys])
+            assert values == [key.upper() for key in keys]
+
+            await asyncio.gather(
+                *[
+                    repository.commit_success_event(key=key)
+                    for key in keys
+                    for _ in range(4)
+                ],
+                *[repository.aget(key=key) for key in keys],
+                *[repository.aset_unchecked(key=key) for key in keys[::2]],
+            )
+
+            assert await repository.alen() == len(keys)
+            assert await repository.achecked_count() == len(keys) // 2
+
+    asyncio.run(scenario())
+
+    with Storage(path=path).engine.connect() as connection:
+        events = connection.exec_driver_sql("SELECT COUNT(*) FROM events").scalar()
+    assert events == 4 * len(keys)
@@ -0,0 +1,204 @@
+import threading
+from pathlib import Path
+
+from core.repository.caches import CachedRepository
+from core.repository.repositories import Repository, Storage, delete_database
+
+
+def test_if_can_serve_reads_from_cache():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/cached.db"
+
+    try:
+        repository = CachedRepository(Repository(path=str(path)))
+        repository["foo"] = "1"
+        repository["bar"] = "2"
+
+        assert repository.keys() == ["foo", "bar"]
+
+        hits = repository.hits
+        assert repository["foo"] == "1"
+        assert repository["bar"] == "2"
+        assert repository.is_checked(key="foo") is True
+        assert repository["baz"] is None
+        assert repository.hits == hits + 3
+        assert 0 < repository.hit_rate < 1
+
+    finally:
+        delete_database(path=str(path))
+
+
+def test_if_can_write_through():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/cached.db"
+
+    try:
+        repository = CachedRepository(Repository(path=str(path)))
+        repository["foo"] = "1"
+        repository["bar"] = "2"
+        repository["baz"] = "3"
+
+        assert repository.items() == [
+            ("foo", ("1", True)),
+            ("bar", ("2", True)),
+            ("baz", ("3", True)),
+        ]
+
+        repository["foo"] = "11"
+        repository["bar", "bar_new"] = "22"
+        repository.set_unchecked(key="baz")
+        del repository["foo"]
+
+        expected_items = [("bar_new", ("22", True)), ("baz", ("3", False))]
+        assert repository.items() == expected_items
+        assert repository.storage.items() == expected_items
+        assert len(repository) == 2
+
+    finally:
+        delete_database(path=str(path))
+
+
+def test_if_can_detect_external_changes():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/cached.db"
+
+    try:
+        repository = CachedRepository(Repository(path=str(path)))
+        repository["foo"] = "1"
+
+        assert repository["foo"] == "1"
+        invalidations = repository.invalidations
+
+        repository.commit_success_event(key="foo")
+        assert repository["foo"] == "1"
+        assert repository.invalidations == invalidations
+
+        external_storage = Storage(path=str(path))
+        external_storage["foo"] = "2"
+        external_storage["bar"] = "3"
+
+        assert repository["foo"] == "2"
+        assert repository.keys() == ["foo", "bar"]
+        assert repository.invalidations == invalidations + 1
+
+    finally:
+        delete_database(path=str(path))
+
+
+def test_if_can_detect_external_changes_during_own_writes():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/cached.db"
+
+    try:
+        repository = CachedRepository(Repository(path=str(path)))
+        repository["foo"] = "1"
+        repository["bar"] = "2"
+        assert repository.keys() == ["foo", "bar"]
+        invalidations = repository.invalidations
+
+        repository.set_unchecked(key="bar")
+        assert repository.invalidations == invalidations
+
+        # Another process commits right before the cache's own write.
+        external_storage = Storage(path=str(path))
+        set_checked = repository.repository.set_checked
+
+        def set_checked_after_external_write(key):
+            external_storage["foo"] = "3"
+            set_checked(key=key)
+
+        repository.repository.set_checked = set_checked_after_external_write
+        repository.set_checked(key="bar")
+
+        assert repository["foo"] == "3"
+        assert repository.is_checked(key="bar") is True
+        assert repository.invalidations == invalidations + 1
+
+    finally:
+        delete_database(path=str(path))
+
+
+def test_if_can_keep_checked_count():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/cached.db"
+
+    try:
+        repository = CachedRepository(Repository(path=str(path)))
+        repository["foo"] = "1"
+        repository["bar"] = "2"
+        repository["baz"] = "3"
+
+        assert repository.checked_count() == 3
+
+        repository.set_unchecked(key="bar")
+        repository.set_unchecked(key="bar")
+        hits = repository.hits
+        assert repository.checked_count() == 2
+        assert repository.hits == hits + 1
+        assert repository.checked_keys() == ["foo", "baz"]
+
+        del repository["foo"]
+        assert repository.checked_count() == 1
+        assert repository.checked_count() == repository.storage.checked_count()
+
+    finally:
+        delete_database(path=str(path))
+
+
+def test_if_can_set_checked_in_bulk():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/cached.db"
+
+    try:
+        repository = CachedRepository(Repository(path=str(path)))
+        for key in ["foo", "bar", "baz"]:
+            repository[key] = key
+
+        assert repository.checked_count() == 3
+
+        repository.set_checked_many(keys=["foo", "bar"], state=False)
+        assert repository.checked_count() == 1
+        assert repository.is_checked(key="foo") is False
+
+        repository.invert_checked()
+        assert repository.checked_count() == 2
+        assert repository.items() == repository.storage.items()
+
+        repository.set_checked_all(state=False)
+        assert repository.checked_count() == 0
+        assert repository.items() == repository.storage.items()
+
+        repository["Bar_"] = "bar"
+        repository["bär"] = "bar"
+        repository.set_checked_containing(text="bA")
+        assert repository.checked_count() == 3
+        assert repository.items() == repository.storage.items()
+
+    finally:
+        delete_database(path=str(path))
+
+
+def test_if_can_share_cache_between_threads(tmp_path):
+    repository = CachedRepository(Repository(path=str(tmp_path / "shared.db")))
+    repository["foo"] = "1"
+    repository.invalidate()
+
+    storage = repository.storage
+    record = storage.record
+    writer = threading.Thread(target=repository.__delitem__, args=("foo",))
+
+    def record_while_deleting(key):
+        found = record(key=key)
+        if writer.ident is None:
+            # Another thread deletes the record before it gets into the cache.
+            writer.start()
+            writer.join(timeout=0.5)
+
+        return found
+
+    storage.record = record_while_deleting
+    assert repository["foo"] == "1"
+    writer.join()
+
+    assert repository["foo"] is None
+    assert repository.keys() == []
@@ -0,0 +1,152 @@
+import csv
+import gzip
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+from core.repository.caches import CachedRepository
+from core.repository.models import Event, RecordStatistics
+from core.repository.repositories import Repository, Storage
+
+
+def _storage_with_history(path, old, new):
+    storage = Storage(path=str(path))
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    ids = {key: storage.record(key=key)[2] for key in ["foo", "bar"]}
+
+    now = datetime.now()
+    long_ago = now - timedelta(days=365)
+    with storage.engine.begin() as connection:
+        connection.execute(
+            Event.__table__.insert(),
+            [
+                {
+                    "record_id": ids["foo" if index % 2 else "bar"],
+                    "event_type": "FAILURE" if index % 3 else "SUCCESS",
+                    "created_on": long_ago,
+                }
+                for index in range(old)
+            ]
+            + [
+                {"record_id": ids["foo"], "event_type": "SUCCESS", "created_on": now}
+                for _ in range(new)
+            ],
+        )
+
+    return storage
+
+
+def _counts(storage):
+    session = storage.session_factory()
+    counts = {
+        statistics.record.key: (statistics.successes, statistics.failures)
+        for statistics in session.query(RecordStatistics)
+    }
+    session.close()
+
+    return counts
+
+
+def _event_count(storage):
+    with storage.engine.connect() as connection:
+        return connection.execute(select(func.count(Event.id))).scalar()
+
+
+def test_if_compacts_old_events_keeping_counters(tmp_path):
+    storage = _storage_with_history(tmp_path / "boost.db", old=30, new=5)
+    storage.refresh_statistics()
+    counts = _counts(storage)
+
+    removed = storage.compact(before=datetime.now() - timedelta(days=1))
+
+    assert removed == 30
+    assert _event_count(storage) == 5
+    assert _counts(storage) == counts
+
+    storage.commit_success_event(key="bar")
+    assert _counts(storage)["bar"] == (counts["bar"][0] + 1, counts["bar"][1])
+
+    storage.close()
+
+
+def test_if_compaction_refreshes_statistics_first(tmp_path):
+    storage = _storage_with_history(tmp_path / "boost.db", old=30, new=0)
+
+    storage.compact(before=datetime.now())
+
+    assert _event_count(storage) == 1
+    assert sum(sum(counts) for counts in _counts(storage).values()) == 30
+
+    storage.close()
+
+
+def test_if_counts_answers_after_compacting_everything(tmp_path):
+    storage = Storage(path=str(tmp_path / "boost.db"))
+    storage["foo"] = "1"
+    for _ in range(5):
+        storage.commit_success_event(key="foo")
+
+    assert storage.compact(before=datetime.now() + timedelta(days=1)) == 4
+
+    for _ in range(3):
+        storage.commit_failure_event(key="foo")
+    storage.refresh_statistics()
+
+    assert _counts(storage) == {"foo": (5, 3)}
+
+    storage.close()
+
+
+def test_if_archives_compacted_events(tmp_path):
+    storage = _storage_with_history(tmp_path / "boost.db", old=4, new=2)
+    archive_path = tmp_path / "boost.events.csv.gz"
+
+    storage.compact(
+        before=datetime.now() - timedelta(days=1), archive_path=str(archive_path)
+    )
+    storage.compact(
+        before=datetime.now() + timedelta(days=1), archive_path=str(archive_path)
+    )
+
+    with gzip.open(archive_path, "rt", encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+
+    assert [row["id"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert [row["key"] for row in rows[:4]] == ["bar", "foo", "bar", "foo"]
+    assert [row["event_type"] for row in rows[:4]] == [
+        "SUCCESS",
+        "FAILURE",
+        "FAILURE",
+        "SUCCESS",
+    ]
+    assert not Path(f"{archive_path}.tmp").exists()
+
+    storage.close()
+
+
+def test_if_compaction_shrinks_file(tmp_path):
+    path = tmp_path / "boost.db"
+    storage = _storage_with_history(path, old=20000, new=0)
+    storage.refresh_statistics()
+    storage.vacuum()
+    size = path.stat().st_size
+
+    storage.compact(before=datetime.now())
+
+    assert path.stat().st_size < size / 2
+
+    storage.close()
+
+
+def test_if_compaction_can_be_restored(tmp_path):
+    storage = _storage_with_history(tmp_path / "boost.db", old=10, new=0)
+    storage.close()
+
+    repository = CachedRepository(Repository(path=str(tmp_path / "boost.db")))
+    assert repository.compact(before=datetime.now()) == 9
+    assert _event_count(repository.storage) == 1
+
+    repository.restore()
+    assert _event_count(repository.storage) == 10
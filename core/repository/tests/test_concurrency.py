@@ -0,0 +1,94 @@
+import multiprocessing
+
+from sqlalchemy import event
+
+from core.repository.models import Event
+from core.repository.repositories import Repository, Storage
+
+
+def _write(path: str, writer: int, count: int) -> None:
+    storage = Storage(path=path)
+
+    for i in range(count):
+        storage[f"{writer}-{i}"] = str(i)
+        storage.commit_success_event(key="shared")
+        if i % 2:
+            storage.set_unchecked(key="shared")
+        else:
+            storage.set_checked(key="shared")
+
+    storage.close()
+
+
+def test_if_keeps_writes_of_concurrent_processes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    storage = Storage(path=path)
+    storage["shared"] = "value"
+
+    context = multiprocessing.get_context("spawn")
+    writers = [
+        context.Process(target=_write, args=(path, writer, 50)) for writer in range(4)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    assert [writer.exitcode for writer in writers] == [0, 0, 0, 0]
+    assert len(storage) == 1 + 4 * 50
+
+    session = storage.session_factory()
+    assert session.query(Event).count() == 4 * 50
+    session.close()
+
+
+def test_if_sees_commits_of_other_connections(tmp_path):
+    path = str(tmp_path / "shared.db")
+    storage = Storage(path=path)
+    other = Storage(path=path)
+
+    version = storage.data_version()
+    assert storage.data_version() == version
+
+    other["foo"] = "1"
+
+    assert storage.data_version() != version
+    assert storage["foo"] == "1"
+
+
+def test_if_backup_includes_uncheckpointed_changes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    repository = Repository(path=path)
+    # An open connection keeps the WAL file from being checkpointed on close.
+    repository.storage.data_version()
+    repository.storage["foo"] = "1"
+
+    repository["bar"] = "2"
+
+    assert Storage(path=repository.backup_path).keys() == ["foo"]
+
+    other = Storage(path=path)
+    version = other.data_version()
+
+    repository.restore()
+
+    assert other.data_version() != version
+    assert other.keys() == ["foo"]
+
+
+def test_if_reads_reuse_connections(tmp_path):
+    storage = Storage(path=str(tmp_path / "shared.db"), core_reads=True)
+    storage["foo"] = "1"
+
+    connections = []
+    event.listen(storage.engine, "connect", lambda *_: connections.append(1))
+    for _ in range(10):
+        assert storage["foo"] == "1"
+        assert storage.is_checked(key="foo") is True
+
+    assert connections == []
+    with storage.engine.connect() as connection:
+        # NORMAL, set on connect, holds for the pooled connections too.
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+
+    storage.close()
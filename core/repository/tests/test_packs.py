@@ -0,0 +1,152 @@
+import pytest
+
+from core.repository.caches import CachedRepository
+from core.repository.packs import PackStorage, export_pack, import_pack, write_pack
+from core.repository.repositories import Repository, Storage
+
+RECORDS = [
+    ("zebra", "полосатая лошадь", True),
+    ("apple", "яблоко", False),
+    ("Éclair", "pastry", True),
+    ("mango", "", True),
+    ("banana", "банан", False),
+]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(path=str(tmp_path / "dictionary.db"))
+    for key, value, is_checked in RECORDS:
+        storage[key] = value
+        if not is_checked:
+            storage.set_unchecked(key=key)
+    storage.set_tags(key="zebra", names=["animals", "stripes"])
+    storage.set_tags(key="apple", names=["fruits"])
+    storage.set_tags(key="mango", names=["fruits"])
+    storage.set_tags(key="banana", names=["fruits"])
+
+    yield storage
+
+    storage.close()
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+@pytest.mark.parametrize("block_records", [1, 2, 64])
+def test_if_pack_reads_like_storage(storage, tmp_path, compression, block_records):
+    path = str(tmp_path / "dictionary.pack")
+    export_pack(
+        storage, path=path, compression=compression, block_records=block_records
+    )
+
+    pack = PackStorage(path=path)
+
+    assert len(pack) == len(storage)
+    assert pack.keys() == storage.keys()
+    assert pack.items() == storage.items()
+    assert list(pack.snapshot().rows()) == list(storage.snapshot().rows())
+    for key, value, is_checked in RECORDS:
+        assert pack[key] == value
+        assert pack.record(key=key) == storage.record(key=key)
+        assert pack.is_checked(key=key) is is_checked
+        assert pack.tags_of(key=key) == storage.tags_of(key=key)
+    assert pack["cherry"] is None
+    assert pack.record(key="cherry") is None
+
+    assert pack.checked_count() == storage.checked_count() == 3
+    assert pack.checked_keys() == storage.checked_keys()
+    assert pack.tags() == storage.tags()
+    for expression in ["fruits", "fruits | stripes", "!fruits", "!(fruits | animals)"]:
+        assert pack.checked_keys(tags=expression) == storage.checked_keys(
+            tags=expression
+        )
+        assert pack.checked_items(tags=expression) == storage.checked_items(
+            tags=expression
+        )
+        assert pack.tagged_keys(tags=expression) == storage.tagged_keys(tags=expression)
+    assert pack.tagged_keys(tags="unknown") == []
+
+    pack.close()
+
+
+def test_if_imports_pack(storage, tmp_path):
+    path = str(tmp_path / "dictionary.pack")
+    export_pack(storage, path=path)
+
+    imported = Storage(path=str(tmp_path / "imported.db"))
+    import_pack(path=path, storage=imported)
+
+    assert imported.items() == storage.items()
+    assert imported.tags() == storage.tags()
+    assert imported.tagged_keys(tags="fruits") == storage.tagged_keys(tags="fruits")
+
+    with pytest.raises(ValueError):
+        import_pack(path=path, storage=imported)
+
+    imported.close()
+
+
+def test_if_repository_opens_pack_read_only(storage, tmp_path):
+    path = str(tmp_path / "dictionary.pack")
+    export_pack(storage, path=path)
+
+    repository = CachedRepository(Repository(path=path))
+
+    assert isinstance(repository.storage, PackStorage)
+    assert repository.keys() == storage.keys()
+    assert repository.checked_keys(tags="fruits") == ["mango"]
+    assert repository.checked_count() == 3
+    assert not repository.is_stale()
+
+    with pytest.raises(RuntimeError):
+        repository["cherry"] = "вишня"
+    with pytest.raises(RuntimeError):
+        repository.set_unchecked(key="zebra")
+    with pytest.raises(RuntimeError):
+        repository.set_checked_containing(text="z")
+    with pytest.raises(RuntimeError):
+        repository.commit_success_event(key="zebra")
+    assert repository.repository.backup_path is None
+
+    with pytest.raises(ValueError):
+        Repository(path=path, progress_path=str(tmp_path / "me.db"))
+
+    repository.storage.close()
+
+
+def test_if_rejects_what_pack_cannot_hold(tmp_path):
+    with pytest.raises(ValueError):
+        write_pack(path=str(tmp_path / "nul.pack"), records=[("a\0b", "c", True)])
+    with pytest.raises(ValueError):
+        write_pack(
+            path=str(tmp_path / "brotli.pack"),
+            records=[("a", "b", True)],
+            compression="brotli",
+        )
+
+    (tmp_path / "empty.pack").write_bytes(b"")
+    with pytest.raises(ValueError):
+        PackStorage(path=str(tmp_path / "empty.pack"))
+    with pytest.raises(ValueError):
+        PackStorage(path=__file__)
+
+
+def test_if_reads_empty_pack(tmp_path):
+    path = str(tmp_path / "empty.pack")
+    write_pack(path=path, records=[])
+
+    pack = PackStorage(path=path)
+    assert len(pack) == 0
+    assert pack.keys() == pack.items() == pack.checked_keys() == []
+    assert pack["a"] is None
+    pack.close()
+
+
+def test_if_reads_zstd_pack(storage, tmp_path):
+    pytest.importorskip("zstandard")
+
+    path = str(tmp_path / "dictionary.pack")
+    export_pack(storage, path=path, compression="zstd")
+
+    pack = PackStorage(path=path)
+    assert pack.items() == storage.items()
+    pack.close()
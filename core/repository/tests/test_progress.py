@@ -0,0 +1,173 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+from core.repository.caches import CachedRepository
+from core.repository.repositories import Repository, Storage
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    path = tmp_path / "dictionary.db"
+
+    storage = Storage(path=str(path))
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    storage["baz"] = "3"
+    storage.set_unchecked(key="baz")
+    storage.set_tags(key="foo", names=["verbs"])
+    storage.close()
+
+    return path
+
+
+def _query(path, statement):
+    connection = sqlite3.connect(path)
+    rows = connection.execute(statement).fetchall()
+    connection.close()
+
+    return rows
+
+
+def test_if_progress_leaves_dictionary_untouched(dictionary, tmp_path):
+    content = dictionary.read_bytes()
+
+    storage = Storage(path=str(dictionary), progress_path=str(tmp_path / "me.db"))
+    storage.commit_success_event(key="foo")
+    storage.commit_failure_event(key="bar")
+    storage.set_unchecked(key="foo")
+    storage.invert_checked()
+    storage.refresh_statistics()
+    storage.close()
+
+    assert dictionary.read_bytes() == content
+    assert _query(tmp_path / "me.db", "SELECT count(*) FROM events") == [(2,)]
+    assert _query(tmp_path / "me.db", "SELECT successes FROM record_statistics") == [
+        (1,),
+        (0,),
+    ]
+    assert "records" not in {
+        name for name, in _query(tmp_path / "me.db", "SELECT name FROM sqlite_master")
+    }
+
+
+def test_if_progress_keeps_own_check_states(dictionary, tmp_path):
+    storage = Storage(path=str(dictionary), progress_path=str(tmp_path / "me.db"))
+
+    assert storage.checked_keys() == ["foo", "bar"]
+    assert storage.is_checked(key="baz") is False
+
+    storage.set_checked(key="baz")
+    storage.set_unchecked(key="foo")
+
+    assert storage.checked_keys() == ["bar", "baz"]
+    assert storage.checked_items() == [("bar", "2"), ("baz", "3")]
+    assert storage.checked_count() == 2
+    assert storage.record(key="foo") == ("1", False, 1)
+    assert storage.items() == [
+        ("foo", ("1", False)),
+        ("bar", ("2", True)),
+        ("baz", ("3", True)),
+    ]
+    assert list(storage.snapshot().rows()) == [
+        ("foo", "1", False, 1),
+        ("bar", "2", True, 2),
+        ("baz", "3", True, 3),
+    ]
+
+    storage.invert_checked()
+    assert storage.checked_keys() == ["foo"]
+    assert storage.checked_keys(tags="verbs") == ["foo"]
+
+    storage.set_checked_many(keys=["bar", "baz"], state=True)
+    storage.set_checked_all(state=False)
+    assert storage.checked_count() == 0
+
+    storage.set_checked_containing(text="BA")
+    assert storage.checked_keys() == ["bar", "baz"]
+
+    other = Storage(path=str(dictionary), progress_path=str(tmp_path / "you.db"))
+    assert other.checked_keys() == ["foo", "bar"]
+
+    other.close()
+    storage.close()
+
+
+def test_if_attaches_dictionary_once_per_connection(dictionary, tmp_path):
+    storage = Storage(path=str(dictionary), progress_path=str(tmp_path / "me.db"))
+
+    connections = []
+    event.listen(storage.engine, "connect", lambda *_: connections.append(1))
+    for _ in range(10):
+        assert storage.record(key="foo") == ("1", True, 1)
+        assert storage.is_checked(key="baz") is False
+        storage.data_version()
+
+    # Every connection, the watcher behind data_version() too, is kept open
+    # with the dictionary attached.
+    assert connections == []
+    storage.close()
+
+
+def test_if_edits_go_to_dictionary(dictionary, tmp_path):
+    storage = Storage(path=str(dictionary), progress_path=str(tmp_path / "me.db"))
+    storage.set_unchecked(key="bar")
+
+    storage["qux"] = "4"
+    storage[("foo", "quux")] = "5"
+    del storage["bar"]
+    storage["bar"] = "6"
+
+    assert storage.keys() == ["quux", "baz", "qux", "bar"]
+    assert storage.is_checked(key="bar") is True
+    storage.close()
+
+    plain = Storage(path=str(dictionary))
+    assert plain.items() == [
+        ("quux", ("5", True)),
+        ("baz", ("3", False)),
+        ("qux", ("4", True)),
+        ("bar", ("6", True)),
+    ]
+    plain.close()
+
+
+def test_if_notices_changes_of_either_database(dictionary, tmp_path):
+    storage = Storage(path=str(dictionary), progress_path=str(tmp_path / "me.db"))
+    other = Storage(path=str(dictionary), progress_path=str(tmp_path / "me.db"))
+    plain = Storage(path=str(dictionary))
+
+    version = storage.data_version()
+    other.set_unchecked(key="foo")
+    assert storage.data_version() != version
+
+    version = storage.data_version()
+    plain["qux"] = "4"
+    assert storage.data_version() != version
+
+    for each in [storage, other, plain]:
+        each.close()
+
+
+def test_if_restores_dictionary_but_not_progress(dictionary, tmp_path):
+    repository = CachedRepository(
+        Repository(path=str(dictionary), progress_path=str(tmp_path / "me.db"))
+    )
+
+    repository["qux"] = "4"
+    repository.set_unchecked(key="foo")
+    repository.commit_success_event(key="foo")
+    assert Path(repository.repository.backup_path).is_file()
+
+    repository.restore()
+
+    assert repository.keys() == ["foo", "bar", "baz"]
+    assert repository.is_checked(key="foo") is False
+    assert _query(tmp_path / "me.db", "SELECT count(*) FROM events") == [(1,)]
+
+
+def test_if_rejects_progress_in_memory(dictionary):
+    with pytest.raises(ValueError):
+        Storage(path=str(dictionary), progress_path=":memory:")
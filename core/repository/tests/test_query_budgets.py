@@ -0,0 +1,140 @@
+from pytest import mark
+
+from core.quiz.sessions import Deck, QuizSession
+from core.repository.caches import CachedRepository
+from core.repository.repositories import Repository, Storage
+
+# Statements each flow may run on any SQLite connection, PRAGMAs, BEGIN and
+# COMMIT included; a backup counts as one. They must not depend on the size
+# of the dictionary.
+BUDGETS = {
+    # Connection setup and the migration check, then the items and the tags.
+    "open": 21,
+    "open_read_only": 6,
+    # The first write also sets up the writer's connection.
+    "quiz_step": 11,
+    "quiz_hint": 7,
+    # The whole deck in one SELECT, then no statements while drawing.
+    "start_quiz": 2,
+    "add_item": 9,
+    "check_by_filter": 6,
+    # One backup, then the data version the cache starts over from.
+    "save": 3,
+}
+
+
+def _dictionary(path, records):
+    storage = Storage(path=path)
+    for index in range(records):
+        storage[f"key-{index}"] = f"value-{index}"
+    storage.close()
+
+
+def _budget(statements, flow):
+    assert len(statements) <= BUDGETS[flow], "\n\n".join(statements)
+
+
+@mark.parametrize("records", [10, 100])
+def test_if_opening_dictionary_stays_within_budget(tmp_path, count_queries, records):
+    path = str(tmp_path / "boost.db")
+    _dictionary(path=path, records=records)
+
+    with count_queries() as statements:
+        repository = CachedRepository(Repository(path=path))
+        assert len(repository.items()) == records
+        repository.checked_count()
+        repository.tags()
+
+    _budget(statements=statements, flow="open")
+
+
+@mark.parametrize("records", [10, 100])
+def test_if_opening_read_only_dictionary_stays_within_budget(
+    tmp_path, count_queries, records
+):
+    path = str(tmp_path / "boost.db")
+    _dictionary(path=path, records=records)
+
+    with count_queries() as statements:
+        repository = CachedRepository(Repository(path=path, read_only=True))
+        assert len(repository.items()) == records
+        repository.checked_count()
+        repository.tags()
+
+    _budget(statements=statements, flow="open_read_only")
+
+
+@mark.parametrize("records", [10, 100])
+def test_if_quiz_step_stays_within_budget(tmp_path, count_queries, records):
+    path = str(tmp_path / "boost.db")
+    _dictionary(path=path, records=records)
+    repository = CachedRepository(Repository(path=path))
+    repository.items()
+    session = QuizSession(repository=repository)
+
+    with count_queries() as statements:
+        card = session.next_card()
+        session.submit(expression=card.key, meaning=card.value)
+
+    _budget(statements=statements, flow="quiz_step")
+
+    with count_queries() as statements:
+        session.hint()
+
+    _budget(statements=statements, flow="quiz_hint")
+
+
+@mark.parametrize("records", [10, 100])
+def test_if_starting_quiz_stays_within_budget(tmp_path, count_queries, records):
+    path = str(tmp_path / "boost.db")
+    _dictionary(path=path, records=records)
+    repository = CachedRepository(Repository(path=path))
+    repository.items()
+
+    with count_queries() as statements:
+        deck = Deck(repository=repository)
+        QuizSession(repository=deck, events=repository).next_card()
+
+    assert len(deck.values) == records
+    _budget(statements=statements, flow="start_quiz")
+
+
+@mark.parametrize("records", [10, 100])
+def test_if_adding_item_stays_within_budget(tmp_path, count_queries, records):
+    path = str(tmp_path / "boost.db")
+    _dictionary(path=path, records=records)
+    repository = CachedRepository(Repository(path=path))
+    repository.items()
+
+    with count_queries() as statements:
+        repository["new"] = "value"
+        repository.checked_count()
+
+    _budget(statements=statements, flow="add_item")
+
+
+@mark.parametrize("records", [10, 100])
+def test_if_checking_by_filter_stays_within_budget(tmp_path, count_queries, records):
+    path = str(tmp_path / "boost.db")
+    _dictionary(path=path, records=records)
+    repository = CachedRepository(Repository(path=path))
+    repository.items()
+
+    with count_queries() as statements:
+        repository.set_checked_containing(text="key-1")
+        repository.checked_count()
+
+    _budget(statements=statements, flow="check_by_filter")
+
+
+def test_if_saving_stays_within_budget(tmp_path, count_queries):
+    path = str(tmp_path / "boost.db")
+    _dictionary(path=path, records=100)
+    repository = CachedRepository(Repository(path=path))
+    repository["new"] = "value"
+
+    with count_queries() as statements:
+        repository.save()
+        repository.save(path=str(tmp_path / "copy.db"))
+
+    _budget(statements=statements, flow="save")
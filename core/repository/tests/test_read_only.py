@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from core.repository.caches import CachedRepository
+from core.repository.repositories import Repository, Storage
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    path = tmp_path / "dictionary.db"
+
+    storage = Storage(path=str(path))
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    storage.set_unchecked(key="bar")
+    storage.set_tags(key="foo", names=["verbs"])
+    storage.close()
+
+    return path
+
+
+def test_if_reads_without_touching_file(dictionary):
+    content = dictionary.read_bytes()
+
+    storage = Storage(path=str(dictionary), read_only=True)
+    other = Storage(path=str(dictionary), read_only=True)
+
+    assert storage.items() == [("foo", ("1", True)), ("bar", ("2", False))]
+    assert other.checked_keys(tags="verbs") == ["foo"]
+    assert storage.tags() == ["verbs"]
+    assert storage.data_version() == storage.data_version()
+    assert sorted(path.name for path in dictionary.parent.iterdir()) == [
+        "dictionary.db"
+    ]
+
+    storage.close()
+    other.close()
+    assert dictionary.read_bytes() == content
+
+
+def test_if_rejects_writes_without_backup(dictionary):
+    repository = CachedRepository(Repository(path=str(dictionary), read_only=True))
+
+    with pytest.raises(OperationalError, match="readonly"):
+        repository["baz"] = "3"
+    with pytest.raises(OperationalError, match="readonly"):
+        repository.commit_success_event(key="foo")
+
+    assert repository.repository.backup_path is None
+    assert repository.keys() == ["foo", "bar"]
+
+
+def test_if_keeps_progress_next_to_read_only_dictionary(dictionary, tmp_path):
+    content = dictionary.read_bytes()
+
+    repository = Repository(
+        path=str(dictionary), progress_path=str(tmp_path / "me.db"), read_only=True
+    )
+    repository.set_checked(key="bar")
+    repository.commit_success_event(key="bar")
+
+    assert repository.checked_keys() == ["foo", "bar"]
+    assert repository.storage.data_version() == repository.storage.data_version()
+    with pytest.raises(OperationalError, match="readonly"):
+        repository["baz"] = "3"
+
+    repository.storage.close()
+    assert dictionary.read_bytes() == content
+
+
+def test_if_rejects_read_only_memory():
+    with pytest.raises(ValueError):
+        Storage(read_only=True)
@@ -90,3 +90,16 @@ def test_if_can_backup_and_restore_on_delitem():
     assert repository.storage.items() == [("foo", ("1", True)), ("bar", ("2", True))]
 
     copied.unlink(missing_ok=True)
+
+
+def test_if_closes_previous_storage_on_load(tmp_path):
+    repository = Repository(path=str(tmp_path / "first.db"))
+    repository["foo"] = "1"
+    previous = repository.storage
+    assert previous.watcher is not None
+
+    repository.load(path=str(tmp_path / "second.db"))
+
+    assert previous.watcher is None
+    assert previous.engine.pool.checkedin() == 0
+    assert repository.keys() == []
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from core.repository import repositories, rollups
+from core.repository.models import Event, RecordStatistics
+from core.repository.repositories import Storage
+
+
+def _counts(storage):
+    session = storage.session_factory()
+    counts = {
+        statistics.record.key: (
+            statistics.successes,
+            statistics.failures,
+            statistics.hints,
+        )
+        for statistics in session.query(RecordStatistics)
+    }
+    session.close()
+
+    return counts
+
+
+def test_if_leaves_long_backlog_to_refresh(tmp_path, monkeypatch):
+    storage = Storage(path=str(tmp_path / "boost.db"))
+    storage["foo"] = "1"
+    record_id = storage.record(key="foo")[2]
+
+    now = datetime.now()
+    with storage.engine.begin() as connection:
+        connection.execute(
+            Event.__table__.insert(),
+            [
+                {"record_id": record_id, "event_type": "FAILURE", "created_on": now}
+                for _ in range(3)
+            ],
+        )
+
+    monkeypatch.setattr(repositories, "_INLINE_ROLLUP_EVENTS", 2)
+    monkeypatch.setattr(repositories, "_ROLLUP_BATCH_EVENTS", 3)
+    storage.commit_success_event(key="foo")
+    assert _counts(storage) == {}
+
+    assert storage.refresh_statistics() == 4
+    assert _counts(storage) == {"foo": (1, 3, 0)}
+
+    storage.commit_hint_event(key="foo")
+    assert _counts(storage) == {"foo": (1, 3, 1)}
+
+    with storage.engine.connect() as connection:
+        assert rollups.last_event_id(connection) == 5
+
+    storage.close()
+
+
+def test_if_drops_statistics_of_deleted_record(tmp_path):
+    storage = Storage(path=str(tmp_path / "boost.db"))
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    storage.commit_success_event(key="foo")
+    storage.commit_success_event(key="bar")
+
+    del storage["foo"]
+
+    assert _counts(storage) == {"bar": (1, 0, 0)}
+    storage.close()
@@ -0,0 +1,50 @@
+from core.repository.repositories import Storage
+from core.repository.snapshots import read_snapshot, write_snapshot
+
+
+def test_if_can_write_and_read_snapshot(tmp_path):
+    path = str(tmp_path / "boost.db")
+    cache_path = str(tmp_path / "cache/snapshot.json")
+
+    storage = Storage(path=path)
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    storage.set_unchecked(key="bar")
+    storage.close()
+
+    assert read_snapshot(cache_path=cache_path, path=path) is None
+
+    write_snapshot(
+        cache_path=cache_path, path=path, items=[("foo", True), ("bar", False)]
+    )
+    snapshot = read_snapshot(cache_path=cache_path, path=path)
+
+    assert snapshot.items == [("foo", True), ("bar", False)]
+    assert snapshot.checked_count == 1
+    assert read_snapshot(cache_path=cache_path, path=str(tmp_path / "other.db")) is None
+
+
+def test_if_ignores_snapshot_of_changed_dictionary(tmp_path):
+    path = str(tmp_path / "boost.db")
+    cache_path = str(tmp_path / "snapshot.json")
+
+    storage = Storage(path=path)
+    storage["foo"] = "1"
+    storage.close()
+    write_snapshot(cache_path=cache_path, path=path, items=[("foo", True)])
+
+    storage = Storage(path=path)
+    storage.data_version()
+    storage["bar"] = "2"
+
+    assert read_snapshot(cache_path=cache_path, path=path) is None
+
+
+def test_if_ignores_broken_snapshot(tmp_path):
+    path = str(tmp_path / "boost.db")
+    cache_path = tmp_path / "snapshot.json"
+    Storage(path=path).close()
+
+    cache_path.write_text("{not json")
+
+    assert read_snapshot(cache_path=str(cache_path), path=path) is None
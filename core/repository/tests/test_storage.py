@@ -4,6 +4,7 @@ from typing import Dict, NamedTuple
 
 from pytest import raises
 from sqlalchemy import asc
+from sqlalchemy.exc import NoResultFound
 
 from core.repository.models import Event, Record
 from core.repository.repositories import Storage
@@ -350,3 +351,94 @@ def test_if_can_replace_keys_preserving_order():
 
     with raises(TypeError):
         storage[{42, "42"}] = "boooooom"
+
+
+def test_if_core_reads_match_orm_reads():
+    here = Path(__file__).parent.resolve()
+    path = here / "fixtures/core_reads.db"
+
+    orm_storage = Storage(path=str(path))
+    core_storage = Storage(path=str(path), core_reads=True)
+    try:
+        assert core_storage.keys() == []
+        assert core_storage["foo"] is None
+        assert len(core_storage) == 0
+
+        orm_storage["foo"] = "1"
+        orm_storage["bar"] = "2"
+        orm_storage.set_unchecked(key="bar")
+
+        assert core_storage["foo"] == orm_storage["foo"] == "1"
+        assert core_storage["baz"] is None
+        assert core_storage.is_checked(key="foo") is True
+        assert core_storage.is_checked(key="bar") is False
+        assert len(core_storage) == len(orm_storage) == 2
+        assert core_storage.keys() == orm_storage.keys() == ["foo", "bar"]
+        assert core_storage.items() == orm_storage.items()
+        assert core_storage.items() == [("foo", ("1", True)), ("bar", ("2", False))]
+
+        with raises(NoResultFound):
+            core_storage.is_checked(key="baz")
+
+    finally:
+        Path(path).unlink(missing_ok=True)
+
+
+def test_if_can_return_checked_keys():
+    storage = Storage()
+
+    assert storage.checked_count() == 0
+    assert storage.checked_keys() == []
+
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    storage["baz"] = "3"
+    storage.set_unchecked(key="bar")
+
+    assert storage.checked_count() == 2
+    assert storage.checked_keys() == ["foo", "baz"]
+
+    storage.set_checked(key="bar")
+    storage.set_unchecked(key="foo")
+
+    assert storage.checked_count() == 2
+    assert storage.checked_keys() == ["bar", "baz"]
+
+
+def test_if_can_set_checked_in_bulk():
+    storage = Storage()
+
+    for key in ["foo", "bar", "baz", "spam"]:
+        storage[key] = key
+
+    storage.set_checked_many(keys=["foo", "baz", "missing"], state=False)
+    assert storage.checked_keys() == ["bar", "spam"]
+
+    storage.invert_checked()
+    assert storage.checked_keys() == ["foo", "baz"]
+
+    storage.set_checked_all(state=True)
+    assert storage.checked_count() == 4
+
+    storage.set_checked_all(state=False)
+    assert storage.checked_count() == 0
+
+    storage.set_checked_many(keys=[f"key-{index}" for index in range(2000)], state=True)
+    assert storage.checked_count() == 0
+
+
+def test_if_can_check_only_keys_containing_text():
+    storage = Storage()
+
+    for key in ["Foo bar", "foobar", "spam", "50%_off", "Дом"]:
+        storage[key] = key
+    storage.set_unchecked(key="spam")
+
+    storage.set_checked_containing(text="FOO")
+    assert storage.checked_keys() == ["Foo bar", "foobar"]
+
+    storage.set_checked_containing(text="%_")
+    assert storage.checked_keys() == ["50%_off"]
+
+    storage.set_checked_containing(text="Дом")
+    assert storage.checked_keys() == ["Дом"]
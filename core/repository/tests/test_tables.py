@@ -0,0 +1,70 @@
+from core.repository.repositories import Storage
+from core.repository.tables import RecordTable
+
+
+def test_if_can_hold_records():
+    table = RecordTable(rows=[("foo", "спам", True, 1), ("bar", "eggs", False, 2)])
+
+    assert len(table) == 2
+    assert "foo" in table
+    assert "baz" not in table
+    assert table.keys() == ["foo", "bar"]
+    assert table.get("foo") == ("спам", True, 1)
+    assert table.get("baz") is None
+    assert table.value("bar") == "eggs"
+    assert table.is_checked("bar") is False
+    assert table.checked_count() == 1
+
+
+def test_if_can_update_records_in_place():
+    table = RecordTable(rows=[("foo", "1", True, 1), ("bar", "2", True, 2)])
+
+    table.set("foo", "one", False, 1)
+    table.set("baz", "3", True, 3)
+    table.rename(old_key="foo", new_key="qux")
+
+    assert list(table.rows()) == [
+        ("qux", "one", False, 1),
+        ("bar", "2", True, 2),
+        ("baz", "3", True, 3),
+    ]
+    assert table.set_checked(key="bar", is_checked=False) is True
+    assert table.set_checked(key="foo", is_checked=False) is None
+    assert table.checked_count() == 1
+
+
+def test_if_keeps_order_and_counts_when_removing():
+    table = RecordTable(rows=[(f"key-{index}", "", True, index) for index in range(5)])
+
+    table.pop("key-1")
+    table.pop("key-3")
+    table.pop("missing")
+
+    assert table.keys() == ["key-0", "key-2", "key-4"]
+    assert table.checked_count() == 3
+
+    table.invert_checked()
+    assert table.checked_count() == 0
+
+    table.set_checked_all(is_checked=True)
+    assert table.checked_count() == 3
+
+    # More holes than rows left: the table is compacted.
+    table.pop("key-0")
+    table.pop("key-2")
+    assert list(table.rows()) == [("key-4", "", True, 4)]
+
+
+def test_if_storage_takes_snapshot(tmp_path):
+    storage = Storage(path=str(tmp_path / "boost.db"))
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    storage.set_unchecked(key="bar")
+
+    table = storage.snapshot()
+
+    assert [(key, value, is_checked) for key, value, is_checked, _ in table.rows()] == [
+        ("foo", "1", True),
+        ("bar", "2", False),
+    ]
+    storage.close()
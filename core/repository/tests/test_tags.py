@@ -0,0 +1,65 @@
+from pytest import fixture, mark, raises
+
+from core.repository.repositories import Storage
+
+
+@fixture
+def storage():
+    storage = Storage()
+
+    for key in ["go", "went", "apple", "table", "be"]:
+        storage[key] = key
+
+    storage.set_tags(key="go", names=["verbs"])
+    storage.set_tags(key="went", names=["verbs", "irregular"])
+    storage.set_tags(key="apple", names=["nouns", "food"])
+    storage.set_tags(key="table", names=["nouns"])
+
+    return storage
+
+
+def test_if_can_tag_records(storage):
+    assert storage.tags() == ["food", "irregular", "nouns", "verbs"]
+    assert storage.tags_of(key="went") == ["irregular", "verbs"]
+    assert storage.tags_of(key="be") == []
+
+    storage.set_tags(key="went", names=["verbs", " past ", ""])
+    assert storage.tags_of(key="went") == ["past", "verbs"]
+    assert storage.tags() == ["food", "irregular", "nouns", "past", "verbs"]
+
+    storage.set_tags(key="went", names=[])
+    assert storage.tags_of(key="went") == []
+
+
+@mark.parametrize(
+    "expression, keys",
+    [
+        ("verbs", ["go", "went"]),
+        ("verbs & !irregular", ["go"]),
+        ("nouns & food | irregular", ["went", "apple"]),
+        ("!(nouns | verbs)", ["be"]),
+        ("missing", []),
+    ],
+)
+def test_if_can_select_by_tag_expression(storage, expression, keys):
+    assert storage.tagged_keys(tags=expression) == keys
+
+
+def test_if_can_select_checked_keys_by_tag_expression(storage):
+    storage.set_unchecked(key="go")
+
+    assert storage.checked_keys(tags="verbs") == ["went"]
+    assert storage.checked_keys(tags=None) == ["went", "apple", "table", "be"]
+    assert storage.checked_items(tags="verbs") == [("went", "went")]
+
+
+def test_if_can_untag_deleted_records(storage):
+    del storage["went"]
+
+    assert storage.tagged_keys(tags="verbs | irregular") == ["go"]
+
+
+@mark.parametrize("expression", ["", "verbs |", "& verbs", "(verbs", "verbs)", "!"])
+def test_if_rejects_incorrect_tag_expressions(storage, expression):
+    with raises(ValueError):
+        storage.tagged_keys(tags=expression)
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+from pandas.testing import assert_frame_equal
+from pytest import fixture
+
+from core import analytics
+from core.repository.events import EventType
+from core.repository.models import Event
+from core.repository.repositories import Storage
+
+MIDNIGHT = datetime(2021, 11, 29)
+
+
+@fixture
+def storage(tmp_path):
+    storage = Storage(path=str(tmp_path / "boost.db"))
+    storage["foo"] = "1"
+    storage["bar"] = "2"
+    storage["baz"] = "3"
+
+    ids = {
+        key: id
+        for key, (_, _, id) in [(key, storage.record(key)) for key in storage.keys()]
+    }
+    events = [
+        ("foo", EventType.FAILURE, timedelta(hours=0)),
+        ("foo", EventType.HINT, timedelta(hours=0, minutes=1)),
+        ("foo", EventType.SUCCESS, timedelta(hours=0, minutes=2)),
+        ("bar", EventType.SUCCESS, timedelta(hours=1)),
+        ("foo", EventType.SUCCESS, timedelta(days=2)),
+        ("bar", EventType.FAILURE, timedelta(days=2, hours=1)),
+    ]
+    with storage.engine.begin() as connection:
+        connection.execute(
+            Event.__table__.insert(),
+            [
+                {
+                    "record_id": ids[key],
+                    "event_type": event_type,
+                    "created_on": MIDNIGHT + offset,
+                    "updated_on": MIDNIGHT + offset,
+                }
+                for key, event_type, offset in events
+            ],
+        )
+
+    yield storage
+
+    storage.close()
+
+
+def test_if_loads_events_in_commit_order(storage):
+    events = analytics.load_events(storage, chunk_size=4)
+
+    assert events["event_type"].tolist() == [
+        analytics.FAILURE,
+        analytics.HINT,
+        analytics.SUCCESS,
+        analytics.SUCCESS,
+        analytics.SUCCESS,
+        analytics.FAILURE,
+    ]
+    assert events["created_on"].iloc[1] - events["created_on"].iloc[0] == 60
+    assert events["record_id"].nunique() == 2
+
+
+def test_if_loads_nothing_from_empty_dictionary(tmp_path):
+    storage = Storage(path=str(tmp_path / "empty.db"))
+
+    statistics = analytics.compute(analytics.load_events(storage))
+
+    assert statistics.accuracy.empty
+    assert statistics.learning_curve.empty
+    assert statistics.retention["answers"].sum() == 0
+    assert statistics.daily_activity.empty
+    storage.close()
+
+
+def test_if_computes_accuracy_per_record(storage):
+    events = analytics.load_events(storage)
+    accuracy = analytics.accuracy(events, keys=analytics.load_keys(storage))
+
+    assert accuracy["key"].tolist() == ["bar", "foo"]
+    assert accuracy["successes"].tolist() == [1, 2]
+    assert accuracy["failures"].tolist() == [1, 1]
+    assert accuracy["hints"].tolist() == [0, 1]
+    assert accuracy["accuracy"].round(2).tolist() == [0.5, 0.67]
+
+
+def test_if_computes_learning_curve(storage):
+    curve = analytics.learning_curve(analytics.load_events(storage))
+
+    assert curve.index.tolist() == [1, 2, 3]
+    assert curve["answers"].tolist() == [2, 2, 1]
+    assert curve["accuracy"].tolist() == [0.5, 0.5, 1.0]
+
+
+def test_if_computes_retention(storage):
+    retention = analytics.retention(analytics.load_events(storage))
+
+    # foo: 2 minutes then 2 days after the previous answer, bar: 2 days.
+    assert retention["answers"].tolist() == [1, 0, 2, 0, 0]
+    assert retention["recall"].tolist() == [1.0, 0.0, 0.5, 0.0, 0.0]
+
+
+def test_if_computes_daily_activity(storage):
+    activity = analytics.daily_activity(analytics.load_events(storage))
+
+    assert [str(day.date()) for day in activity.index] == [
+        "2021-11-29",
+        "2021-11-30",
+        "2021-12-01",
+    ]
+    assert activity.values.tolist() == [[2, 1, 1], [0, 0, 0], [1, 1, 0]]
+
+
+def _assert_same_statistics(left, right):
+    for field in analytics.Statistics._fields:
+        assert_frame_equal(
+            getattr(left, field).sort_index(),
+            getattr(right, field).sort_index(),
+            check_dtype=False,
+            check_index_type=False,
+            check_freq=False,
+        )
+
+
+def test_if_rollups_catch_up_with_history(storage):
+    assert storage.refresh_statistics() == 6
+    assert storage.refresh_statistics() == 0
+
+    _assert_same_statistics(
+        analytics.load_statistics(storage),
+        analytics.compute(
+            analytics.load_events(storage), keys=analytics.load_keys(storage)
+        ),
+    )
+
+
+def test_if_rollups_follow_committed_events(storage):
+    storage.refresh_statistics()
+
+    storage.commit_failure_event(key="baz")
+    storage.commit_success_event(key="baz")
+    storage.commit_hint_event(key="foo")
+    storage.commit_success_event(key="bar")
+
+    assert storage.refresh_statistics() == 0
+    _assert_same_statistics(
+        analytics.load_statistics(storage),
+        analytics.compute(
+            analytics.load_events(storage), keys=analytics.load_keys(storage)
+        ),
+    )
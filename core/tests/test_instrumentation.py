@@ -0,0 +1,73 @@
+import json
+import time
+
+from pytest import fixture
+
+from core import instrumentation
+from core.repository.repositories import Storage
+
+
+@fixture
+def enabled():
+    instrumentation.reset()
+    instrumentation.enable()
+
+    yield
+
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_if_records_nothing_when_disabled():
+    instrumentation.reset()
+
+    with instrumentation.timer("foo"):
+        pass
+
+    assert instrumentation.snapshot() == {}
+
+
+def test_if_can_time_operations(enabled):
+    @instrumentation.timed("bar")
+    def bar():
+        time.sleep(0.001)
+        return 42
+
+    for _ in range(3):
+        with instrumentation.timer("foo"):
+            pass
+    assert bar() == 42
+
+    operations = instrumentation.snapshot()
+
+    assert operations["foo"]["calls"] == 3
+    assert operations["bar"]["calls"] == 1
+    assert 1000 <= operations["bar"]["p50_us"] <= operations["bar"]["max_us"] * 2
+    assert sum(operations["bar"]["buckets_us"].values()) == 1
+
+
+def test_if_counts_queries_of_operations(enabled):
+    storage = Storage()
+
+    with instrumentation.timer("outer"):
+        storage["foo"] = "1"
+        assert storage["foo"] == "1"
+
+    operations = instrumentation.snapshot()
+
+    assert operations["storage.set"]["calls"] == 1
+    assert operations["storage.get"]["queries"] == 1
+    assert operations["outer"]["queries"] == (
+        operations["storage.set"]["queries"] + operations["storage.get"]["queries"]
+    )
+    assert operations["sql"]["calls"] >= operations["outer"]["queries"]
+
+
+def test_if_can_dump_json(enabled, tmp_path):
+    with instrumentation.timer("foo"):
+        pass
+
+    path = tmp_path / "instrumentation.json"
+    instrumentation.dump(path=str(path))
+
+    assert json.loads(path.read_text())["operations"]["foo"]["calls"] == 1
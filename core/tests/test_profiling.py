@@ -0,0 +1,82 @@
+import json
+import pstats
+import threading
+import time
+
+from pytest import raises
+
+from core import profiling
+
+
+def _busy(seconds):
+    finished = time.perf_counter() + seconds
+    while time.perf_counter() < finished:
+        pass
+
+
+def test_if_reads_mode_from_environment(monkeypatch):
+    monkeypatch.delenv("RBOOST_PROFILE", raising=False)
+    assert profiling.mode_from_environment() is None
+
+    monkeypatch.setenv("RBOOST_PROFILE", "0")
+    assert profiling.mode_from_environment() is None
+
+    monkeypatch.setenv("RBOOST_PROFILE", "sampling")
+    assert profiling.mode_from_environment() == "sampling"
+
+    monkeypatch.setenv("RBOOST_PROFILE", "1")
+    assert profiling.mode_from_environment() == "cprofile"
+
+
+def _busy_elsewhere(seconds):
+    _busy(seconds)
+
+
+def test_if_writes_pstats(tmp_path):
+    path = str(tmp_path / "boost.pstats")
+
+    with profiling.profiled(mode="cprofile", path=path):
+        _busy(0.01)
+
+        thread = threading.Thread(target=_busy_elsewhere, args=(0.01,))
+        thread.start()
+        thread.join()
+
+    functions = {function for _, _, function in pstats.Stats(path).stats}
+    assert {"_busy", "_busy_elsewhere"} <= functions
+
+
+def test_if_writes_speedscope_samples(tmp_path):
+    path = tmp_path / "boost.speedscope.json"
+
+    with profiling.profiled(mode="sampling", path=str(path)):
+        thread = threading.Thread(
+            target=_busy_elsewhere, args=(0.2,), name="RepositoryWorker_0"
+        )
+        thread.start()
+        _busy(0.2)
+        thread.join()
+
+    content = json.loads(path.read_text(encoding="utf-8"))
+    frames = content["shared"]["frames"]
+    profiles = {profile["name"]: profile for profile in content["profiles"]}
+
+    assert content["profiles"][0]["name"] == "MainThread"
+    for name, function in [
+        ("MainThread", "_busy"),
+        ("RepositoryWorker_0", "_busy_elsewhere"),
+    ]:
+        profile = profiles[name]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"]) > 0
+        assert any(
+            function == frames[index]["name"]
+            for sample in profile["samples"]
+            for index in sample
+        )
+
+
+def test_if_rejects_unknown_mode(tmp_path):
+    with raises(ValueError):
+        with profiling.profiled(mode="perf", path=str(tmp_path / "boost")):
+            pass
@@ -1,7 +1,5 @@
 import re
 
-from fuzzywuzzy import fuzz
-
 from core.events import event
 
 
@@ -14,6 +12,10 @@ def mask_text(text, degree):
 
 
 def compare(left, right):
+    # Imported here: fuzzywuzzy is only needed once a quiz starts, not at
+    # application startup.
+    from fuzzywuzzy import fuzz
+
     strings = []
     for string in [left, right]:
         string = string.lower()
@@ -1,27 +1,41 @@
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from PyQt5 import QtCore
-from PyQt5.QtCore import QEvent, QPoint, QSettings, Qt, pyqtSlot
-from PyQt5.QtGui import QCloseEvent, QIcon, QPixmap
+from PyQt5.QtCore import (
+    QEvent,
+    QPoint,
+    QSettings,
+    QStandardPaths,
+    Qt,
+    QTimer,
+    pyqtSlot,
+)
+from PyQt5.QtGui import QCloseEvent, QFont, QIcon, QPixmap
 from PyQt5.QtWidgets import (
     QAction,
+    QComboBox,
     QDesktopWidget,
     QFileDialog,
+    QInputDialog,
+    QLabel,
     QListWidgetItem,
     QMainWindow,
     QMenu,
     QMessageBox,
+    QProgressBar,
+    QVBoxLayout,
 )
 
+from core import instrumentation
 from core.helpers import make_title_path
-from core.repository.repositories import Repository
+from core.quiz.sessions import Deck
+from core.repository.snapshots import read_snapshot, write_snapshot
 from core.text import mask_text
 from gui.dialog_boost import constants as dialog_boost_constants
 from gui.dialog_boost.Ui_MainWindowBoost import Ui_MainWindowBoost
-from gui.dialog_item_add.DialogItemAdd import DialogItemAdd
-from gui.dialog_item_edit.DialogItemEdit import DialogItemEdit
-from gui.quiz_dialog.DialogQuiz import DialogQuiz
+from gui.workers.RepositoryWorker import RepositoryWorker
 
 
 class Boost(QMainWindow, Ui_MainWindowBoost):
@@ -29,20 +43,68 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         QMainWindow.__init__(self)
         self.setupUi(self)
 
+        self.repository = None
+        # Path of the dictionary whose snapshot the list shows while it opens.
+        self.snapshotPath = None
+        # Hints the keys are masked with while a quiz runs, None otherwise.
+        self.maskedHints = None
+        self.snapshotCachePath = str(
+            Path(QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation))
+            / "RocketLabs/Boost/snapshot.json"
+        )
+
         self.customize()
         self.loadSettings()
 
     def customize(self):
         self.createChildWidgets()
+        self.createDeckSelector()
         self.createContextMenus()
         self.connectSignalsToSlots()
         self.installEventFilters()
         self.centerOnScreen()
 
     def createChildWidgets(self):
-        self.dialogItemAdd = DialogItemAdd(self)
-        self.dialogItemEdit = DialogItemEdit(self)
-        self.dialogQuiz = DialogQuiz(self)
+        # Dialogs are built on first use, see the properties below.
+        self.__dialogItemAdd = None
+        self.__dialogItemEdit = None
+        self.__dialogQuiz = None
+
+        self.repositoryWorker = RepositoryWorker(self)
+
+        self.progressTimer = QTimer(self)
+        self.progressTimer.setSingleShot(True)
+        self.progressTimer.setInterval(250)
+
+        # Picks up commits of other windows and processes to the same file.
+        self.changesTimer = QTimer(self)
+        self.changesTimer.setInterval(1000)
+        self.changesTimer.start()
+
+        self.progressBar = QProgressBar(self.statusbar)
+        self.progressBar.setRange(0, 0)
+        self.progressBar.setMaximumWidth(150)
+        self.progressBar.hide()
+        self.statusbar.addPermanentWidget(self.progressBar)
+
+    def createDeckSelector(self):
+        font = QFont()
+        font.setBold(True)
+        font.setWeight(75)
+
+        self.labelDeck = QLabel("Колода", self.centralwidget)
+        self.labelDeck.setFont(font)
+
+        self.comboBoxDeck = QComboBox(self.centralwidget)
+        self.comboBoxDeck.setEditable(True)
+        self.comboBoxDeck.setToolTip(
+            "Метка или выражение из меток, например: verbs & !irregular | nouns"
+        )
+
+        self.verticalLayoutDeck = QVBoxLayout()
+        self.verticalLayoutDeck.addWidget(self.labelDeck)
+        self.verticalLayoutDeck.addWidget(self.comboBoxDeck)
+        self.horizontalLayout.addLayout(self.verticalLayoutDeck)
 
     def createContextMenus(self):
         self.listWidgetExpressions.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -69,14 +131,53 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         actionDeleteExpression = QAction(
             iconDelete, "Удалить", self.menuExpressionsPopup
         )
+        actionTagExpression = QAction("Метки...", self.menuExpressionsPopup)
 
         actionAddExpression.triggered.connect(self.onAddItemClicked)
         actionEditExpression.triggered.connect(self.onEditItemClicked)
         actionDeleteExpression.triggered.connect(self.onDeleteItemClicked)
+        actionTagExpression.triggered.connect(self.onTagItemClicked)
 
         self.menuExpressionsPopup.addAction(actionAddExpression)
         self.menuExpressionsPopup.addAction(actionEditExpression)
         self.menuExpressionsPopup.addAction(actionDeleteExpression)
+        self.menuExpressionsPopup.addAction(actionTagExpression)
+
+        self.menuChecks = QMenu("Отметки", self)
+
+        actionCheckAll = QAction("Отметить все", self.menuChecks)
+        actionUncheckAll = QAction("Снять все отметки", self.menuChecks)
+        actionInvertChecks = QAction("Инвертировать отметки", self.menuChecks)
+        actionCheckByFilter = QAction("Отметить по фильтру...", self.menuChecks)
+
+        actionCheckAll.triggered.connect(self.onCheckAllTriggered)
+        actionUncheckAll.triggered.connect(self.onUncheckAllTriggered)
+        actionInvertChecks.triggered.connect(self.onInvertChecksTriggered)
+        actionCheckByFilter.triggered.connect(self.onCheckByFilterTriggered)
+
+        self.menuChecks.addAction(actionCheckAll)
+        self.menuChecks.addAction(actionUncheckAll)
+        self.menuChecks.addAction(actionInvertChecks)
+        self.menuChecks.addAction(actionCheckByFilter)
+
+        self.menuExpressionsPopup.addSeparator()
+        self.menuExpressionsPopup.addMenu(self.menuChecks)
+
+        self.menuDictionary.addSeparator()
+        self.menuDictionary.addMenu(self.menuChecks)
+
+        self.actionStatistics = QAction("Статистика...", self.menuDictionary)
+        self.actionStatistics.triggered.connect(self.onStatisticsTriggered)
+        self.menuDictionary.addAction(self.actionStatistics)
+
+        self.actionCompact = QAction("Сжать историю...", self.menuDictionary)
+        self.actionCompact.triggered.connect(self.onCompactTriggered)
+        self.menuDictionary.addAction(self.actionCompact)
+
+        if instrumentation.is_enabled():
+            actionInstrumentation = QAction("Производительность...", self.menuHelp)
+            actionInstrumentation.triggered.connect(self.onInstrumentationTriggered)
+            self.menuHelp.addAction(actionInstrumentation)
 
     def connectSignalsToSlots(self):
         self.pushButtonAddItem.clicked.connect(self.onAddItemClicked)
@@ -87,12 +188,6 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         self.listWidgetExpressions.itemDoubleClicked.connect(self.onItemDoubleClicked)
         self.listWidgetExpressions.itemChanged.connect(self.onItemChanged)
 
-        self.dialogItemAdd.emitItem.connect(self.onAddItem)
-        self.dialogItemEdit.emitItem.connect(self.onEditItem)
-
-        self.dialogQuiz.onDialogShown.connect(self.onQuizDialogShown)
-        self.dialogQuiz.onDialogHidden.connect(self.onQuizDialogHidden)
-
         self.actionNew.triggered.connect(self.onActionNewTriggered)
         self.actionSave.triggered.connect(self.onSaveActionTriggered)
         self.actionSaveAs.triggered.connect(self.onSaveAsActionTriggered)
@@ -101,6 +196,42 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         self.actionStart.triggered.connect(self.onStartActionTriggered)
         self.actionExit.triggered.connect(self.onActionExitTriggered)
 
+        self.repositoryWorker.busyChanged.connect(self.onRepositoryWorkerBusyChanged)
+        self.repositoryWorker.failed.connect(self.onRepositoryWorkerFailed)
+        self.progressTimer.timeout.connect(self.onProgressTimerTimeout)
+        self.changesTimer.timeout.connect(self.onChangesTimerTimeout)
+
+    @property
+    def dialogItemAdd(self):
+        if self.__dialogItemAdd is None:
+            from gui.dialog_item_add.DialogItemAdd import DialogItemAdd
+
+            self.__dialogItemAdd = DialogItemAdd(self)
+            self.__dialogItemAdd.emitItem.connect(self.onAddItem)
+
+        return self.__dialogItemAdd
+
+    @property
+    def dialogItemEdit(self):
+        if self.__dialogItemEdit is None:
+            from gui.dialog_item_edit.DialogItemEdit import DialogItemEdit
+
+            self.__dialogItemEdit = DialogItemEdit(self)
+            self.__dialogItemEdit.emitItem.connect(self.onEditItem)
+
+        return self.__dialogItemEdit
+
+    @property
+    def dialogQuiz(self):
+        if self.__dialogQuiz is None:
+            from gui.quiz_dialog.DialogQuiz import DialogQuiz
+
+            self.__dialogQuiz = DialogQuiz(self)
+            self.__dialogQuiz.onDialogShown.connect(self.onQuizDialogShown)
+            self.__dialogQuiz.onDialogHidden.connect(self.onQuizDialogHidden)
+
+        return self.__dialogQuiz
+
     def installEventFilters(self):
         self.listWidgetExpressions.viewport().installEventFilter(self)
 
@@ -110,20 +241,38 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         y = (resolution.height() / 2) - (self.frameSize().height() / 2)
         self.move(x, y)
 
+    def createItem(self, key: str, isChecked: bool) -> QListWidgetItem:
+        # The key itself is kept as the item's data, its text may be masked.
+        item = QListWidgetItem()
+        item.setText(self.itemText(key))
+        item.setData(Qt.UserRole, key)
+        item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+        item.setCheckState(QtCore.Qt.Checked if isChecked else QtCore.Qt.Unchecked)
+
+        return item
+
+    def itemText(self, key: str) -> str:
+        if self.maskedHints is None:
+            return key
+
+        return mask_text(key, self.maskedHints)
+
+    def updateItemTexts(self):
+        self.listWidgetExpressions.blockSignals(True)
+
+        for row in range(self.listWidgetExpressions.count()):
+            item = self.listWidgetExpressions.item(row)
+            item.setText(self.itemText(item.data(Qt.UserRole)))
+
+        self.listWidgetExpressions.blockSignals(False)
+        self.listWidgetExpressions.viewport().update()
+
     def maskContent(self):
         hint_index = self.comboBoxHint.currentIndex()
         hint_value = dialog_boost_constants.HINTS_INDEX_TO_VALUE_MAP.get(hint_index, 0)
 
-        self.listWidgetExpressions.clear()
-
-        for key in self.repository.keys():
-            masked_key = mask_text(key, hint_value)
-            is_checked = self.repository.is_checked(key=key)
-            item = QListWidgetItem()
-            item.setText(masked_key)
-            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
-            item.setCheckState(QtCore.Qt.Checked if is_checked else QtCore.Qt.Unchecked)
-            self.listWidgetExpressions.addItem(item)
+        self.maskedHints = hint_value
+        self.updateItemTexts()
 
         self.listWidgetExpressions.setCurrentRow(0)
 
@@ -132,29 +281,137 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         self.textEditMeaning.setText(masked_value)
 
     def unmaskContent(self):
-        self.listWidgetExpressions.clear()
-
-        for key in self.repository.keys():
-            is_checked = self.repository.is_checked(key=key)
-            item = QListWidgetItem()
-            item.setText(key)
-            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
-            item.setCheckState(QtCore.Qt.Checked if is_checked else QtCore.Qt.Unchecked)
-            self.listWidgetExpressions.addItem(item)
+        self.maskedHints = None
+        self.updateItemTexts()
 
         self.listWidgetExpressions.setCurrentRow(0)
+        # The meaning shown is still masked.
+        self.onCurrentRowChanged(self.listWidgetExpressions.currentRow())
+
+    @pyqtSlot()
+    def onInstrumentationTriggered(self):
+        from gui.dialog_instrumentation.DialogInstrumentation import (
+            DialogInstrumentation,
+        )
+
+        DialogInstrumentation(self).show()
+
+    @pyqtSlot()
+    def onStatisticsTriggered(self):
+        if self.repository is None:
+            return
+
+        def compute(storage):
+            # Pulls in pandas, only ever on the worker thread.
+            from core import analytics
+
+            storage.refresh_statistics()
+
+            return analytics.load_statistics(storage)
+
+        self.repositoryWorker.submit(
+            compute,
+            self.repository.storage,
+            description="Подсчет статистики",
+            onDone=self.onStatisticsComputed,
+        )
+
+    def onStatisticsComputed(self, statistics):
+        from gui.dialog_statistics.DialogStatistics import DialogStatistics
+
+        DialogStatistics(statistics, self).show()
+
+    @pyqtSlot()
+    def onCompactTriggered(self):
+        if self.repository is None:
+            return
+
+        days, ok = QInputDialog.getInt(
+            self,
+            "Сжать историю",
+            "Убрать ответы старше, дней (статистика сохранится):",
+            180,
+            0,
+        )
+        if not ok:
+            return
+
+        before = datetime.now() - timedelta(days=days)
+        archive_path = str(Path(self.repository.path).with_suffix(".events.csv.gz"))
+
+        self.repositoryWorker.submit(
+            self.repository.compact,
+            before,
+            archive_path,
+            description="Сжатие истории",
+            onDone=lambda removed: self.onCompacted(removed, archive_path),
+        )
+
+    def onCompacted(self, removed: int, archive_path: str) -> None:
+        if removed:
+            self.setWindowTitle(
+                "Boost - {}*".format(make_title_path(path=self.repository.path))
+            )
+            text = "Убрано ответов: {}. Они сохранены в {}.".format(
+                removed, make_title_path(path=archive_path)
+            )
+        else:
+            text = "Ответов старше указанного срока нет."
+
+        message_box = QMessageBox(parent=self)
+        message_box.setIcon(QMessageBox.Information)
+        message_box.setWindowTitle("Сжатие истории")
+        message_box.setText(text)
+        message_box.setStandardButtons(QMessageBox.Ok)
+        message_box.exec()
 
     @pyqtSlot()
     def onStartActionTriggered(self):
+        deck = self.comboBoxDeck.currentText().strip() or None
+
+        # The deck is read on the worker, answers go there as well.
+        self.repositoryWorker.submit(
+            Deck,
+            self.repository,
+            tags=deck,
+            description="Чтение колоды {}".format(deck or ""),
+            onDone=self.onDeckRead,
+            onFailed=lambda error: self.onDeckReadFailed(deck, error),
+        )
+
+    def onDeckRead(self, deck: Deck):
+        if not deck.values:
+            self.showWarning("В колоде {} нет отмеченных выражений!".format(deck.tags))
+            return
+
         hint_index = self.comboBoxHint.currentIndex()
         hint_value = dialog_boost_constants.HINTS_INDEX_TO_VALUE_MAP.get(hint_index, 0)
 
         self.dialogQuiz.hints = hint_value
         self.dialogQuiz.shuffle = self.comboBoxShuffle.currentIndex()
         self.dialogQuiz.order = self.comboBoxOrder.currentIndex()
-        self.dialogQuiz.repository = self.repository
+        self.dialogQuiz.deck = deck.tags
+        self.dialogQuiz.repository = deck
+        self.dialogQuiz.events = self.repository
+        self.dialogQuiz.worker = self.repositoryWorker
+
         self.dialogQuiz.show()
 
+    def onDeckReadFailed(self, deck: Optional[str], error: Exception):
+        if not isinstance(error, ValueError):
+            self.onRepositoryWorkerFailed("Чтение колоды", str(error))
+            return
+
+        self.showWarning("Некорректное выражение колоды: {}".format(deck))
+
+    def showWarning(self, text: str):
+        message_box = QMessageBox(parent=self)
+        message_box.setIcon(QMessageBox.Warning)
+        message_box.setWindowTitle("Внимание!")
+        message_box.setText(text)
+        message_box.setStandardButtons(QMessageBox.Ok)
+        message_box.exec()
+
     @pyqtSlot()
     def onActionExitTriggered(self):
         self.close()
@@ -168,35 +425,93 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         self.unmaskContent()
 
     @pyqtSlot(int)
+    @instrumentation.timed("slot.onCurrentRowChanged")
     def onCurrentRowChanged(self, current_row):
-        if -1 == current_row:
+        if -1 == current_row or self.snapshotPath:
             return
 
-        row = self.listWidgetExpressions.item(current_row)
+        key = self.listWidgetExpressions.item(current_row).data(Qt.UserRole)
+
+        self.repositoryWorker.submit(
+            self.repository.__getitem__,
+            key,
+            description="Чтение {}".format(key),
+            onDone=lambda value: self.showMeaning(key, value),
+        )
+
+    def showMeaning(self, key: str, value: Optional[str]):
+        # The current row may have moved on while the meaning was read.
+        item = self.listWidgetExpressions.currentItem()
+        if not item or item.data(Qt.UserRole) != key:
+            return
 
-        key = row.text()
-        value = self.repository[key]
+        value = value or ""
+        if self.maskedHints is not None:
+            value = mask_text(value, self.maskedHints)
 
         self.textEditMeaning.setText(value)
 
     @pyqtSlot(QListWidgetItem)
     def onItemDoubleClicked(self, item: QListWidgetItem):
-        expression = item.text()
-        meaning = self.repository[expression]
-
-        self.dialogItemEdit.setExpression(expression)
-        self.dialogItemEdit.setMeaning(meaning)
-        self.dialogItemEdit.show()
+        self.editItem(key=item.data(Qt.UserRole))
 
     @pyqtSlot(QListWidgetItem)
+    @instrumentation.timed("slot.onItemChanged")
     def onItemChanged(self, item: QListWidgetItem):
-        key = item.text()
+        key = item.data(Qt.UserRole)
         if item.checkState() == Qt.Checked:
-            self.repository.set_checked(key=key)
+            set_state = self.repository.set_checked
         else:
-            self.repository.set_unchecked(key=key)
+            set_state = self.repository.set_unchecked
+
+        self.repositoryWorker.submit(
+            set_state,
+            key=key,
+            description="Сохранение отметки {}".format(key),
+            onDone=lambda _: self.refreshStartMenuActionState(),
+        )
+
+    @pyqtSlot()
+    def onCheckAllTriggered(self):
+        self.repositoryWorker.submit(
+            self.repository.set_checked_all,
+            state=True,
+            description="Сохранение отметок",
+            onDone=lambda _: self.refreshCheckStates(),
+        )
 
-        self.updateStartMenuActionState()
+    @pyqtSlot()
+    def onUncheckAllTriggered(self):
+        self.repositoryWorker.submit(
+            self.repository.set_checked_all,
+            state=False,
+            description="Сохранение отметок",
+            onDone=lambda _: self.refreshCheckStates(),
+        )
+
+    @pyqtSlot()
+    def onInvertChecksTriggered(self):
+        self.repositoryWorker.submit(
+            self.repository.invert_checked,
+            description="Сохранение отметок",
+            onDone=lambda _: self.refreshCheckStates(),
+        )
+
+    @pyqtSlot()
+    def onCheckByFilterTriggered(self):
+        pattern, ok = QInputDialog.getText(
+            self, "Отметить по фильтру", "Отметить выражения, содержащие:"
+        )
+        pattern = str(pattern).strip()
+        if not ok or not pattern:
+            return
+
+        self.repositoryWorker.submit(
+            self.repository.set_checked_containing,
+            text=pattern,
+            description="Сохранение отметок",
+            onDone=lambda _: self.refreshCheckStates(),
+        )
 
     @pyqtSlot(QPoint)
     def onListWidgetExpressionsContextMenuRequested(self, point):
@@ -210,32 +525,50 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
 
     @pyqtSlot(str, str)
     def onAddItem(self, key, value):
-        if key in self.repository.keys():
-            return
+        def add(repository, key, value):
+            if repository[key] is not None:
+                return False
 
-        self.repository[key] = value
+            repository[key] = value
+            return True
 
-        item = QListWidgetItem()
-        item.setText(key)
-        item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
-        item.setCheckState(QtCore.Qt.Checked)
-        self.listWidgetExpressions.addItem(item)
+        self.repositoryWorker.submit(
+            add,
+            self.repository,
+            key,
+            value,
+            description="Сохранение {}".format(key),
+            onDone=lambda isAdded: self.onItemAdded(key, isAdded),
+        )
 
-        self.listWidgetExpressions.setCurrentItem(QListWidgetItem(key))
+    def onItemAdded(self, key: str, isAdded: bool):
+        if not isAdded:
+            return
+
+        item = self.createItem(key, isChecked=True)
+        self.listWidgetExpressions.addItem(item)
+        self.listWidgetExpressions.setCurrentItem(item)
 
         self.setWindowTitle(
             "Boost - {}*".format(make_title_path(path=self.repository.path))
         )
+        self.refreshStartMenuActionState()
 
     @pyqtSlot(str, str)
     def onEditItem(self, new_key: str, new_value: str) -> None:
         current_row = self.listWidgetExpressions.currentRow()
         item = self.listWidgetExpressions.takeItem(current_row)
-        old_key = item.text()
+        old_key = item.data(Qt.UserRole)
 
-        self.repository[old_key, new_key] = new_value
+        self.repositoryWorker.submit(
+            self.repository.__setitem__,
+            (old_key, new_key),
+            new_value,
+            description="Сохранение {}".format(new_key),
+        )
 
-        item.setText(new_key)
+        item.setText(self.itemText(new_key))
+        item.setData(Qt.UserRole, new_key)
         self.listWidgetExpressions.insertItem(current_row, item)
         self.listWidgetExpressions.setCurrentRow(current_row)
         self.textEditMeaning.setText(new_value)
@@ -247,15 +580,64 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
     @pyqtSlot()
     def onEditItemClicked(self):
         current_row = self.listWidgetExpressions.currentRow()
-        key = self.listWidgetExpressions.item(current_row).text()
-        value = self.repository[key]
+        if -1 == current_row:
+            return
+
+        self.editItem(
+            key=self.listWidgetExpressions.item(current_row).data(Qt.UserRole)
+        )
+
+    def editItem(self, key: str):
+        # Keys masked for a quiz are not given away in the dialog.
+        if self.maskedHints is not None:
+            return
+
+        self.repositoryWorker.submit(
+            self.repository.__getitem__,
+            key,
+            description="Чтение {}".format(key),
+            onDone=lambda value: self.showItemEdit(key, value),
+        )
 
+    def showItemEdit(self, key: str, value: Optional[str]):
         self.dialogItemEdit.setExpression(key)
         self.dialogItemEdit.setMeaning(value)
 
         self.dialogItemEdit.pushButtonOk.setText("Изменить")
         self.dialogItemEdit.show()
 
+    @pyqtSlot()
+    def onTagItemClicked(self):
+        current_row = self.listWidgetExpressions.currentRow()
+        if -1 == current_row or self.maskedHints is not None:
+            return
+
+        key = self.listWidgetExpressions.item(current_row).data(Qt.UserRole)
+        self.repositoryWorker.submit(
+            self.repository.tags_of,
+            key=key,
+            description="Чтение меток {}".format(key),
+            onDone=lambda names: self.editTags(key, names),
+        )
+
+    def editTags(self, key: str, names: List[str]):
+        names, ok = QInputDialog.getText(
+            self,
+            "Метки",
+            "Метки выражения {} через запятую:".format(key),
+            text=", ".join(names),
+        )
+        if not ok:
+            return
+
+        self.repositoryWorker.submit(
+            self.repository.set_tags,
+            key=key,
+            names=str(names).split(","),
+            description="Сохранение меток {}".format(key),
+            onDone=lambda _: self.refreshDeckSelector(),
+        )
+
     @pyqtSlot()
     def onDeleteItemClicked(self):
         current_row = self.listWidgetExpressions.currentRow()
@@ -267,11 +649,16 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
 
         item = self.listWidgetExpressions.takeItem(current_row)
 
-        key = item.text()
+        key = item.data(Qt.UserRole)
         if not key:
             return
 
-        del self.repository[key]
+        self.repositoryWorker.submit(
+            self.repository.__delitem__,
+            key,
+            description="Удаление {}".format(key),
+            onDone=lambda _: self.refreshStartMenuActionState(),
+        )
 
         self.setWindowTitle(
             "Boost - {}*".format(make_title_path(path=self.repository.path))
@@ -279,7 +666,8 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
 
     @pyqtSlot()
     def onActionNewTriggered(self):
-        if self.repository.backup_path:
+        self.repositoryWorker.wait()
+        if self.repository is not None and self.repository.backup_path:
             message_box = QMessageBox(parent=self)
             message_box.setIcon(QMessageBox.Question)
             message_box.setWindowTitle("Внимание!")
@@ -301,24 +689,28 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         home_directory = Path(__file__).resolve().parents[2]
         default_path = home_directory / "dictionaries/new.db"
 
-        Path(default_path).unlink(missing_ok=True)
+        previous = self.repository
 
-        self.repository = Repository(path=str(default_path))
+        def create_repository(path):
+            from core.repository.repositories import delete_database
 
-        self.listWidgetExpressions.clear()
-        self.textEditMeaning.clear()
-        self.setWindowTitle(
-            "Boost - {}*".format(make_title_path(path=self.repository.path))
+            self.closeRepository(previous)
+            delete_database(path=path)
+
+            return self.openRepository(path=path)
+
+        self.setLoading(True)
+        self.repositoryWorker.submit(
+            create_repository,
+            path=str(default_path),
+            description="Создание {}".format(default_path),
+            onDone=lambda result: self.onRepositoryLoaded(result, isModified=True),
+            onFailed=self.onRepositoryLoadFailed,
         )
 
     @pyqtSlot()
     def onSaveActionTriggered(self):
         self.saveRepository()
-        self.saveSettings()
-
-        self.setWindowTitle(
-            "Boost - {}".format(make_title_path(path=self.repository.path))
-        )
 
     @pyqtSlot()
     def onSaveAsActionTriggered(self):
@@ -331,15 +723,11 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
             path += ".db"
 
         self.saveRepository(path=str(path))
-        self.saveSettings()
-
-        self.setWindowTitle(
-            "Boost - {}".format(make_title_path(path=self.repository.path))
-        )
 
     @pyqtSlot()
     def onActionOpenTriggered(self):
-        if self.repository.backup_path:
+        self.repositoryWorker.wait()
+        if self.repository is not None and self.repository.backup_path:
             message_box = QMessageBox()
             message_box.setIcon(QMessageBox.Question)
             message_box.setWindowTitle("Внимание!")
@@ -361,6 +749,12 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
             self.loadRepository(path=path)
 
     def closeEvent(self, event: QCloseEvent):
+        self.changesTimer.stop()
+        self.repositoryWorker.wait()
+        if self.repository is None:
+            self.repositoryWorker.shutdown()
+            return
+
         if self.repository.backup_path:
             message_box = QMessageBox(parent=self)
             message_box.setIcon(QMessageBox.Question)
@@ -376,6 +770,13 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
             if message_box.clickedButton() == ok_button:
                 self.saveRepository()
 
+        self.repositoryWorker.submit(
+            self.writeSnapshot,
+            self.repository,
+            self.snapshotCachePath,
+            description="Сохранение списка",
+        )
+        self.repositoryWorker.shutdown()
         self.saveSettings()
 
     def eventFilter(self, object, event):
@@ -406,32 +807,237 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
 
             return
 
-        self.repository = Repository(path=path)
+        self.setLoading(True)
+
+        # The list from the last session shows until the dictionary is open.
+        snapshot = read_snapshot(cache_path=self.snapshotCachePath, path=path)
+        if snapshot:
+            self.showSnapshot(snapshot)
+
+        previous = self.repository
+
+        def open_repository(path):
+            self.closeRepository(previous)
+
+            return self.openRepository(path=path)
+
+        self.repositoryWorker.submit(
+            open_repository,
+            path=path,
+            description="Загрузка {}".format(path),
+            onDone=self.onRepositoryLoaded,
+            onFailed=self.onRepositoryLoadFailed,
+        )
+
+    @staticmethod
+    def closeRepository(repository):
+        # Runs on the worker thread.
+        if repository is not None:
+            repository.storage.close()
+
+    @staticmethod
+    def openRepository(path: str):
+        # Runs on the worker thread.
+        from core.repository.caches import CachedRepository
+        from core.repository.repositories import Repository
+
+        repository = CachedRepository(Repository(path=path))
+        items = repository.items()
+
+        return repository, items
+
+    def onRepositoryLoaded(self, result, isModified: bool = False):
+        self.repository, items = result
+
+        self.setWindowTitle(
+            "Boost - {}{}".format(
+                make_title_path(path=self.repository.path), "*" if isModified else ""
+            )
+        )
+        if self.snapshotPath != str(Path(self.repository.path).resolve()):
+            self.listWidgetExpressions.clear()
+        self.snapshotPath = None
+        self.textEditMeaning.clear()
+
+        self.setLoading(False)
+        self.onRepositoryChanged(items)
+        if -1 == self.listWidgetExpressions.currentRow():
+            self.listWidgetExpressions.setCurrentRow(0)
 
-        self.setWindowTitle("Boost - {}".format(path))
+    @instrumentation.timed("gui.show_snapshot")
+    def showSnapshot(self, snapshot):
+        self.snapshotPath = snapshot.path
+
+        self.setWindowTitle("Boost - {}".format(make_title_path(path=snapshot.path)))
         self.listWidgetExpressions.clear()
         self.textEditMeaning.clear()
 
-        for key in self.repository.keys():
-            is_checked = self.repository.is_checked(key=key)
-            item = QListWidgetItem()
-            item.setText(key)
-            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
-            item.setCheckState(QtCore.Qt.Checked if is_checked else QtCore.Qt.Unchecked)
-            self.listWidgetExpressions.addItem(item)
+        for key, is_checked in snapshot.items:
+            self.listWidgetExpressions.addItem(self.createItem(key, is_checked))
+
+    @staticmethod
+    def writeSnapshot(repository, cache_path: str):
+        # Runs on the worker thread, the last job before it shuts down.
+        items = [(key, is_checked) for key, (_, is_checked) in repository.items()]
+
+        # Closed first: the checkpoint changes what the snapshot is keyed by.
+        repository.storage.close()
+
+        try:
+            write_snapshot(cache_path=cache_path, path=repository.path, items=items)
+        except OSError:
+            # Without a snapshot the next launch just waits for the dictionary.
+            pass
+
+    def onRepositoryLoadFailed(self, error: Exception):
+        if self.snapshotPath:
+            self.snapshotPath = None
+            self.listWidgetExpressions.clear()
+
+        self.setLoading(False)
+        if self.repository is None:
+            self.centralwidget.setEnabled(False)
+            for action in [self.actionSave, self.actionSaveAs, self.actionStart]:
+                action.setEnabled(False)
+
+        self.onRepositoryWorkerFailed("Загрузка", str(error))
+
+    def setLoading(self, isLoading: bool):
+        self.centralwidget.setEnabled(not isLoading)
+        for action in [
+            self.actionNew,
+            self.actionOpen,
+            self.actionSave,
+            self.actionSaveAs,
+            self.actionStart,
+        ]:
+            action.setEnabled(not isLoading)
+
+    @pyqtSlot(bool, str)
+    def onRepositoryWorkerBusyChanged(self, isBusy: bool, description: str):
+        if isBusy:
+            if not self.progressTimer.isActive() and self.progressBar.isHidden():
+                self.progressTimer.start()
+            else:
+                self.statusbar.showMessage(description)
+        else:
+            self.progressTimer.stop()
+            self.progressBar.hide()
+            self.statusbar.clearMessage()
+
+    @pyqtSlot()
+    def onProgressTimerTimeout(self):
+        if self.repositoryWorker.isBusy:
+            self.progressBar.show()
 
-        self.listWidgetExpressions.setCurrentRow(0)
-        self.updateStartMenuActionState()
+    @pyqtSlot()
+    def onChangesTimerTimeout(self):
+        if self.repository is None or self.repositoryWorker.isBusy:
+            return
+
+        self.repositoryWorker.submit(
+            self.readChanges,
+            self.repository,
+            description="Обновление {}".format(self.repository.path),
+            onDone=self.onChangesRead,
+        )
+
+    @staticmethod
+    def readChanges(repository):
+        if not repository.is_stale():
+            return None
+
+        return repository.items()
+
+    def onChangesRead(self, items):
+        if items is not None:
+            self.onRepositoryChanged(items)
+
+    @instrumentation.timed("gui.update_list")
+    def onRepositoryChanged(self, items):
+        # Only rows that differ are touched, matched on their keys, not texts.
+        keys = {key for key, _ in items}
+
+        self.listWidgetExpressions.blockSignals(True)
+
+        for row in reversed(range(self.listWidgetExpressions.count())):
+            if self.listWidgetExpressions.item(row).data(Qt.UserRole) not in keys:
+                self.listWidgetExpressions.takeItem(row)
+
+        for row, (key, (_, is_checked)) in enumerate(items):
+            check_state = Qt.Checked if is_checked else Qt.Unchecked
+
+            item = self.listWidgetExpressions.item(row)
+            if not item or item.data(Qt.UserRole) != key:
+                item = self.createItem(key, is_checked)
+                self.listWidgetExpressions.insertItem(row, item)
+
+            elif item.checkState() != check_state:
+                item.setCheckState(check_state)
+
+        while self.listWidgetExpressions.count() > len(items):
+            self.listWidgetExpressions.takeItem(len(items))
+
+        self.listWidgetExpressions.blockSignals(False)
+        self.listWidgetExpressions.viewport().update()
+
+        self.onCurrentRowChanged(self.listWidgetExpressions.currentRow())
+        self.refreshStartMenuActionState()
+        self.refreshDeckSelector()
+
+    @pyqtSlot(str, str)
+    def onRepositoryWorkerFailed(self, description: str, error: str):
+        message_box = QMessageBox(parent=self)
+        message_box.setIcon(QMessageBox.Critical)
+        message_box.setWindowTitle("Ошибка!")
+        message_box.setText("{}: {}".format(description, error))
+        message_box.setStandardButtons(QMessageBox.Ok)
+        message_box.exec()
 
     def saveRepository(self, path: Optional[str] = None):
-        self.repository.save(path=path)
+        def onSaved(_):
+            self.saveSettings()
+            self.setWindowTitle(
+                "Boost - {}".format(make_title_path(path=self.repository.path))
+            )
+
+        self.repositoryWorker.submit(
+            self.repository.save,
+            path=path,
+            description="Сохранение {}".format(path or self.repository.path),
+            onDone=onSaved,
+        )
 
     def restoreRepository(self):
-        self.repository.restore()
+        self.repositoryWorker.submit(
+            self.repository.restore,
+            description="Восстановление {}".format(self.repository.path),
+        )
+
+    def createDefaultRepository(self, path: str, isNew: bool = False):
+        previous = self.repository
 
-    def createDefaultRepository(self, path: str):
-        default_repository = Repository(path=path)
-        default_repository["hello"] = "used to greet someone"
+        def create_repository(path):
+            from core.repository.repositories import Repository, delete_database
+
+            self.closeRepository(previous)
+            if isNew:
+                delete_database(path=path)
+
+            default_repository = Repository(path=path)
+            default_repository["hello"] = "used to greet someone"
+            default_repository.storage.close()
+
+            return self.openRepository(path=path)
+
+        self.setLoading(True)
+        self.repositoryWorker.submit(
+            create_repository,
+            path=path,
+            description="Создание {}".format(path),
+            onDone=self.onRepositoryLoaded,
+            onFailed=self.onRepositoryLoadFailed,
+        )
 
     def loadSettings(self):
         settings = QSettings("RocketLabs", "Boost")
@@ -445,15 +1051,15 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         order_index = settings.value("comboboxOrder_currentIndex", 0, type=int)
         self.comboBoxOrder.setCurrentIndex(order_index)
 
+        deck = settings.value("comboBoxDeck_currentText", "", type=str)
+        self.comboBoxDeck.setCurrentText(deck)
+
         repository_path = settings.value("repositoryPath", "", type=str)
         if not repository_path:
             home_directory = Path(__file__).resolve().parents[2]
             default_path = home_directory / "dictionaries/hello.db"
 
-            Path(default_path).unlink(missing_ok=True)
-
-            self.createDefaultRepository(path=str(default_path))
-            self.loadRepository(path=str(default_path))
+            self.createDefaultRepository(path=str(default_path), isNew=True)
 
         elif not Path(repository_path).is_file():
             message_box = QMessageBox()
@@ -469,7 +1075,6 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
             default_path = home_directory / "dictionaries/hello.db"
 
             self.createDefaultRepository(path=str(default_path))
-            self.loadRepository(path=str(default_path))
 
         else:
             self.loadRepository(path=str(repository_path))
@@ -483,16 +1088,54 @@ class Boost(QMainWindow, Ui_MainWindowBoost):
         settings.setValue(
             "comboboxOrder_currentIndex", self.comboBoxOrder.currentIndex()
         )
+        settings.setValue("comboBoxDeck_currentText", self.comboBoxDeck.currentText())
         settings.setValue("repositoryPath", str(self.repository.path))
 
-    def updateStartMenuActionState(self):
-        checked_items = []
-        for row in range(self.listWidgetExpressions.count()):
+    def refreshCheckStates(self):
+        self.repositoryWorker.submit(
+            self.repository.items,
+            description="Чтение отметок",
+            onDone=self.updateCheckStates,
+        )
+
+    def updateCheckStates(self, items):
+        # Blocked, so that bulk changes do not come back through onItemChanged.
+        self.listWidgetExpressions.blockSignals(True)
+
+        for row, (_, (_, is_checked)) in enumerate(items):
             item = self.listWidgetExpressions.item(row)
-            if item.checkState() == Qt.Checked:
-                checked_items.append(item)
+            if item:
+                item.setCheckState(Qt.Checked if is_checked else Qt.Unchecked)
+
+        self.listWidgetExpressions.blockSignals(False)
+        self.listWidgetExpressions.viewport().update()
+
+        self.refreshStartMenuActionState()
+
+    def refreshDeckSelector(self):
+        self.repositoryWorker.submit(
+            self.repository.tags,
+            description="Чтение меток",
+            onDone=self.updateDeckSelector,
+        )
+
+    def updateDeckSelector(self, tags: List[str]):
+        deck = self.comboBoxDeck.currentText()
+
+        self.comboBoxDeck.clear()
+        self.comboBoxDeck.addItem("")
+        self.comboBoxDeck.addItems(tags)
+        self.comboBoxDeck.setCurrentText(deck)
+
+    def refreshStartMenuActionState(self):
+        self.repositoryWorker.submit(
+            self.repository.checked_count,
+            description="Подсчет отметок",
+            onDone=self.updateStartMenuActionState,
+        )
 
-        if len(checked_items):
+    def updateStartMenuActionState(self, checkedCount: int):
+        if checkedCount:
             self.actionStart.setEnabled(True)
         else:
             self.actionStart.setEnabled(False)
@@ -0,0 +1,98 @@
+from PyQt5.QtCore import Qt, QTimer, pyqtSlot
+from PyQt5.QtWidgets import (
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from core import instrumentation
+
+COLUMNS = [
+    ("Операция", None),
+    ("Вызовы", "calls"),
+    ("Среднее, мкс", "mean_us"),
+    ("p50, мкс", "p50_us"),
+    ("p95, мкс", "p95_us"),
+    ("p99, мкс", "p99_us"),
+    ("Макс., мкс", "max_us"),
+    ("SQL", "queries"),
+]
+
+
+class DialogInstrumentation(QDialog):
+    """
+    Debug panel with the histograms collected by core.instrumentation,
+    refreshed every second while it is open.
+    """
+
+    def __init__(self, parent=None):
+        QDialog.__init__(self, parent)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+
+        self.__customize()
+        self.refresh()
+
+    def __customize(self):
+        self.setWindowTitle("Производительность")
+        self.resize(800, 400)
+
+        self.tableWidget = QTableWidget(0, len(COLUMNS), self)
+        self.tableWidget.setHorizontalHeaderLabels([title for title, _ in COLUMNS])
+        self.tableWidget.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tableWidget.setSortingEnabled(True)
+
+        self.pushButtonReset = QPushButton("Сбросить", self)
+        self.pushButtonSave = QPushButton("Сохранить JSON...", self)
+        self.pushButtonClose = QPushButton("Закрыть", self)
+
+        horizontalLayout = QHBoxLayout()
+        horizontalLayout.addWidget(self.pushButtonReset)
+        horizontalLayout.addWidget(self.pushButtonSave)
+        horizontalLayout.addStretch()
+        horizontalLayout.addWidget(self.pushButtonClose)
+
+        verticalLayout = QVBoxLayout(self)
+        verticalLayout.addWidget(self.tableWidget)
+        verticalLayout.addLayout(horizontalLayout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.start()
+
+        self.timer.timeout.connect(self.refresh)
+        self.pushButtonReset.clicked.connect(self.onPushButtonResetClicked)
+        self.pushButtonSave.clicked.connect(self.onPushButtonSaveClicked)
+        self.pushButtonClose.clicked.connect(self.close)
+
+    @pyqtSlot()
+    def refresh(self):
+        operations = instrumentation.snapshot()
+
+        self.tableWidget.setSortingEnabled(False)
+        self.tableWidget.setRowCount(len(operations))
+        for row, (name, summary) in enumerate(sorted(operations.items())):
+            for column, (_, field) in enumerate(COLUMNS):
+                item = QTableWidgetItem()
+                if field:
+                    item.setData(Qt.DisplayRole, round(summary[field], 1))
+                else:
+                    item.setText(name)
+                self.tableWidget.setItem(row, column, item)
+        self.tableWidget.setSortingEnabled(True)
+
+    @pyqtSlot()
+    def onPushButtonResetClicked(self):
+        instrumentation.reset()
+        self.refresh()
+
+    @pyqtSlot()
+    def onPushButtonSaveClicked(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить", "instrumentation.json", "JSON (*.json)"
+        )
+        if path:
+            instrumentation.dump(path=path)
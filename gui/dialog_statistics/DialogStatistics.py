@@ -0,0 +1,121 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QTabWidget,
+    QVBoxLayout,
+)
+
+# Worst known first; an item per cell gets slow past a few thousand rows.
+MAX_RECORDS = 1000
+
+TABS = [
+    (
+        "accuracy",
+        "Записи",
+        [
+            ("Выражение", "key"),
+            ("Верно", "successes"),
+            ("Неверно", "failures"),
+            ("Подсказки", "hints"),
+            ("Точность, %", "accuracy"),
+        ],
+    ),
+    (
+        "learning_curve",
+        "Кривая обучения",
+        [("Попытка", None), ("Ответы", "answers"), ("Точность, %", "accuracy")],
+    ),
+    (
+        "retention",
+        "Удержание",
+        [("Перерыв", None), ("Ответы", "answers"), ("Вспомнено, %", "recall")],
+    ),
+    (
+        "daily_activity",
+        "Активность",
+        [
+            ("День", None),
+            ("Верно", "successes"),
+            ("Неверно", "failures"),
+            ("Подсказки", "hints"),
+        ],
+    ),
+]
+
+PERCENT_COLUMNS = ["accuracy", "recall"]
+
+
+class DialogStatistics(QDialog):
+    """
+    Statistics computed by core.analytics from the events of a dictionary,
+    one table per tab.
+    """
+
+    def __init__(self, statistics, parent=None):
+        QDialog.__init__(self, parent)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+
+        self.__customize(statistics)
+
+    def __customize(self, statistics):
+        self.setWindowTitle("Статистика")
+        self.resize(700, 500)
+
+        self.tabWidget = QTabWidget(self)
+        for field, title, columns in TABS:
+            frame = getattr(statistics, field)
+            if "accuracy" == field:
+                frame = frame.head(MAX_RECORDS)
+            self.tabWidget.addTab(self.__table(frame, columns), title)
+
+        answers = int(statistics.accuracy[["successes", "failures"]].values.sum())
+        self.labelSummary = QLabel(
+            f"Ответов: {answers}, записей с ответами: {len(statistics.accuracy)}",
+            self,
+        )
+        self.pushButtonClose = QPushButton("Закрыть", self)
+
+        horizontalLayout = QHBoxLayout()
+        horizontalLayout.addWidget(self.labelSummary)
+        horizontalLayout.addStretch()
+        horizontalLayout.addWidget(self.pushButtonClose)
+
+        verticalLayout = QVBoxLayout(self)
+        verticalLayout.addWidget(self.tabWidget)
+        verticalLayout.addLayout(horizontalLayout)
+
+        self.pushButtonClose.clicked.connect(self.close)
+
+    def __table(self, frame, columns) -> QTableWidget:
+        table = QTableWidget(len(frame), len(columns), self)
+        table.setHorizontalHeaderLabels([title for title, _ in columns])
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().hide()
+
+        for row, (label, values) in enumerate(frame.iterrows()):
+            for column, (_, field) in enumerate(columns):
+                item = QTableWidgetItem()
+                if field is None:
+                    # Days come as timestamps, shown without the time.
+                    item.setText(
+                        label.strftime("%Y-%m-%d")
+                        if hasattr(label, "strftime")
+                        else str(label)
+                    )
+                elif field in PERCENT_COLUMNS:
+                    item.setData(Qt.DisplayRole, round(100 * float(values[field]), 1))
+                elif isinstance(values[field], str):
+                    item.setText(values[field])
+                else:
+                    item.setData(Qt.DisplayRole, int(values[field]))
+                table.setItem(row, column, item)
+
+        table.setSortingEnabled(True)
+        table.resizeColumnsToContents()
+
+        return table
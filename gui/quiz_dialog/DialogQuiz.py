@@ -1,15 +1,9 @@
-import random
-from datetime import datetime
-from itertools import cycle
-
 from PyQt5.QtCore import QEvent, Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QFocusEvent, QTextCursor
 from PyQt5.QtWidgets import QDialog
 
-from core.diff import diff_match_patch
-from core.events import event
-from core.text import compare, mask_text
-from gui.dialog_compare.DialogCompare import DialogCompare
+from core.instrumentation import timed, timer
+from core.quiz.sessions import Mode, QuizSession
 from gui.quiz_dialog.Ui_DialogQuiz import Ui_DialogQuiz
 
 
@@ -21,14 +15,16 @@ class DialogQuiz(Ui_DialogQuiz, QDialog):
         QDialog.__init__(self, parent)
         self.setupUi(self)
 
-        self.__compareDialog = DialogCompare(self)
+        self.__compareDialog = None
 
         self.hints = 0
         self.shuffle = 0
         self.order = 0
+        self.deck = None
         self.repository = None
-        self.current_index = 0
-        self.series = None
+        self.events = None
+        self.worker = None
+        self.session = None
 
         self.timer = QTimer()
         self.timer.setSingleShot(True)
@@ -36,6 +32,16 @@ class DialogQuiz(Ui_DialogQuiz, QDialog):
 
         self.__customize()
 
+    @property
+    def compareDialog(self):
+        # Only a wrong answer needs it, so it is built on the first one.
+        if self.__compareDialog is None:
+            from gui.dialog_compare.DialogCompare import DialogCompare
+
+            self.__compareDialog = DialogCompare(self)
+
+        return self.__compareDialog
+
     def __customize(self):
         self.__connectSignalsToSlots()
 
@@ -85,40 +91,21 @@ class DialogQuiz(Ui_DialogQuiz, QDialog):
     def showEvent(self, showEvent):
         self.onDialogShown.emit()  # mask MainWindow
 
-        checked_items = {
-            index: key
-            for index, (key, (_, is_checked)) in enumerate(self.repository.items())
-            if is_checked
-        }
-        checked_indexes = list(checked_items.keys())
-
-        def make_series(keys):
-            yield from cycle(keys)
-
-        def make_random_series(keys):
-            random.seed(int(datetime.utcnow().timestamp()))
-
-            while True:
-                yield random.choice(keys)
-
-        if 0 == self.order:
-            self.series = self.series or make_series(
-                keys=sorted(checked_indexes, reverse=False)
-            )
-
-        elif 1 == self.order:
-            self.series = self.series or make_series(
-                keys=sorted(checked_indexes, reverse=True)
-            )
-
-        else:
-            self.series = self.series or make_random_series(keys=checked_indexes)
+        self.session = self.session or QuizSession(
+            repository=self.repository,
+            order=self.order,
+            mode=self.shuffle,
+            hints=self.hints,
+            deck=self.deck,
+            dispatch=self.__dispatch,
+            events=self.events,
+        )
 
         self.take_next()
 
     def hideEvent(self, hideEvent):
         self.onDialogHidden.emit()
-        self.series = None
+        self.session = None
 
     @pyqtSlot()
     def __onAlphabetButtonClicked(self):
@@ -129,43 +116,36 @@ class DialogQuiz(Ui_DialogQuiz, QDialog):
         self.__activeInputWidget.setFocus()
 
     @pyqtSlot()
+    @timed("slot.onPushButtonCheckClicked")
     def __onPushButtonCheckClicked(self):
-        key = list(self.repository.keys())[self.current_index]
-        value = self.repository[key]
-
         expression = self.textEditExpression.toPlainText()
         meaning = self.textEditMeaning.toPlainText()
 
-        if compare(key, expression) >= 95 and compare(value, meaning) >= 99:
+        with timer("quiz.check"):
+            result = self.session.submit(expression=expression, meaning=meaning)
+
+        if result.is_correct:
             self.flashGreen()
-            self.repository.commit_success_event(key=key)
         else:
             self.flashRed()
-            self.repository.commit_failure_event(key=key)
 
-            correct_answer = ""
-            user_answer = ""
-            if key != expression:
-                correct_answer = key
-                user_answer = expression
+            with timer("quiz.diff"):
+                from core.diff import diff_match_patch
 
-            if value != meaning:
-                correct_answer = value
-                user_answer = meaning
+                self.compareDialog.textEditCorrectAnswer.setHtml(result.correct_answer)
+                DMP = diff_match_patch()
+                diffs = DMP.diff_main(result.correct_answer, result.user_answer)
+                html = DMP.diff_prettyHtml(diffs)
+                self.compareDialog.textEditUserAnswer.setHtml(html)
 
-            self.__compareDialog.textEditCorrectAnswer.setHtml(correct_answer)
-            DMP = diff_match_patch()
-            diffs = DMP.diff_main(correct_answer, user_answer)
-            html = DMP.diff_prettyHtml(diffs)
-            self.__compareDialog.textEditUserAnswer.setHtml(html)
-            self.__compareDialog.exec()
+            self.compareDialog.exec()
 
         self.take_next()
 
     @pyqtSlot()
     def __onPushButtonHintClicked(self):
-        key = list(self.repository.keys())[self.current_index]
-        self.repository.commit_hint_event(key=key)
+        with timer("quiz.hint"):
+            self.session.hint()
         self.flashYellow()
 
         self.take_next()
@@ -186,15 +166,15 @@ class DialogQuiz(Ui_DialogQuiz, QDialog):
     def __onPushButtonStartStopRecordingMouseReleased(self):
         print("Mouse released")
 
-    def makeExpressionQuiz(self):
-        self.current_index = next(self.series)
-        keys = list(self.repository.keys())
-        key = keys[self.current_index]
-
-        value = self.repository[key]
+    def __dispatch(self, commit, key):
+        if self.worker:
+            self.worker.submit(commit, key=key, description="Сохранение результата")
+        else:
+            commit(key=key)
 
-        self.textEditMeaning.setText(value)
-        self.textEditMeaning.setToolTip(mask_text(key, self.hints))
+    def makeExpressionQuiz(self, card):
+        self.textEditMeaning.setText(card.value)
+        self.textEditMeaning.setToolTip(card.hint)
         self.textEditMeaning.setEnabled(False)
 
         self.textEditExpression.clear()
@@ -202,15 +182,9 @@ class DialogQuiz(Ui_DialogQuiz, QDialog):
         self.textEditExpression.setEnabled(True)
         self.textEditExpression.setFocus()
 
-    def makeMeaningQuiz(self):
-        self.current_index = next(self.series)
-        keys = list(self.repository.keys())
-        key = keys[self.current_index]
-
-        value = self.repository[key]
-
-        self.textEditExpression.setText(key)
-        self.textEditExpression.setToolTip(mask_text(value, self.hints))
+    def makeMeaningQuiz(self, card):
+        self.textEditExpression.setText(card.key)
+        self.textEditExpression.setToolTip(card.hint)
         self.textEditExpression.setEnabled(False)
 
         self.textEditMeaning.clear()
@@ -219,15 +193,12 @@ class DialogQuiz(Ui_DialogQuiz, QDialog):
         self.textEditMeaning.setFocus()
 
     def take_next(self):
-        if 0 == self.shuffle:
-            self.makeExpressionQuiz()
-        elif 1 == self.shuffle:
-            self.makeMeaningQuiz()
-        else:
-            if event(0.5):
-                self.makeExpressionQuiz()
+        with timer("quiz.next"):
+            card = self.session.next_card()
+            if Mode.EXPRESSION == card.mode:
+                self.makeExpressionQuiz(card)
             else:
-                self.makeMeaningQuiz()
+                self.makeMeaningQuiz(card)
 
     def flashGreen(self):
         self.__setColor((139, 252, 113))
@@ -0,0 +1,67 @@
+"""
+Registers the application icons from the binary resource bundle.
+
+Resources.rcc holds the same resource tree as Resources.py, in the file
+format of `rcc -binary`. Qt memory-maps it, so the icons are never copied
+onto the Python heap, and there are no bytes literals to parse on every
+launch. Resources.py stays as the fallback when the bundle is missing or
+cannot be registered. `from gui.resources import Resources`, as the Ui
+modules have it, imports this module; see gui.resources.
+
+After the icons or Resources.qrc change, regenerate both files:
+
+    pyrcc5 gui/resources/Resources.qrc -o gui/resources/Resources.py
+    python -m gui.resources.Bundle
+"""
+
+import importlib
+import struct
+from pathlib import Path
+
+from PyQt5.QtCore import QResource
+
+BUNDLE_PATH = Path(__file__).resolve().parent / "Resources.rcc"
+
+_MAGIC = b"qres"
+_HEADER_SIZE = len(_MAGIC) + 4 * 4
+
+
+def build(path: Path = BUNDLE_PATH) -> None:
+    """
+    Writes the resources compiled into Resources.py as a binary bundle.
+
+    Qt's rcc tool is not required: Resources.py already carries the tree,
+    names and data sections, only the header and their offsets are added.
+    """
+    # Not "from gui.resources import Resources", which resolves to this module.
+    Resources = importlib.import_module("gui.resources.Resources")
+
+    data_offset = _HEADER_SIZE
+    names_offset = data_offset + len(Resources.qt_resource_data)
+    tree_offset = names_offset + len(Resources.qt_resource_name)
+
+    header = _MAGIC + struct.pack(">IIII", 1, tree_offset, data_offset, names_offset)
+    Path(path).write_bytes(
+        header
+        + Resources.qt_resource_data
+        + Resources.qt_resource_name
+        + Resources.qt_resource_struct
+    )
+
+
+def qInitResources() -> bool:
+    if BUNDLE_PATH.is_file() and QResource.registerResource(str(BUNDLE_PATH)):
+        return True
+
+    # Registers its resources on import.
+    importlib.import_module("gui.resources.Resources")
+
+    return False
+
+
+qInitResources()
+
+
+if "__main__" == __name__:
+    build()
+    print(f"{BUNDLE_PATH}: {BUNDLE_PATH.stat().st_size} bytes")
@@ -0,0 +1,14 @@
+"""
+The Ui modules import `Resources` from here, as pyuic generates them. The
+name resolves to Bundle, which registers the memory-mapped Resources.rcc
+and only falls back to importing the Resources.py module.
+"""
+
+
+def __getattr__(name: str):
+    if "Resources" == name:
+        from gui.resources import Bundle
+
+        return Bundle
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
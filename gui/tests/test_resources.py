@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from pytest import importorskip
+
+ICONS = Path(__file__).resolve().parents[1] / "resources/icons"
+
+
+def test_if_bundle_is_up_to_date(tmp_path):
+    importorskip("PyQt5.QtCore")
+    from gui.resources.Bundle import BUNDLE_PATH, build
+
+    path = tmp_path / "Resources.rcc"
+    build(path=path)
+
+    assert path.read_bytes() == BUNDLE_PATH.read_bytes()
+
+
+def test_if_can_read_icons_from_bundle():
+    QtCore = importorskip("PyQt5.QtCore")
+    from gui.resources.Bundle import qInitResources
+
+    assert qInitResources() is True
+
+    for name in ["ok.png", "run.png", "add.svg"]:
+        file = QtCore.QFile(f":/all/icons/{name}")
+        assert file.open(QtCore.QFile.ReadOnly)
+        assert bytes(file.readAll()) == (ICONS / name).read_bytes()
+        file.close()
@@ -0,0 +1,37 @@
+from pytest import importorskip
+
+from benchmarks.startup import importtime
+
+# Modules that are slow to import and not needed to show the main window:
+# the repository is opened on the worker thread, the dialogs on first use,
+# and icons come from the memory-mapped bundle.
+DEFERRED_MODULES = [
+    "sqlalchemy",
+    "fuzzywuzzy",
+    "core.diff",
+    "core.repository.repositories",
+    "gui.quiz_dialog.DialogQuiz",
+    "gui.dialog_compare.DialogCompare",
+    "gui.dialog_item_add.DialogItemAdd",
+    "gui.dialog_item_edit.DialogItemEdit",
+    "gui.resources.Resources",
+]
+
+
+def test_if_main_window_defers_heavy_imports():
+    importorskip("PyQt5.QtWidgets")
+
+    modules = importtime(statement="import gui.dialog_boost.MainDialogBoost")
+
+    assert "gui.dialog_boost.MainDialogBoost" in modules
+    assert [module for module in DEFERRED_MODULES if module in modules] == []
+
+
+def test_if_quiz_dialog_defers_answer_checking_imports():
+    importorskip("PyQt5.QtWidgets")
+
+    modules = importtime(statement="import gui.quiz_dialog.DialogQuiz")
+
+    assert "gui.quiz_dialog.DialogQuiz" in modules
+    for module in ["fuzzywuzzy", "core.diff", "gui.dialog_compare.DialogCompare"]:
+        assert module not in modules
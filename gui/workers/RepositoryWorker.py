@@ -0,0 +1,85 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+
+class RepositoryWorker(QObject):
+    """
+    Runs repository calls on one background thread, in submission order.
+
+    Results come back on the thread that owns the worker (the GUI thread)
+    through the onDone/onFailed callbacks of submit(); busyChanged reports
+    whether anything is still queued so that the window can show progress.
+    """
+
+    busyChanged = pyqtSignal(bool, str)
+    failed = pyqtSignal(str, str)
+
+    __completed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+
+        self.__executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="RepositoryWorker"
+        )
+        self.__pending = []
+
+        self.__completed.connect(self.__onCompleted)
+
+    @property
+    def isBusy(self) -> bool:
+        return bool(self.__pending)
+
+    def submit(
+        self,
+        function: Callable,
+        *args,
+        description: str = "",
+        onDone: Optional[Callable] = None,
+        onFailed: Optional[Callable] = None,
+        **kwargs,
+    ) -> Future:
+        future = self.__executor.submit(function, *args, **kwargs)
+        future.description = description
+        future.onDone = onDone
+        future.onFailed = onFailed
+
+        self.__pending.append(future)
+        self.busyChanged.emit(True, description)
+
+        # Emitted from the worker thread, delivered as a queued call on ours.
+        future.add_done_callback(self.__completed.emit)
+
+        return future
+
+    def wait(self) -> None:
+        for future in list(self.__pending):
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    def shutdown(self) -> None:
+        self.wait()
+        self.__executor.shutdown(wait=True)
+
+    @pyqtSlot(object)
+    def __onCompleted(self, future: Future):
+        if future in self.__pending:
+            self.__pending.remove(future)
+
+        error = future.exception()
+        if error is None:
+            if future.onDone:
+                future.onDone(future.result())
+        elif future.onFailed:
+            future.onFailed(error)
+        else:
+            self.failed.emit(future.description, str(error))
+
+        if self.__pending:
+            self.busyChanged.emit(True, self.__pending[0].description)
+        else:
+            self.busyChanged.emit(False, "")
@@ -0,0 +1,258 @@
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple, Union
+
+from core.quiz.sessions import Card, Mode, QuizSession
+from core.repository.repositories import Repository
+from server.stores import ProgressStores
+
+
+def _format_card(card: Card) -> Dict:
+    shown = card.value if Mode.EXPRESSION == card.mode else card.key
+
+    return {"mode": card.mode.name, "shown": shown, "hint": card.hint}
+
+
+def _parameter(parameters: Dict, name: str, types: Union[type, Tuple], default=None):
+    value = parameters.get(name, default)
+    if not isinstance(value, types):
+        raise ValueError(f"incorrect value of '{name}': {value!r}")
+
+    return value
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class QuizServer(ThreadingHTTPServer):
+    """
+    Serves quiz sessions over HTTP/JSON.
+
+    Users share one dictionary, opened immutable with `read_only`, and each
+    has a progress store of their own. Sessions unused for `session_ttl`
+    seconds are dropped, as are the least recently used beyond
+    `max_sessions`; stores left without sessions follow them.
+
+        POST   /sessions                {"user", "order", "mode", "hints", "deck"}
+        GET    /sessions/<id>           current card
+        POST   /sessions/<id>/answer    {"answer"} -> result and next card
+        POST   /sessions/<id>/hint      -> next card
+        DELETE /sessions/<id>
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        dictionary_path: str,
+        progress_directory: str,
+        pool_size: int = 8,
+        verbose: bool = False,
+        read_only: bool = False,
+        session_ttl: float = 3600,
+        max_sessions: int = 10000,
+    ) -> None:
+        self.dictionary = Repository(
+            path=dictionary_path,
+            core_reads=True,
+            pool_size=pool_size,
+            read_only=read_only,
+        )
+        self.stores = ProgressStores(
+            directory=progress_directory,
+            dictionary=self.dictionary,
+            ttl=session_ttl,
+            max_stores=max_sessions,
+        )
+        self.verbose = verbose
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+
+        # Least recently used first, with the time of their last use.
+        self.sessions: OrderedDict[
+            str, Tuple[threading.Lock, QuizSession]
+        ] = OrderedDict()
+        self.sessions_used: Dict[str, float] = {}
+        self.sessions_lock = threading.Lock()
+
+        ThreadingHTTPServer.__init__(self, address, QuizRequestHandler)
+
+    def create_session(self, parameters: Dict) -> Tuple[str, Card]:
+        events = self.stores.acquire(_parameter(parameters, "user", str))
+        try:
+            session = QuizSession(
+                repository=self.dictionary,
+                order=_parameter(parameters, "order", int, default=0),
+                mode=_parameter(parameters, "mode", int, default=0),
+                hints=float(_parameter(parameters, "hints", (int, float), default=0)),
+                deck=_parameter(parameters, "deck", (str, type(None))),
+                events=events,
+            )
+        except RuntimeError as error:
+            self.stores.release(events)
+            raise HTTPError(HTTPStatus.CONFLICT, str(error))
+        except ValueError:
+            self.stores.release(events)
+            raise
+
+        card = session.next_card()
+
+        session_id = uuid.uuid4().hex
+        with self.sessions_lock:
+            self._expire_sessions(now=time.monotonic(), room=1)
+            self.sessions[session_id] = (threading.Lock(), session)
+            self.sessions_used[session_id] = time.monotonic()
+
+        return session_id, card
+
+    def find_session(self, session_id: str) -> Tuple[threading.Lock, QuizSession]:
+        with self.sessions_lock:
+            now = time.monotonic()
+            self._expire_sessions(now=now)
+            if session_id not in self.sessions:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"no session '{session_id}'")
+
+            self.sessions.move_to_end(session_id)
+            self.sessions_used[session_id] = now
+
+            return self.sessions[session_id]
+
+    def delete_session(self, session_id: str) -> None:
+        with self.sessions_lock:
+            if session_id not in self.sessions:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"no session '{session_id}'")
+
+            self._drop_session(session_id=session_id)
+
+    def _expire_sessions(self, now: float, room: int = 0) -> None:
+        """Must be called with `sessions_lock` held."""
+        for session_id in list(self.sessions):
+            expired = now - self.sessions_used[session_id] >= self.session_ttl
+            if not expired and len(self.sessions) + room <= self.max_sessions:
+                break
+
+            self._drop_session(session_id=session_id)
+
+    def _drop_session(self, session_id: str) -> None:
+        _, session = self.sessions.pop(session_id)
+        del self.sessions_used[session_id]
+        self.stores.release(session.events)
+
+    def server_close(self) -> None:
+        ThreadingHTTPServer.server_close(self)
+        self.stores.close()
+        self.dictionary.storage.close()
+
+
+class QuizRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, without the body waiting for the delayed ACK of the headers.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    SESSION_PATTERN = re.compile(r"^/sessions/([0-9a-f]{32})(?:/(answer|hint))?$")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def do_GET(self):
+        self._handle(self._get)
+
+    def do_POST(self):
+        self._handle(self._post)
+
+    def do_DELETE(self):
+        self._handle(self._delete)
+
+    def _handle(self, handler):
+        try:
+            status, body = handler()
+        except HTTPError as error:
+            status, body = error.status, {"error": str(error)}
+        except (ValueError, TypeError, KeyError) as error:
+            status, body = HTTPStatus.BAD_REQUEST, {"error": str(error)}
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+
+        parameters = json.loads(self.rfile.read(length).decode("utf-8"))
+        if not isinstance(parameters, dict):
+            raise ValueError("request body must be a JSON object")
+
+        return parameters
+
+    def _route(self) -> Tuple[Optional[str], Optional[str]]:
+        match = self.SESSION_PATTERN.match(self.path)
+        if not match:
+            return None, None
+
+        return match.group(1), match.group(2)
+
+    def _get(self):
+        session_id, action = self._route()
+        if not session_id or action:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no route '{self.path}'")
+
+        lock, session = self.server.find_session(session_id=session_id)
+        with lock:
+            return HTTPStatus.OK, {"card": _format_card(session.card)}
+
+    def _post(self):
+        parameters = self._read_json()
+
+        if "/sessions" == self.path:
+            session_id, card = self.server.create_session(parameters=parameters)
+            return HTTPStatus.CREATED, {
+                "session": session_id,
+                "card": _format_card(card),
+            }
+
+        session_id, action = self._route()
+        if not action:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no route '{self.path}'")
+
+        lock, session = self.server.find_session(session_id=session_id)
+        with lock:
+            if "hint" == action:
+                session.hint()
+                return HTTPStatus.OK, {"card": _format_card(session.next_card())}
+
+            answer = _parameter(parameters, "answer", str)
+            card = session.card
+            if Mode.EXPRESSION == card.mode:
+                result = session.submit(expression=answer, meaning=card.value)
+            else:
+                result = session.submit(expression=card.key, meaning=answer)
+
+            return HTTPStatus.OK, {
+                "result": result._asdict(),
+                "card": _format_card(session.next_card()),
+            }
+
+    def _delete(self):
+        session_id, action = self._route()
+        if not session_id or action:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no route '{self.path}'")
+
+        self.server.delete_session(session_id=session_id)
+
+        return HTTPStatus.OK, {}
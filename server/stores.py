@@ -0,0 +1,122 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict
+
+from core.repository.repositories import Repository, Storage
+
+_USER_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+class ProgressStore:
+    """
+    Per-user event store: a small database holding copies of the records a
+    user has answered plus their events, next to the shared dictionary.
+    """
+
+    def __init__(self, user: str, path: str, dictionary: Repository) -> None:
+        self.user = user
+        self.storage = Storage(path=path)
+        self.dictionary = dictionary
+        self.lock = threading.Lock()
+
+    def _commit(self, key: str, commit) -> None:
+        with self.lock:
+            if self.storage.record(key=key) is None:
+                self.storage[key] = self.dictionary[key]
+
+            commit(key=key)
+
+    def commit_success_event(self, key: str) -> None:
+        self._commit(key=key, commit=self.storage.commit_success_event)
+
+    def commit_failure_event(self, key: str) -> None:
+        self._commit(key=key, commit=self.storage.commit_failure_event)
+
+    def commit_hint_event(self, key: str) -> None:
+        self._commit(key=key, commit=self.storage.commit_hint_event)
+
+    def close(self) -> None:
+        with self.lock:
+            self.storage.close()
+
+
+class ProgressStores:
+    """
+    Opens the stores of users on demand. A store is held by its sessions
+    through acquire() and release(); stores no session holds are closed once
+    unused for `ttl` seconds, as are the least recently used ones beyond
+    `max_stores`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        dictionary: Repository,
+        ttl: float = 3600,
+        max_stores: int = 10000,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dictionary = dictionary
+        self.ttl = ttl
+        self.max_stores = max_stores
+
+        self._stores: Dict[str, ProgressStore] = {}
+        self._holders: Dict[str, int] = {}
+        # Released stores, least recently used first.
+        self._idle: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, user: str) -> ProgressStore:
+        if not _USER_PATTERN.match(user or ""):
+            raise ValueError(f"incorrect user name: '{user}'")
+
+        with self._lock:
+            self._expire(now=time.monotonic())
+            if user not in self._stores:
+                self._stores[user] = ProgressStore(
+                    user=user,
+                    path=str(self.directory / f"{user}.db"),
+                    dictionary=self.dictionary,
+                )
+                self._holders[user] = 0
+
+            self._idle.pop(user, None)
+            self._holders[user] += 1
+
+            return self._stores[user]
+
+    def release(self, store: ProgressStore) -> None:
+        with self._lock:
+            if self._stores.get(store.user) is not store:
+                return
+
+            self._holders[store.user] -= 1
+            if not self._holders[store.user]:
+                self._idle[store.user] = time.monotonic()
+            self._expire(now=time.monotonic())
+
+    def _expire(self, now: float) -> None:
+        """Must be called with `_lock` held."""
+        for user in list(self._idle):
+            expired = now - self._idle[user] >= self.ttl
+            if not expired and len(self._idle) <= self.max_stores:
+                break
+
+            del self._idle[user]
+            del self._holders[user]
+            self._stores.pop(user).close()
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def close(self) -> None:
+        with self._lock:
+            for store in self._stores.values():
+                store.close()
+            self._stores = {}
+            self._holders = {}
+            self._idle = OrderedDict()
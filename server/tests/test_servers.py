@@ -0,0 +1,192 @@
+import http.client
+import json
+import threading
+from pathlib import Path
+
+from pytest import fixture
+
+from core.repository.packs import export_pack
+from core.repository.repositories import Storage
+from server.servers import QuizServer
+
+
+@fixture(params=["read_write", "read_only", "pack"])
+def server(request, tmp_path):
+    dictionary_path = tmp_path / "dictionary.db"
+    dictionary = Storage(path=str(dictionary_path))
+    for key, value in [("foo", "spam"), ("bar", "eggs")]:
+        dictionary[key] = value
+    if request.param == "pack":
+        dictionary_path = tmp_path / "dictionary.pack"
+        export_pack(dictionary, path=str(dictionary_path))
+    dictionary.close()
+
+    server = QuizServer(
+        address=("127.0.0.1", 0),
+        dictionary_path=str(dictionary_path),
+        progress_directory=str(tmp_path / "progress"),
+        pool_size=2,
+        read_only=request.param == "read_only",
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def _request(connection, method, path, body=None):
+    payload = json.dumps(body) if body is not None else None
+    connection.request(method, path, body=payload)
+    response = connection.getresponse()
+
+    return response.status, json.loads(response.read())
+
+
+def _events(path):
+    with Storage(path=str(path)).engine.connect() as connection:
+        return connection.exec_driver_sql(
+            "SELECT records.key, events.event_type FROM events "
+            "JOIN records ON records.id = events.record_id ORDER BY events.id"
+        ).fetchall()
+
+
+def test_if_can_run_quiz_session(server):
+    connection = http.client.HTTPConnection(*server.server_address)
+
+    status, body = _request(connection, "POST", "/sessions", {"user": "alice"})
+    assert status == 201
+    assert body["card"] == {"mode": "EXPRESSION", "shown": "spam", "hint": "___"}
+
+    session = body["session"]
+    status, body = _request(
+        connection, "POST", f"/sessions/{session}/answer", {"answer": "foo"}
+    )
+    assert status == 200
+    assert body["result"]["is_correct"] is True
+    assert body["card"]["shown"] == "eggs"
+
+    status, body = _request(
+        connection, "POST", f"/sessions/{session}/answer", {"answer": "baz"}
+    )
+    assert body["result"] == {
+        "is_correct": False,
+        "correct_answer": "bar",
+        "user_answer": "baz",
+    }
+
+    status, body = _request(connection, "POST", f"/sessions/{session}/hint")
+    assert body["card"]["shown"] == "eggs"
+
+    status, body = _request(connection, "GET", f"/sessions/{session}")
+    assert (status, body["card"]["shown"]) == (200, "eggs")
+
+    status, _ = _request(connection, "DELETE", f"/sessions/{session}")
+    assert status == 200
+
+    status, _ = _request(connection, "GET", f"/sessions/{session}")
+    assert status == 404
+
+    progress = Path(server.stores.directory) / "alice.db"
+    assert _events(progress) == [
+        ("foo", "SUCCESS"),
+        ("bar", "FAILURE"),
+        ("foo", "HINT"),
+    ]
+
+
+def test_if_keeps_progress_per_user(server):
+    connections = {
+        user: http.client.HTTPConnection(*server.server_address)
+        for user in ["alice", "bob"]
+    }
+    sessions = {
+        user: _request(connection, "POST", "/sessions", {"user": user, "mode": 1})[1][
+            "session"
+        ]
+        for user, connection in connections.items()
+    }
+
+    _request(
+        connections["alice"],
+        "POST",
+        f"/sessions/{sessions['alice']}/answer",
+        {"answer": "spam"},
+    )
+    _request(
+        connections["bob"],
+        "POST",
+        f"/sessions/{sessions['bob']}/answer",
+        {"answer": "ham"},
+    )
+
+    directory = Path(server.stores.directory)
+    assert _events(directory / "alice.db") == [("foo", "SUCCESS")]
+    assert _events(directory / "bob.db") == [("foo", "FAILURE")]
+
+
+def test_if_rejects_bad_requests(server):
+    connection = http.client.HTTPConnection(*server.server_address)
+
+    assert _request(connection, "POST", "/sessions", {"user": "../etc"})[0] == 400
+    assert (
+        _request(connection, "POST", "/sessions", {"user": "a", "order": 7})[0] == 400
+    )
+    assert (
+        _request(connection, "POST", "/sessions", {"user": "a", "deck": "x"})[0] == 409
+    )
+    assert _request(connection, "GET", "/unknown")[0] == 404
+
+    for body in [{"user": 5}, {"user": "a", "hints": None}, {"user": "a", "mode": "1"}]:
+        assert _request(connection, "POST", "/sessions", body)[0] == 400
+
+    session = _request(connection, "POST", "/sessions", {"user": "a"})[1]["session"]
+    for body in [{"answer": 5}, {}]:
+        assert (
+            _request(connection, "POST", f"/sessions/{session}/answer", body)[0] == 400
+        )
+
+
+def test_if_expires_sessions(server):
+    connection = http.client.HTTPConnection(*server.server_address)
+
+    server.max_sessions = 2
+    sessions = [
+        _request(connection, "POST", "/sessions", {"user": "alice"})[1]["session"]
+        for _ in range(3)
+    ]
+    assert _request(connection, "GET", f"/sessions/{sessions[0]}")[0] == 404
+    assert _request(connection, "GET", f"/sessions/{sessions[1]}")[0] == 200
+
+    # The session just used is kept, the least recently used one is dropped.
+    _request(connection, "POST", "/sessions", {"user": "alice"})
+    assert _request(connection, "GET", f"/sessions/{sessions[1]}")[0] == 200
+    assert _request(connection, "GET", f"/sessions/{sessions[2]}")[0] == 404
+
+    server.session_ttl = 0
+    assert _request(connection, "GET", f"/sessions/{sessions[1]}")[0] == 404
+    assert server.sessions == {}
+
+
+def test_if_closes_stores_of_expired_sessions(server):
+    connection = http.client.HTTPConnection(*server.server_address)
+
+    sessions = [
+        _request(connection, "POST", "/sessions", {"user": user})[1]["session"]
+        for user in ["alice", "alice", "bob"]
+    ]
+    assert len(server.stores) == 2
+
+    _request(connection, "DELETE", f"/sessions/{sessions[0]}")
+    assert len(server.stores) == 2
+
+    server.session_ttl = server.stores.ttl = 0
+    assert _request(connection, "GET", f"/sessions/{sessions[1]}")[0] == 404
+    assert len(server.stores) == 0
+
+    assert (
+        _request(connection, "POST", "/sessions", {"user": "a", "deck": "x"})[0] == 409
+    )
+    assert len(server.stores) == 0